@@ -0,0 +1,32 @@
+from fastapi import Request, Response, status
+
+from app.core.compression import choose_encoding
+from app.crud.dictionaries import CachedPayload
+
+
+def cached_response(request: Request, payload: CachedPayload, max_age: int) -> Response:
+    """
+    Отдаёт заранее сериализованный ответ с ETag и Cache-Control.
+    Если клиент принимает br или gzip, отдаётся копия, сжатая при сборке снимка
+    (CompressionMiddleware такие ответы повторно не сжимает).
+    При совпадении If-None-Match возвращает 304 без тела.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding not in payload.encoded:
+        encoding = None
+    headers = {
+        "ETag": payload.etag_for(encoding),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    if payload.encoded:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        etags = {payload.etag, *(payload.etag_for(e) for e in payload.encoded)}
+        if tags & etags or "*" in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is None:
+        return Response(content=payload.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=payload.encoded[encoding], media_type="application/json", headers=headers)
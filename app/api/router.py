@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users, admin, routes, waypoints, comments, utils
+from app.api.v1 import auth, users, admin, routes, waypoints, comments, utils, notifications, posts, news, photos
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
@@ -8,4 +8,8 @@ api_router.include_router(users.router)
 api_router.include_router(routes.router)
 api_router.include_router(waypoints.router)
 api_router.include_router(comments.router)
-api_router.include_router(utils.router)
\ No newline at end of file
+api_router.include_router(utils.router)
+api_router.include_router(notifications.router)
+api_router.include_router(posts.router)
+api_router.include_router(news.router)
+api_router.include_router(photos.router)
\ No newline at end of file
@@ -0,0 +1,121 @@
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.exceptions import ResponseValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+_JSON_MEDIA_TYPES = {"application/json", "application/*", "*/*"}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """
+    MessagePack отдаётся, только если клиент явно указал его в Accept
+    и не предпочёл JSON (по q); */* и отсутствие заголовка означают JSON.
+    """
+    if not accept:
+        return False
+    accept = accept.lower()
+    if "msgpack" not in accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.strip()
+        if media_type in _MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in _JSON_MEDIA_TYPES:
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def _msgpack_default(value: Any) -> Any:
+    # UUID — 16 байт (bin), время — целые миллисекунды Unix (UTC).
+    if isinstance(value, UUID):
+        return value.bytes
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - _EPOCH) // _MILLISECOND
+    if isinstance(value, date):
+        return (datetime.combine(value, time(), timezone.utc) - _EPOCH) // _MILLISECOND
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в MessagePack")
+
+
+class ResponseSerializer:
+    """
+    Заранее собранный сериализатор ответа эндпоинта (pydantic TypeAdapter).
+
+    Обычный путь FastAPI для результата crud: валидация по response_model
+    (для синхронного эндпоинта — ещё одна передача в пул потоков), выгрузка
+    в jsonable-объекты Python и json.dumps. Здесь результат проверяется по той
+    же схеме и пишется в JSON сразу байтами, целиком в pydantic-core.
+    Ответ-Response FastAPI не валидирует повторно, поэтому response_model
+    у эндпоинта остаётся только для документации OpenAPI; тело ответа совпадает
+    с обычным путём байт в байт.
+
+    Клиенту с Accept: application/msgpack те же данные отдаются в MessagePack
+    (UUID — 16 байт, время — миллисекунды Unix). Ошибки (HTTPException) остаются JSON.
+
+    При FAST_JSON_RESPONSES=false JSON-ответ строит обычный путь FastAPI.
+    """
+
+    def __init__(self, type_: Any):
+        self.adapter = TypeAdapter(type_)
+
+    def _validate(self, content: Any) -> Any:
+        try:
+            return self.adapter.validate_python(content)
+        except ValidationError as e:
+            # Как при ошибке валидации ответа в FastAPI: 500 и подробности в логе.
+            raise ResponseValidationError(errors=e.errors(include_url=False), body=content)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self._validate(content), by_alias=True)
+
+    def render_msgpack(self, content: Any) -> bytes:
+        data = self.adapter.dump_python(self._validate(content), by_alias=True)
+        return msgpack.packb(data, default=_msgpack_default)
+
+    def response(self, content: Any, request: Request, response: Response, status_code: int = 200) -> Any:
+        """
+        response — Response, внедрённый FastAPI в эндпоинт: через него Vary: Accept
+        попадает и в ответ обычного пути FastAPI (при FAST_JSON_RESPONSES=false).
+        """
+        headers = {"Vary": "Accept"}
+        if prefers_msgpack(request.headers.get("accept")):
+            return Response(
+                content=self.render_msgpack(content),
+                status_code=status_code,
+                media_type=MSGPACK_MEDIA_TYPE,
+                headers=headers,
+            )
+        if not settings.FAST_JSON_RESPONSES:
+            response.headers.update(headers)
+            return content
+        return Response(
+            content=self.render(content),
+            status_code=status_code,
+            media_type="application/json",
+            headers=headers,
+        )
@@ -1,13 +1,31 @@
+from datetime import date, timedelta
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.users import DBUser
 
+from app.core.config import settings
 from app.crud import admin as admin_crud
+from app.crud import counters
+from app.crud import export as export_crud
+from app.crud import routes as routes_crud
+from app.crud import stats as stats_crud
+from app.crud import thumbnails
+from app.crud.pagination import decode_cursor
 from app.dependencies.security import get_current_admin_user
-from app.schemas.admin import ToggleUserStatusRequest, SetUserRoleRequest, ResetUserPasswordRequest
+from app.schemas.admin import (
+    ToggleUserStatusRequest,
+    SetUserRoleRequest,
+    ResetUserPasswordRequest,
+    BulkToggleUserStatusRequest,
+    BulkSetUserRoleRequest,
+    BulkDeleteUsersRequest,
+    BulkOperationResult,
+    AdminStatsOut,
+)
 from app.schemas.common import ResponseMsg
 from app.schemas.users import UserInfo
 
@@ -112,6 +130,79 @@ def delete_user(
     return {"message": f"Пользователь '{identifier}' успешно удалён."}
 
 
+@router.post(
+    "/bulk/toggle_user_active",
+    response_model=BulkOperationResult,
+    description="Массовая блокировка или разблокировка пользователей по списку логинов/email или по фильтру. "
+                "Администраторы и собственная учетная запись пропускаются."
+)
+def bulk_toggle_user_active(
+    data: BulkToggleUserStatusRequest,
+    current_user: DBUser = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Заблокировать или включить сразу многих пользователей одним запросом к БД.
+    Для каждого пользователя возвращается результат операции.
+    """
+    return admin_crud.bulk_toggle_user_status(
+        db=db,
+        current_user=current_user,
+        identifiers=data.identifiers,
+        user_filter=data.filter,
+        block_user=data.block_user,
+        block_reason=data.block_reason,
+    )
+
+
+@router.post(
+    "/bulk/set_user_role",
+    response_model=BulkOperationResult,
+    description="Массовая смена роли пользователей по списку логинов/email или по фильтру. "
+                "Роль администраторов и собственная роль не меняются."
+)
+def bulk_set_user_role(
+    data: BulkSetUserRoleRequest,
+    current_user: DBUser = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Сменить роль сразу многим пользователям одним запросом к БД.
+    Для каждого пользователя возвращается результат операции.
+    """
+    return admin_crud.bulk_change_user_role(
+        db=db,
+        current_user=current_user,
+        identifiers=data.identifiers,
+        user_filter=data.filter,
+        new_role=data.role,
+    )
+
+
+@router.post(
+    "/bulk/delete_users",
+    response_model=BulkOperationResult,
+    description="Массовое удаление пользователей по списку логинов/email или по фильтру "
+                "(например, зарегистрированных за последний час без маршрутов). "
+                "Администраторы, собственная учетная запись и пользователи с контентом не удаляются."
+)
+def bulk_delete_users(
+    data: BulkDeleteUsersRequest,
+    current_user: DBUser = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Удалить сразу многих пользователей одним запросом к БД.
+    Для каждого пользователя возвращается результат операции.
+    """
+    return admin_crud.bulk_delete_users(
+        db=db,
+        current_user=current_user,
+        identifiers=data.identifiers,
+        user_filter=data.filter,
+    )
+
+
 @router.get(
     "/get_user_info",
     response_model=UserInfo,
@@ -147,4 +238,107 @@ def get_users_list(
     Пример: /admin/get_users_list?skip=0&limit=50
     """
     users = admin_crud.get_users_list(db, skip=skip, limit=limit)
-    return [UserInfo.model_validate(u) for u in users]
\ No newline at end of file
+    return [UserInfo.model_validate(u) for u in users]
+
+@router.post(
+    "/routes/thumbnails/backfill",
+    response_model=ResponseMsg,
+    status_code=202,
+    description="Запустить фоновую генерацию превью карт для всех маршрутов без thumbnail_url."
+)
+def backfill_route_thumbnails(
+    current_user: DBUser = Depends(get_current_admin_user)
+) -> dict:
+    """
+    Ставит генерацию превью в очередь фонового воркера и сразу возвращает ответ.
+    Доступно только администратору.
+    """
+    thumbnails.worker.request_backfill()
+    return {"message": "Генерация превью маршрутов запущена."}
+
+
+@router.get(
+    "/stats",
+    response_model=AdminStatsOut,
+    description="Статистика по дням: регистрации, входы, активные пользователи, маршруты, лайки и комментарии. "
+                "По умолчанию — последние 30 дней. Прошедшие дни — снимки на момент последнего пересчёта, "
+                "удаления и снятые лайки в них не учитываются до /admin/stats/backfill."
+)
+def get_stats(
+    date_from: date | None = Query(None, description="Первый день периода"),
+    date_to: date | None = Query(None, description="Последний день периода"),
+    current_user: DBUser = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Читает суточные агрегаты daily_stats, а не исходные таблицы.
+    Данные за сегодня обновляются раз в STATS_ROLLUP_INTERVAL_SECONDS;
+    прошедшие дни не пересчитываются до вызова /admin/stats/backfill.
+    """
+    date_to = date_to or stats_crud.local_today()
+    date_from = date_from or date_to - timedelta(days=29)
+    return stats_crud.get_stats(db, date_from, date_to)
+
+
+@router.post(
+    "/stats/backfill",
+    response_model=ResponseMsg,
+    status_code=202,
+    description="Пересчитать суточную статистику за период (по умолчанию — за всё время) в фоне."
+)
+def backfill_stats(
+    background_tasks: BackgroundTasks,
+    date_from: date | None = Query(None, description="Первый день периода"),
+    date_to: date | None = Query(None, description="Последний день периода"),
+    current_user: DBUser = Depends(get_current_admin_user),
+) -> dict:
+    """
+    Запускает пересчёт daily_stats и сразу возвращает ответ.
+    Доступно только администратору.
+    """
+    background_tasks.add_task(stats_crud.run_stats_backfill, date_from, date_to)
+    return {"message": "Пересчёт статистики запущен."}
+
+
+@router.post(
+    "/counters/recount",
+    response_model=ResponseMsg,
+    status_code=202,
+    description="Пересчитать в фоне денормализованные счётчики лайков маршрутов и комментариев "
+                "и агрегаты оценок маршрутов по исходным таблицам."
+)
+def recount_counters(
+    background_tasks: BackgroundTasks,
+    current_user: DBUser = Depends(get_current_admin_user),
+) -> dict:
+    """
+    Запускается один раз после добавления колонок likes_count и rating_*
+    (до этого в них значения по умолчанию) и при ручной сверке.
+    Доступно только администратору.
+    """
+    background_tasks.add_task(counters.run_recount)
+    background_tasks.add_task(routes_crud.run_rating_recount)
+    return {"message": "Пересчёт счётчиков запущен."}
+
+
+@router.get(
+    "/export/routes",
+    response_class=StreamingResponse,
+    description="Потоковая выгрузка всех публичных маршрутов с геометрией: по GeoJSON Feature на строку "
+                "(NDJSON или GeoJSONSeq). Каждый объект содержит cursor — для продолжения выгрузки с этого места."
+)
+def export_routes(
+    after: str | None = Query(None, description="Курсор последнего полученного маршрута"),
+    limit: int | None = Query(None, ge=1, description="Максимум маршрутов в выгрузке (по умолчанию — все)"),
+    fmt: str = Query(export_crud.NDJSON, alias="format", pattern=f"^({export_crud.NDJSON}|{export_crud.GEOJSONSEQ})$"),
+    current_user: DBUser = Depends(get_current_admin_user),
+) -> StreamingResponse:
+    """
+    Маршруты читаются серверным курсором, память не зависит от их числа.
+    Доступно только администратору.
+    """
+    checkpoint = decode_cursor(after) if after else None
+    return StreamingResponse(
+        export_crud.iter_public_routes(checkpoint, limit, settings.ROUTES_EXPORT_BATCH_SIZE, fmt),
+        media_type=export_crud.MEDIA_TYPES[fmt],
+    )
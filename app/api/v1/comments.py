@@ -1,37 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request, Response
+from typing import List, Optional
 from uuid import UUID
 
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.dependencies.security import get_current_user, get_current_user_optional
-from app.schemas.comments import CommentCreate, CommentOut
+from app.schemas.comments import CommentCreate, CommentOut, CommentPage, CommentLikeOut
 from app.crud import comments as comments_crud
 from app.models.users import DBUser
 from app.schemas.common import ResponseMsg
+from app.core.query_audit import query_budget
+from app.api.serialization import ResponseSerializer
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
+COMMENT_PAGE = ResponseSerializer(CommentPage)
 
-@router.post("/{comment_id}/like", response_model=ResponseMsg)
+
+@router.post("/{comment_id}/like", response_model=CommentLikeOut)
 def like_comment(
     comment_id: UUID,
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    comments_crud.like_comment(db, comment_id, current_user)
-    return {"message": "Лайк добавлен"}
+    likes_count = comments_crud.like_comment(db, comment_id, current_user)
+    return {"message": "Лайк добавлен", "likes_count": likes_count}
 
 
-@router.delete("/{comment_id}/like", response_model=ResponseMsg)
+@router.delete("/{comment_id}/like", response_model=CommentLikeOut)
 def unlike_comment(
     comment_id: UUID,
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    comments_crud.unlike_comment(db, comment_id, current_user)
-    return {"message": "Лайк удалён"}
+    likes_count = comments_crud.unlike_comment(db, comment_id, current_user)
+    return {"message": "Лайк удалён", "likes_count": likes_count}
 
 
 @router.delete("/{comment_id}", response_model=ResponseMsg)
@@ -44,16 +48,33 @@ def delete_comment(
     return {"message": "Комментарий удалён"}
 
 
-@router.get("/{target_type}/{target_uuid}", response_model=List[CommentOut])
+@router.get("/{target_type}/{target_uuid}", response_model=CommentPage)
+@query_budget(5)
 def get_comments(
     target_type: str,
     target_uuid: UUID,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(20, ge=1, le=100),
+    threaded: bool = Query(False, description="Вернуть ответы на комментарии"),
+    replies_limit: int = Query(3, ge=0, le=20, description="Сколько первых ответов вернуть для каждого комментария"),
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user_optional)
 ):
-    return comments_crud.get_comments(db, target_type, target_uuid, current_user)
+    return COMMENT_PAGE.response(comments_crud.get_comments(
+        db,
+        target_type,
+        target_uuid,
+        current_user,
+        cursor=cursor,
+        limit=limit,
+        threaded=threaded,
+        replies_limit=replies_limit,
+    ), request, response)
 
 @router.post("/{target_type}/{target_uuid}", response_model=CommentOut)
+@query_budget(3)
 def create_comment(
     target_type: str,
     target_uuid: UUID,
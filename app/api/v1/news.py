@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from uuid import UUID
+from app.api.caching import cached_response
+from app.core.config import settings
+from app.dependencies.security import get_current_moderator_user
+from app.db.session import get_db
+from app.models.users import DBUser
+from app.crud import news as news_crud
+from app.schemas.news import NewsCreate, NewsUpdate, NewsOut
+from app.core.query_audit import query_budget
+
+router = APIRouter(prefix="/news", tags=["news"])
+
+
+@router.get("/", description="Последние новости (готовый снимок, одинаковый для всех пользователей)")
+@query_budget(1)
+def get_news_feed(request: Request):
+    return cached_response(request, news_crud.feed.payload(), settings.NEWS_CACHE_MAX_AGE)
+
+
+@router.get("/{news_id}", response_model=NewsOut)
+def get_news_item(
+    news_id: UUID,
+    db: Session = Depends(get_db)
+):
+    return news_crud.get_news_item(db, news_id)
+
+
+@router.post("/", response_model=NewsOut)
+def create_news(
+    news_data: NewsCreate,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_moderator_user)
+):
+    return news_crud.create_news(db, news_data, creator=current_user)
+
+
+@router.put("/{news_id}", response_model=NewsOut)
+def update_news(
+    news_id: UUID,
+    news_data: NewsUpdate,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_moderator_user)
+):
+    return news_crud.update_news(db, news_id, news_data)
+
+
+@router.delete("/{news_id}")
+def delete_news(
+    news_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_moderator_user)
+):
+    news_crud.delete_news(db, news_id)
+    return {"detail": "Новость успешно удалена"}
@@ -0,0 +1,32 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.dependencies.security import get_current_user
+from app.models.users import DBUser
+from app.crud import notifications as notifications_crud
+from app.schemas.common import ResponseMsg
+from app.schemas.notifications import NotificationPage
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+
+@router.get("/", response_model=NotificationPage, description="Уведомления об изменениях маршрутов, на которые подписан пользователь")
+def get_notifications(
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(20, ge=1, le=100),
+    unread_only: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return notifications_crud.get_notifications(db, current_user, cursor=cursor, limit=limit, unread_only=unread_only)
+
+
+@router.post("/read_all", response_model=ResponseMsg, description="Отметить все уведомления прочитанными")
+def read_all(
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    updated = notifications_crud.mark_all_read(db, current_user)
+    return {"message": f"Прочитано уведомлений: {updated}"}
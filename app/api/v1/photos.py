@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, File, Form, UploadFile, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import List, Optional
+from app.dependencies.security import get_current_user
+from app.db.session import get_db
+from app.models.users import DBUser
+from app.crud import photos as photos_crud
+from app.schemas.photos import PhotoOut
+
+router = APIRouter(prefix="/photos", tags=["photos"])
+
+
+@router.get("/{target_type}/{target_uuid}", response_model=List[PhotoOut])
+def get_photos(
+    target_type: str,
+    target_uuid: UUID,
+    db: Session = Depends(get_db)
+):
+    return photos_crud.get_photos(db, target_type, target_uuid)
+
+
+@router.post(
+    "/{target_type}/{target_uuid}",
+    response_model=PhotoOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Загрузить фотографию. Уменьшенные копии появятся в variants после обработки (status = ready)"
+)
+def upload_photo(
+    target_type: str,
+    target_uuid: UUID,
+    file: UploadFile = File(...),
+    description: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return photos_crud.upload_photo(db, target_type, target_uuid, file, description, current_user)
+
+
+@router.delete("/{photo_id}")
+def delete_photo(
+    photo_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    photos_crud.delete_photo(db, photo_id, current_user)
+    return {"detail": "Фотография успешно удалена"}
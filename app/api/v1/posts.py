@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import List, Optional
+from app.dependencies.security import get_current_user, get_current_user_optional
+from app.db.session import get_db
+from app.models.users import DBUser
+from app.crud import posts as post_crud
+from app.schemas.posts import PostCreate, PostUpdate, PostOut, PostFeedPage
+from app.core.query_audit import query_budget
+from app.api.serialization import ResponseSerializer
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+
+POST_FEED = ResponseSerializer(PostFeedPage)
+
+
+@router.get("/", response_model=PostFeedPage, description="Лента постов от новых к старым")
+@query_budget(1)
+def get_feed(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(20, ge=1, le=100),
+    tags: Optional[List[UUID]] = Query(None, description="Посты хотя бы с одним из тегов"),
+):
+    return POST_FEED.response(post_crud.get_feed(db, cursor=cursor, limit=limit, tags=tags), request, response)
+
+
+@router.get("/{post_id}", response_model=PostOut)
+def get_post(
+    post_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Optional[DBUser] = Depends(get_current_user_optional)
+):
+    return post_crud.get_post(db, post_id, current_user)
+
+
+@router.post("/", response_model=PostOut)
+def create_post(
+    post_data: PostCreate,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return post_crud.create_post(db, post_data, creator=current_user)
+
+
+@router.put("/{post_id}", response_model=PostOut)
+def update_post(
+    post_id: UUID,
+    post_data: PostUpdate,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return post_crud.update_post(db, post_id, post_data, current_user)
+
+
+@router.delete("/{post_id}")
+def delete_post(
+    post_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    post_crud.delete_post(db, post_id, current_user)
+    return {"detail": "Пост успешно удален"}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List, Optional
@@ -6,13 +6,21 @@ from app.dependencies.security import get_current_user, get_current_user_optiona
 from app.db.session import get_db
 from app.models.users import DBUser
 from app.crud import routes as route_crud
-from app.schemas.routes import RouteCreate, RouteUpdate, RouteOut, RouteCardOut
+from app.schemas.routes import RouteCreate, RouteUpdate, RouteOut, RouteCardOut, RouteRatingIn, RouteRatingOut
+from app.core.query_audit import query_budget
+from app.api.serialization import ResponseSerializer
 
 router = APIRouter(prefix="/routes", tags=["routes"])
 
+ROUTE_CARDS = ResponseSerializer(List[RouteCardOut])
+ROUTE_DETAIL = ResponseSerializer(RouteOut)
+
 
 @router.get("/", response_model=List[RouteCardOut])
+@query_budget(5)
 def list_routes(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Optional[DBUser] = Depends(get_current_user_optional),
     skip: int = Query(0, ge=0),
@@ -23,7 +31,7 @@ def list_routes(
     location: Optional[str] = Query(None),
     ordering: Optional[str] = Query(None),
 ):
-    return route_crud.get_public_routes(
+    return ROUTE_CARDS.response(route_crud.get_public_routes(
         db=db,
         current_user=current_user,
         skip=skip,
@@ -33,16 +41,18 @@ def list_routes(
         difficulty_uuid=difficulty_uuid,
         location=location,
         ordering=ordering,
-    )
+    ), request, response)
 
 
 @router.get("/{route_id}", response_model=RouteOut)
 def get_route(
     route_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Optional[DBUser] = Depends(get_current_user_optional)
 ):
-    return route_crud.get_route_by_id(db, route_id, current_user)
+    return ROUTE_DETAIL.response(route_crud.get_route_by_id(db, route_id, current_user), request, response)
 
 
 @router.post("/", response_model=RouteOut)
@@ -77,23 +87,29 @@ def delete_route(
 
 @router.get("/my/", response_model=List[RouteCardOut])
 def get_my_routes(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000)
 ):
-    return route_crud.get_routes_by_user(db, current_user, skip=skip, limit=limit)
+    return ROUTE_CARDS.response(route_crud.get_routes_by_user(db, current_user, skip=skip, limit=limit), request, response)
 
 
 @router.get("/user/{user_identifier}", response_model=List[RouteCardOut])
 def get_public_routes_by_user(
     user_identifier: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, le=100),
     current_user: DBUser = Depends(get_current_user_optional)
 ):
-    return route_crud.get_public_routes_by_user(db, user_identifier, skip, limit, current_user)
+    return ROUTE_CARDS.response(
+        route_crud.get_public_routes_by_user(db, user_identifier, skip, limit, current_user), request, response
+    )
 
 
 @router.post("/{route_id}/like", response_model=dict)
@@ -102,8 +118,8 @@ def like_route(
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    route_crud.like_route(db, current_user, route_id)
-    return {"detail": "Лайк добавлен"}
+    likes_count = route_crud.like_route(db, current_user, route_id)
+    return {"detail": "Лайк добавлен", "likes_count": likes_count}
 
 @router.delete("/{route_id}/like", response_model=dict)
 def unlike_route(
@@ -111,8 +127,8 @@ def unlike_route(
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    route_crud.unlike_route(db, current_user, route_id)
-    return {"detail": "Лайк удалён"}
+    likes_count = route_crud.unlike_route(db, current_user, route_id)
+    return {"detail": "Лайк удалён", "likes_count": likes_count}
 
 
 @router.post("/{route_id}/favorite", response_model=dict)
@@ -121,8 +137,8 @@ def add_to_favorites(
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    route_crud.add_to_favorites(db, current_user, route_id)
-    return {"detail": "Добавлено в избранное"}
+    favorites_count = route_crud.add_to_favorites(db, current_user, route_id)
+    return {"detail": "Добавлено в избранное", "favorites_count": favorites_count}
 
 @router.delete("/{route_id}/favorite", response_model=dict)
 def remove_from_favorites(
@@ -130,16 +146,56 @@ def remove_from_favorites(
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    route_crud.remove_from_favorites(db, current_user, route_id)
-    return {"detail": "Удалено из избранного"}
+    favorites_count = route_crud.remove_from_favorites(db, current_user, route_id)
+    return {"detail": "Удалено из избранного", "favorites_count": favorites_count}
+
+
+@router.post("/{route_id}/subscribe", response_model=dict)
+def subscribe(
+    route_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    subscribers_count = route_crud.subscribe(db, current_user, route_id)
+    return {"detail": "Подписка оформлена", "subscribers_count": subscribers_count}
+
+@router.delete("/{route_id}/subscribe", response_model=dict)
+def unsubscribe(
+    route_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    subscribers_count = route_crud.unsubscribe(db, current_user, route_id)
+    return {"detail": "Подписка отменена", "subscribers_count": subscribers_count}
+
+
+@router.put("/{route_id}/rating", response_model=RouteRatingOut)
+def rate_route(
+    route_id: UUID,
+    data: RouteRatingIn,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return route_crud.rate_route(db, current_user, route_id, data.rating)
+
+@router.delete("/{route_id}/rating", response_model=RouteRatingOut)
+def remove_rating(
+    route_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user)
+):
+    return route_crud.remove_rating(db, current_user, route_id)
 
 
 @router.get("/favorites/", response_model=List[RouteCardOut])
+@query_budget(5)
 def get_favorites(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user)
 ):
-    return route_crud.get_favorites(db, current_user)
+    return ROUTE_CARDS.response(route_crud.get_favorites(db, current_user), request, response)
 
 
 @router.patch("/{route_id}/to_draft", response_model=RouteOut)
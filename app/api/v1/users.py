@@ -6,12 +6,14 @@ from app.db.session import get_db
 from app.dependencies.security import get_current_user
 from app.models.users import DBUser
 from app.crud import users as users_crud
-from app.schemas.users import UserInfo, UserUpdate, UserInfoPublic, AvatarUrlUpdate
+from app.schemas.users import UserInfo, UserUpdate, UserInfoPublic, AvatarUrlUpdate, UserSearchPage
+from app.core.query_audit import query_budget
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserInfo, description="Получить свой профиль (детальная информация)")
+@query_budget(1)
 def get_self_info(
         current_user: DBUser = Depends(get_current_user)
 ) -> UserInfo:
@@ -52,6 +54,15 @@ def set_avatar_url(
     user = users_crud.update_avatar_url(db, current_user, str(data.profile_picture))
     return UserInfo.model_validate(user)
 
+@router.get("/search", response_model=UserSearchPage, description="Поиск пользователей по началу логина, имени или фамилии")
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Строка поиска"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(20, ge=1, le=100, description="Сколько пользователей вернуть"),
+    db: Session = Depends(get_db),
+) -> UserSearchPage:
+    return UserSearchPage.model_validate(users_crud.search_users(db, q, cursor=cursor, limit=limit), from_attributes=True)
+
 @router.get("/{identifier}", response_model=UserInfoPublic, description="Публичный профиль пользователя по логину или email")
 def get_user_info(
     identifier: str,
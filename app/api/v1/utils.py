@@ -1,24 +1,31 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.tag import RouteTag
-from app.models.dictionaries import RouteType, DifficultyType
-from app.models.target_types import TargetType
+from fastapi import APIRouter, Request, Response
+from app.api.caching import cached_response
+from app.core.config import settings
+from app.crud.dictionaries import registry, CachedPayload
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
+
+def _cached_response(request: Request, payload: CachedPayload) -> Response:
+    return cached_response(request, payload, settings.DICTIONARY_CACHE_MAX_AGE)
+
+
 @router.get("/route_types")
-def get_route_types(db: Session = Depends(get_db)):
-    return db.query(RouteType).all()
+def get_route_types(request: Request):
+    return _cached_response(request, registry.payload("route_types"))
 
 @router.get("/difficulty_types")
-def get_difficulty_types(db: Session = Depends(get_db)):
-    return db.query(DifficultyType).all()
+def get_difficulty_types(request: Request):
+    return _cached_response(request, registry.payload("difficulty_types"))
 
 @router.get("/target_types")
-def get_target_types(db: Session = Depends(get_db)):
-    return db.query(TargetType).all()
+def get_target_types(request: Request):
+    return _cached_response(request, registry.payload("target_types"))
 
 @router.get("/route_tags")
-def get_target_types(db: Session = Depends(get_db)):
-    return db.query(RouteTag).all()
\ No newline at end of file
+def get_route_tags(request: Request):
+    return _cached_response(request, registry.payload("route_tags"))
+
+@router.get("/post_tags")
+def get_post_tags(request: Request):
+    return _cached_response(request, registry.payload("post_tags"))
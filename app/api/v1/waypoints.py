@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
@@ -8,22 +8,28 @@ from app.dependencies.security import get_current_user
 from app.models.users import DBUser
 from app.schemas.waypoints import WaypointCreate, WaypointUpdate, WaypointOut
 from app.crud import waypoints as waypoints_crud
+from app.api.serialization import ResponseSerializer
 
 router = APIRouter(prefix="/waypoints", tags=["waypoints"])
 
+WAYPOINTS = ResponseSerializer(List[WaypointOut])
+WAYPOINT = ResponseSerializer(WaypointOut)
+
 
 @router.get("/{route_id}/waypoints", response_model=List[WaypointOut])
-def get_waypoints(route_id: UUID, db: Session = Depends(get_db)):
-    return waypoints_crud.get_waypoints(db, route_id)
+def get_waypoints(route_id: UUID, request: Request, response: Response, db: Session = Depends(get_db)):
+    return WAYPOINTS.response(waypoints_crud.get_waypoints(db, route_id), request, response)
 
 
 @router.get("/{route_id}/waypoints/{waypoint_id}", response_model=WaypointOut)
 def get_waypoint(
     route_id: UUID,
     waypoint_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
-    return waypoints_crud.get_waypoint(db, route_id, waypoint_id)
+    return WAYPOINT.response(waypoints_crud.get_waypoint(db, route_id, waypoint_id), request, response)
 
 @router.post("/{route_id}/waypoints", response_model=WaypointOut)
 def add_waypoint(
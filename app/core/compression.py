@@ -0,0 +1,185 @@
+"""
+Сжатие ответов gzip и brotli.
+
+CompressionMiddleware сжимает ответ, если клиент принимает br или gzip (Accept-Encoding),
+тело не меньше минимального размера, тип содержимого не сжат сам по себе (картинки,
+архивы) и у ответа ещё нет Content-Encoding. Последнее позволяет заранее
+сериализованным ответам (app.api.caching) отдавать байты, сжатые один раз при сборке
+снимка, — middleware их не трогает. Потоковые ответы сжимаются по мере отправки,
+каждая часть сбрасывается клиенту сразу.
+"""
+import gzip
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+BROTLI = "br"
+GZIP = "gzip"
+
+# Уже сжатые форматы: повторное сжатие тратит CPU и почти не уменьшает размер.
+_INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+_INCOMPRESSIBLE_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-brotli",
+    "application/zstd",
+    "application/octet-stream",
+    "text/event-stream",
+}
+_COMPRESSIBLE_IMAGES = {"image/svg+xml"}
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Кодировка ответа по Accept-Encoding: br предпочтительнее gzip при равном q.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    brotli_q = weights.get(BROTLI, wildcard)
+    gzip_q = weights.get(GZIP, wildcard)
+    if brotli_q > 0 and brotli_q >= gzip_q:
+        return BROTLI
+    if gzip_q > 0:
+        return GZIP
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def precompress(body: bytes, minimum_size: int, gzip_level: int, brotli_quality: int) -> dict[str, bytes]:
+    """
+    Сжатые копии тела для кешируемых ответов (только выигрывающие в размере).
+    """
+    if len(body) < minimum_size:
+        return {}
+    encoded = {
+        BROTLI: compress(body, BROTLI, brotli_quality),
+        GZIP: compress(body, GZIP, gzip_level),
+    }
+    return {encoding: data for encoding, data in encoded.items() if len(data) < len(body)}
+
+
+def compressible_type(content_type: str | None) -> bool:
+    if not content_type:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in _COMPRESSIBLE_IMAGES:
+        return True
+    return media_type not in _INCOMPRESSIBLE_TYPES and not media_type.startswith(_INCOMPRESSIBLE_PREFIXES)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=level)
+        else:
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Часть сбрасывается целиком, чтобы клиент получил её без ожидания следующей.
+        if self.encoding == BROTLI:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Чистое ASGI-middleware (как MetricsMiddleware): начало ответа придерживается
+    до первой части тела, по которой решается, сжимать ли ответ.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {GZIP: gzip_level, BROTLI: brotli_quality}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        level = self.levels[encoding]
+        start_message = None
+        passthrough = False
+        compressor: _StreamCompressor | None = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough, compressor
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                # Расширения ASGI (например, http.response.pathsend) отдаются как есть.
+                passthrough = True
+                if start_message is not None and compressor is None:
+                    await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                data = compressor.chunk(body) if more_body else compressor.finish(body)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(scope=start_message)
+            if (
+                start_message["status"] < 200
+                or start_message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or "no-transform" in headers.get("cache-control", "")
+                or not compressible_type(headers.get("content-type"))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding, level)
+                data = compressor.chunk(body)
+            else:
+                data = compress(body, encoding, level)
+                headers["Content-Length"] = str(len(data))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
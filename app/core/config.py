@@ -8,13 +8,64 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
 
-    AVATAR_UPLOAD_DIR: str = "static/avatars"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    MEDIA_UPLOAD_DIR: str = "static/media"
+    PHOTO_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600
+    MEDIA_GC_GRACE_HOURS: int = 24
     BASE_STATIC_URL: str = "https://testdomain.com/static"
 
     ROUTE_TYPE_UUID: str
     POST_TYPE_UUID: str
     NEWS_TYPE_UUID: str
 
+    DICTIONARY_REFRESH_SECONDS: int = 300
+    DICTIONARY_CACHE_MAX_AGE: int = 86400
+
+    ENGAGEMENT_WRITE_BEHIND: bool = False
+    ENGAGEMENT_FLUSH_INTERVAL_MS: int = 500
+
+    RATING_PRIOR_MEAN: float = 3.5
+    RATING_PRIOR_WEIGHT: float = 10.0
+
+    TRENDING_REFRESH_SECONDS: int = 60
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_WINDOW_DAYS: int = 7
+
+    NOTIFICATIONS_FANOUT_BATCH_SIZE: int = 1000
+
+    NEWS_FEED_SIZE: int = 50
+    NEWS_CACHE_MAX_AGE: int = 30
+    ADMIN_BULK_MAX_USERS: int = 5000
+    # Строк за одно чтение серверного курсора при выгрузке маршрутов (/admin/export/routes).
+    ROUTES_EXPORT_BATCH_SIZE: int = 500
+
+    STATS_ROLLUP_INTERVAL_SECONDS: int = 300
+    # Часовой пояс, в котором считаются сутки статистики.
+    STATS_TIMEZONE: str = "UTC"
+
+    # /metrics доступен без авторизации приложения: включайте только за внутренней сетью
+    # или вместе с METRICS_TOKEN (Prometheus передаёт его через authorization/bearer_token).
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None
+    # Сериализация тяжёлых ответов через app.api.serialization (false — обычный путь FastAPI).
+    FAST_JSON_RESPONSES: bool = True
+
+    # Сжатие ответов (app.core.compression); уровни выбраны по benchmarks.compression.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Заранее сериализованные ответы (справочники, новости) сжимаются один раз при сборке снимка.
+    COMPRESSION_CACHED_GZIP_LEVEL: int = 9
+    COMPRESSION_CACHED_BROTLI_QUALITY: int = 11
+
+    # Режим отладки SQL для разработки и тестов (app.core.query_audit).
+    QUERY_DEBUG: bool = False
+    QUERY_BUDGET_STRICT: bool = False
+    QUERY_REPEAT_THRESHOLD: int = 3
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,39 @@
+"""
+Обработка изображений. Функции модуля выполняются в дочерних процессах пула
+(см. app.core.tasks.ProcessPool), поэтому модуль не импортирует настройки
+и остальное приложение.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+# Защита от «бомб» распаковки: изображения больше 50 Мп не обрабатываются.
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+WEBP_QUALITY = 80
+
+
+def render_variants(src_path: str, dest_dir: str, stem: str, sizes: tuple[int, ...]) -> dict[str, str]:
+    """
+    Создаёт уменьшенные WebP-копии изображения: для каждого size — вписанную
+    в квадрат size×size (пропорции сохраняются, увеличение не делается).
+    Returns:
+        {str(size): имя файла в dest_dir}
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    variants = {}
+    with Image.open(src_path) as image:
+        # Для JPEG декодирует сразу в уменьшенном масштабе — в разы быстрее полного декодирования.
+        image.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "P", "PA") else "RGB")
+        # От большего размера к меньшему: каждый вариант уменьшается из предыдущего.
+        variant = image
+        for size in sorted(sizes, reverse=True):
+            variant = variant.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+            filename = f"{stem}_{size}.webp"
+            variant.save(os.path.join(dest_dir, filename), "WEBP", quality=WEBP_QUALITY, method=4)
+            variants[str(size)] = filename
+    return variants
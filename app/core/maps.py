@@ -0,0 +1,193 @@
+"""
+Растеризация маршрута в небольшую PNG-картинку (превью для карточек) без тайловых
+серверов: линия маршрута и точки старта/финиша на однотонном фоне.
+Функции модуля выполняются в дочерних процессах пула (см. app.core.tasks.ProcessPool),
+поэтому модуль не импортирует настройки и остальное приложение.
+"""
+import hashlib
+import os
+import struct
+import zlib
+
+import numpy as np
+
+WIDTH = 320
+HEIGHT = 200
+PADDING = 16
+LINE_RADIUS = 2.2
+MARKER_RADIUS = 5.0
+
+BACKGROUND = np.array([242, 239, 233], dtype=np.float32)
+LINE_COLOR = np.array([220, 68, 55], dtype=np.float32)
+START_COLOR = np.array([46, 160, 67], dtype=np.float32)
+FINISH_COLOR = np.array([33, 33, 33], dtype=np.float32)
+_BACKGROUND_FRAME = np.tile(BACKGROUND.astype(np.uint8), (WIDTH * HEIGHT, 1))
+
+# Меняется при любом изменении внешнего вида, чтобы не переиспользовать старые картинки.
+RENDER_VERSION = b"v1"
+
+WKB_LINESTRING = 2
+
+
+def parse_wkb_linestring(wkb: bytes) -> np.ndarray:
+    """
+    Координаты (lon, lat) LINESTRING из WKB/EWKB без сторонних библиотек.
+    """
+    byte_order = "<" if wkb[0] == 1 else ">"
+    (geom_type,) = struct.unpack_from(f"{byte_order}I", wkb, 1)
+    offset = 5
+    if geom_type & 0x20000000:  # EWKB с SRID
+        offset += 4
+    has_z = bool(geom_type & 0x80000000) or (geom_type & 0xFFFF) // 1000 in (1, 3)
+    has_m = bool(geom_type & 0x40000000) or (geom_type & 0xFFFF) // 1000 in (2, 3)
+    if (geom_type & 0xFFFF) % 1000 != WKB_LINESTRING:
+        raise ValueError("Ожидается LINESTRING")
+    (count,) = struct.unpack_from(f"{byte_order}I", wkb, offset)
+    dims = 2 + has_z + has_m
+    coords = np.frombuffer(wkb, dtype=f"{byte_order}f8", count=count * dims, offset=offset + 4)
+    return coords.reshape(count, dims)[:, :2].astype(np.float64)
+
+
+def geometry_hash(coords: np.ndarray) -> str:
+    """
+    Хеш геометрии (с точностью ~10 см) и версии отрисовки — имя файла превью.
+    """
+    rounded = np.round(np.asarray(coords, dtype=np.float64), 6)
+    return hashlib.sha256(RENDER_VERSION + rounded.tobytes()).hexdigest()
+
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    """
+    Равнопромежуточная проекция с поправкой на широту, вписанная в кадр с отступами.
+    """
+    lon, lat = coords[:, 0], coords[:, 1]
+    x = lon * np.cos(np.radians(lat.mean()))
+    y = -lat
+    xy = np.stack([x, y], axis=1)
+    lo = xy.min(axis=0)
+    span = xy.max(axis=0) - lo
+    scale = min(
+        (WIDTH - 2 * PADDING) / span[0] if span[0] > 0 else np.inf,
+        (HEIGHT - 2 * PADDING) / span[1] if span[1] > 0 else np.inf,
+    )
+    if not np.isfinite(scale):
+        scale = 1.0
+    center = np.array([WIDTH, HEIGHT]) / 2
+    return (xy - lo - span / 2) * scale + center
+
+
+def _disc(radius: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Смещения пикселей диска в плоском массиве кадра и их покрытие
+    (сглаживание края на 1 пиксель).
+    """
+    r = int(np.ceil(radius + 1))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    coverage = np.clip(radius + 0.5 - np.hypot(dx, dy), 0.0, 1.0)
+    mask = coverage > 0
+    return (dy * WIDTH + dx)[mask], coverage[mask].astype(np.float32)
+
+
+_LINE_DISC = _disc(LINE_RADIUS)
+_MARKER_DISC = _disc(MARKER_RADIUS)
+# Центры дисков не ближе этого к краю кадра, чтобы смещения не «переносились» на соседнюю строку.
+_EDGE = int(np.ceil(MARKER_RADIUS + 1))
+
+
+def _stamp(alpha: np.ndarray, points: np.ndarray, disc) -> None:
+    """
+    Отпечатывает диск в каждой точке: alpha = max(alpha, покрытие).
+    Центры сводятся к уникальным пикселям, поэтому на каждом смещении диска
+    индексы не повторяются и можно обойтись обычной векторной записью.
+    """
+    px = np.clip(np.rint(points[:, 0]).astype(np.int64), _EDGE, WIDTH - 1 - _EDGE)
+    py = np.clip(np.rint(points[:, 1]).astype(np.int64), _EDGE, HEIGHT - 1 - _EDGE)
+    seen = np.zeros(WIDTH * HEIGHT, dtype=bool)
+    seen[py * WIDTH + px] = True
+    centers = np.flatnonzero(seen)
+    flat = alpha.reshape(-1)
+    for offset, coverage in zip(*disc):
+        target = centers + offset
+        flat[target] = np.maximum(flat[target], coverage)
+
+
+def _densify(xy: np.ndarray, step: float = 0.5) -> np.ndarray:
+    """
+    Точки вдоль ломаной с шагом не больше step пикселей.
+    """
+    if len(xy) < 2:
+        return xy
+    seg = np.diff(xy, axis=0)
+    counts = np.maximum(np.ceil(np.hypot(seg[:, 0], seg[:, 1]) / step).astype(np.int64), 1)
+    t = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = t / np.repeat(counts, counts)
+    starts = np.repeat(xy[:-1], counts, axis=0)
+    return np.vstack([starts + np.repeat(seg, counts, axis=0) * t[:, None], xy[-1:]])
+
+
+def encode_png(rgb: np.ndarray) -> bytes:
+    """
+    Кодирует RGB-массив (H, W, 3) uint8 в PNG (без фильтров строк, zlib).
+    """
+    height, width, _ = rgb.shape
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_route(coords: np.ndarray) -> bytes:
+    """
+    PNG WIDTH×HEIGHT с линией маршрута по координатам (lon, lat) и маркерами старта и финиша.
+    """
+    xy = _project(np.asarray(coords, dtype=np.float64))
+    line = np.zeros((HEIGHT, WIDTH), dtype=np.float32)
+    _stamp(line, _densify(xy), _LINE_DISC)
+    start = np.zeros_like(line)
+    _stamp(start, xy[:1], _MARKER_DISC)
+    finish = np.zeros_like(line)
+    _stamp(finish, xy[-1:], _MARKER_DISC)
+
+    image = _BACKGROUND_FRAME.copy()
+    # Смешивание только там, где слой не прозрачен: линия занимает малую долю кадра.
+    for alpha, color in ((line, LINE_COLOR), (start, START_COLOR), (finish, FINISH_COLOR)):
+        flat = alpha.reshape(-1)
+        covered = np.flatnonzero(flat)
+        base = image[covered].astype(np.float32)
+        image[covered] = (base + (color - base) * flat[covered, None] + 0.5).astype(np.uint8)
+    return encode_png(image.reshape(HEIGHT, WIDTH, 3))
+
+
+def render_batch(jobs: list[tuple[np.ndarray, str]]) -> list[bool]:
+    """
+    Рендерит пачку превью [(координаты, путь файла)]; существующие файлы
+    (та же геометрия) не перерисовываются, у них только обновляется время изменения. Пачки уменьшают накладные расходы
+    на передачу задач между процессами при массовой генерации.
+    Returns:
+        Для каждой задачи — удалось ли получить файл.
+    """
+    results = []
+    for coords, path in jobs:
+        try:
+            if os.path.exists(path):
+                # Файл снова используется: сборка мусора не удалит его в грейс-период.
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.part"
+                with open(tmp_path, "wb") as out:
+                    out.write(render_route(coords))
+                os.replace(tmp_path, path)
+            results.append(True)
+        except Exception:
+            results.append(False)
+    return results
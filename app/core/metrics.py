@@ -0,0 +1,233 @@
+"""
+Метрики Prometheus: задержка HTTP-запросов по шаблону маршрута, запросы в работе,
+число SQL-запросов и время в БД на HTTP-запрос, состояние пула соединений и время bcrypt.
+
+Счётчики SQL собираются событиями before/after_cursor_execute движка в объект
+QueryStats текущего запроса (contextvar). Синхронные эндпоинты выполняются в пуле
+потоков с копией контекста, поэтому видят тот же объект, что и middleware.
+"""
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+# Метод из запроса попадает в метки как есть только из этого списка: произвольные
+# методы клиентов иначе порождали бы новые ряды метрик.
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+OTHER_METHOD = "OTHER"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов на HTTP-запрос",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Суммарное время SQL-запросов на HTTP-запрос",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+BCRYPT_SECONDS = Histogram(
+    "bcrypt_duration_seconds",
+    "Время хеширования и проверки паролей bcrypt",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+
+
+@dataclass
+class QueryStats:
+    """
+    SQL-запросы одного HTTP-запроса. Тексты запросов записываются,
+    только если statements — список (режим QUERY_DEBUG, см. app.core.query_audit).
+    """
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] | None = None
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+@contextmanager
+def collect_queries(stats: QueryStats):
+    """
+    Учитывает SQL-запросы, выполненные внутри блока (в этом контексте), в stats.
+    """
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute не вызывается для упавшего запроса.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Подключает подсчёт SQL-запросов и метрики пула к движку (повторный вызов ничего не делает).
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        REGISTRY.register(PoolCollector(engine))
+
+
+class PoolCollector:
+    """
+    Состояние пула соединений на момент сбора метрик (для QueuePool, пула по умолчанию).
+    """
+
+    def __init__(self, engine: Engine):
+        self._pool = engine.pool
+
+    def collect(self):
+        pool = self._pool
+        if not isinstance(pool, QueuePool):
+            return
+        for name, documentation, value in (
+            ("db_pool_size", "Размер пула соединений", pool.size()),
+            ("db_pool_checked_out", "Соединения, выданные из пула", pool.checkedout()),
+            ("db_pool_overflow", "Соединения сверх размера пула", pool.overflow()),
+        ):
+            yield GaugeMetricFamily(name, documentation, value=value)
+
+
+class MetricsMiddleware:
+    """
+    Чистое ASGI-middleware (без BaseHTTPMiddleware, чтобы не добавлять задачу
+    и буферизацию на каждый запрос). Шаблон маршрута берётся из scope["route"],
+    который FastAPI заполняет при сопоставлении: метки не зависят от значений
+    path-параметров, и число рядов метрик ограничено числом маршрутов.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # labels() берёт блокировку и ищет ряд на каждый вызов; ряды кешируются.
+        self._in_progress: dict[str, Gauge] = {}
+        self._series: dict[tuple[str, str, int], tuple] = {}
+
+    def _series_for(self, method: str, template: str, status_code: int) -> tuple:
+        key = (method, template, status_code)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = (
+                REQUEST_LATENCY.labels(method, template, str(status_code)),
+                REQUEST_DB_QUERIES.labels(method, template),
+                REQUEST_DB_SECONDS.labels(method, template),
+            )
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else OTHER_METHOD
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        in_progress = self._in_progress.get(method)
+        if in_progress is None:
+            in_progress = self._in_progress[method] = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _query_stats.reset(token)
+            template = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            latency, db_queries, db_seconds = self._series_for(method, template, status_code)
+            latency.observe(elapsed)
+            db_queries.observe(stats.count)
+            db_seconds.observe(stats.seconds)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Метрики в текстовом формате Prometheus. При запуске в нескольких процессах
+    (PROMETHEUS_MULTIPROC_DIR) собираются данные всех воркеров.
+    Если задан METRICS_TOKEN, требуется заголовок Authorization: Bearer <токен>.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        provided = request.headers.get("authorization", "")
+        if not secrets.compare_digest(provided.encode(), f"Bearer {token}".encode()):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
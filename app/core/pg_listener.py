@@ -0,0 +1,109 @@
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def notify(db: Session, channel: str, payload: str = "") -> None:
+    """
+    Ставит NOTIFY в текущую транзакцию: слушатели получат его только после commit,
+    а при rollback уведомление не уйдёт.
+    """
+    db.execute(sa_select(func.pg_notify(channel, payload)))
+
+
+class PgListener:
+    """
+    Фоновый поток с выделенным соединением, выполняющий LISTEN на каналах Postgres
+    и вызывающий обработчики при NOTIFY. Уведомления, пришедшие пачкой, схлопываются:
+    каждый обработчик канала вызывается один раз за пачку.
+
+    Пока соединения нет, уведомления теряются, поэтому после каждого (пере)подключения
+    обработчики вызываются с payload=None — это сигнал заново синхронизировать состояние.
+    """
+
+    POLL_TIMEOUT = 1.0
+    RECONNECT_DELAY = 5.0
+
+    def __init__(self, name: str = "pg-listener"):
+        self.name = name
+        self._handlers: dict[str, list[Callable[[str | None], None]]] = defaultdict(list)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, channel: str, handler: Callable[[str | None], None]) -> None:
+        self._handlers[channel].append(handler)
+
+    def start(self) -> None:
+        if not self._handlers or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _dispatch(self, channel: str, payload: str | None) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Ошибка обработчика уведомления %s", channel)
+
+    def _connect(self):
+        # Соединение отсоединяется от пула: оно занято LISTEN всё время жизни воркера.
+        connection = engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.dbapi_connection
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            for channel in self._handlers:
+                cursor.execute(f'LISTEN "{channel}"')
+        return connection
+
+    def _listen(self, dbapi_connection) -> None:
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([dbapi_connection], [], [], self.POLL_TIMEOUT)
+            if not ready:
+                continue
+            dbapi_connection.poll()
+            pending: dict[str, str] = {}
+            while dbapi_connection.notifies:
+                notification = dbapi_connection.notifies.pop(0)
+                pending[notification.channel] = notification.payload
+            for channel, payload in pending.items():
+                self._dispatch(channel, payload)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                for channel in self._handlers:
+                    self._dispatch(channel, None)
+                self._listen(connection.dbapi_connection)
+            except Exception:
+                logger.exception("Соединение %s потеряно, переподключение через %s с", self.name, self.RECONNECT_DELAY)
+                self._stop_event.wait(self.RECONNECT_DELAY)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+listener = PgListener()
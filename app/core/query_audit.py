@@ -0,0 +1,122 @@
+"""
+Режим отладки SQL (QUERY_DEBUG) для разработки и тестов: все запросы HTTP-запроса
+записываются, повторяющиеся запросы одной формы (типичный N+1) попадают в лог,
+а превышение бюджета, объявленного на эндпоинте через @query_budget, логируется
+или, при QUERY_BUDGET_STRICT, завершает запрос исключением QueryBudgetExceeded
+(TestClient пробрасывает его в тест).
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from app.core.metrics import UNMATCHED_ROUTE, QueryStats, collect_queries, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTR = "__query_budget__"
+QUERY_COUNT_HEADER = b"x-db-queries"
+
+_PARAM = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_PARAM_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Объявляет максимальное число SQL-запросов эндпоинта (включая зависимости,
+    например get_current_user). Ставится под декоратором маршрута:
+
+        @router.get("/me")
+        @query_budget(1)
+        def get_self_info(...): ...
+    """
+    def decorator(func):
+        setattr(func, QUERY_BUDGET_ATTR, max_queries)
+        return func
+    return decorator
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Форма запроса: параметры и списки параметров IN (...) заменены на «?».
+    """
+    shape = _PARAM.sub("?", statement)
+    shape = _PARAM_LIST.sub("(?...)", shape)
+    return " ".join(shape.split())
+
+
+def repeated_shapes(statements: list[str], threshold: int) -> list[tuple[str, int]]:
+    """
+    Формы запросов, выполненные не меньше threshold раз, от самых частых.
+    """
+    counts = Counter(statement_shape(s) for s in statements)
+    return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+
+@contextmanager
+def capture_queries():
+    """
+    Записывает SQL-запросы, выполненные в блоке в текущем потоке, например
+    при прямом вызове функций crud в скриптах и тестах:
+
+        with capture_queries() as stats:
+            get_favorites(db, user)
+        assert stats.count <= 5, stats.statements
+    """
+    with collect_queries(QueryStats(statements=[])) as stats:
+        yield stats
+
+
+class QueryAuditMiddleware:
+    """
+    ASGI-middleware режима QUERY_DEBUG. Если запросы уже учитывает MetricsMiddleware,
+    использует его QueryStats, иначе заводит свой. Добавляет заголовок
+    X-DB-Queries с числом запросов на момент начала ответа.
+    """
+
+    def __init__(self, app, strict: bool = False, repeat_threshold: int = 3):
+        self.app = app
+        self.strict = strict
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_query_stats()
+        if stats is None:
+            with collect_queries(QueryStats(statements=[])) as stats:
+                await self._run(scope, receive, send, stats)
+        else:
+            stats.statements = []
+            await self._run(scope, receive, send, stats)
+        self._check(scope, stats)
+
+    async def _run(self, scope, receive, send, stats: QueryStats) -> None:
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER, str(stats.count).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _check(self, scope, stats: QueryStats) -> None:
+        route = scope.get("route")
+        endpoint = f'{scope["method"]} {getattr(route, "path", UNMATCHED_ROUTE)}'
+        for shape, count in repeated_shapes(stats.statements, self.repeat_threshold):
+            logger.warning("%s: запрос одной формы выполнен %s раз (N+1?): %s", endpoint, count, shape[:500])
+
+        budget = getattr(getattr(route, "endpoint", None), QUERY_BUDGET_ATTR, None)
+        if budget is None or stats.count <= budget:
+            return
+        message = f"{endpoint}: {stats.count} SQL-запросов при бюджете {budget}"
+        if self.strict:
+            raise QueryBudgetExceeded(message + "\n" + "\n".join(statement_shape(s) for s in stats.statements))
+        logger.warning(message)
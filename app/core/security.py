@@ -3,6 +3,7 @@ import jwt
 
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.core.metrics import BCRYPT_SECONDS
 from fastapi import HTTPException, status
 from jwt import ExpiredSignatureError, InvalidTokenError
 
@@ -15,14 +16,16 @@ def hash_password(password: str) -> str:
     Возвращает строку с солью и хешем.
     """
     salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    with BCRYPT_SECONDS.labels("hash").time():
+        hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет совпадение пароля пользователя с хешем из БД.
     """
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    with BCRYPT_SECONDS.labels("verify").time():
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
 def verify_access_token(token: str) -> tuple[str, str]:
@@ -0,0 +1,78 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Фоновый поток, вызывающий func раз в interval секунд.
+    Ошибки внутри func логируются и не останавливают поток.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Ошибка в фоновой задаче %s", self.name)
+
+
+class ProcessPool:
+    """
+    Пул процессов для CPU-тяжёлых задач (обработка изображений), создаваемый
+    при первом обращении. Процессы запускаются через spawn: дочерний процесс
+    не наследует потоки и соединения с БД родителя.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, on_done: Callable[[Future], None] | None = None) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            future = self._executor.submit(fn, *args)
+        if on_done:
+            future.add_done_callback(on_done)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+# Пул для обработки изображений (фотографии, аватары).
+image_pool = ProcessPool(settings.IMAGE_WORKERS)
@@ -0,0 +1,63 @@
+import os
+import uuid
+
+from fastapi import HTTPException, UploadFile, status
+
+CHUNK_SIZE = 1024 * 1024
+
+# Сигнатуры форматов изображений: все (смещение, байты) должны совпасть.
+IMAGE_SIGNATURES = (
+    (((0, b"\xff\xd8\xff"),), ".jpg"),
+    (((0, b"\x89PNG\r\n\x1a\n"),), ".png"),
+    (((0, b"GIF87a"),), ".gif"),
+    (((0, b"GIF89a"),), ".gif"),
+    (((0, b"RIFF"), (8, b"WEBP")), ".webp"),
+)
+
+
+def detect_image_extension(file: UploadFile) -> str:
+    """
+    Определяет формат изображения по первым байтам файла (имя файла и
+    Content-Type клиента не учитываются) и возвращает расширение.
+    Raises:
+        HTTPException: 400, если формат не поддерживается.
+    """
+    header = file.file.read(16)
+    file.file.seek(0)
+    for parts, ext in IMAGE_SIGNATURES:
+        if all(header[offset:offset + len(magic)] == magic for offset, magic in parts):
+            return ext
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Недопустимый формат файла")
+
+
+def save_upload(file: UploadFile, dest_path: str, max_bytes: int, hasher=None) -> int:
+    """
+    Потоково записывает загруженный файл на диск кусками по CHUNK_SIZE байт.
+    Файл пишется во временный путь и переименовывается только после успешной
+    записи целиком, поэтому по dest_path никогда не бывает недописанного файла.
+    Если передан hasher (hashlib), он обновляется содержимым по ходу записи.
+    Raises:
+        HTTPException: 413, если файл больше max_bytes (записанное удаляется).
+    Returns:
+        Размер файла в байтах.
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.part"
+    written = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            while chunk := file.file.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Файл больше допустимых {max_bytes // (1024 * 1024)} МБ"
+                    )
+                out.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+        os.replace(tmp_path, dest_path)
+        return written
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,9 +1,22 @@
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import UUID
+from sqlalchemy import delete, exists, func, or_, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status, Depends
+from app.core.config import settings
+from app.crud import counters, media
+from app.crud import routes as routes_crud
 from app.crud.users import get_user
+from app.models.bridging import RoutesUsersRates
+from app.models.comments import Comment
+from app.models.photos import Photo
+from app.models.posts import Post
+from app.models.routes import Route
 from app.models.users import DBUser, UserRole
+from app.schemas.admin import BulkUserFilter
 from app.core.security import hash_password, verify_password, check_password_strength
 
 
@@ -29,7 +42,11 @@ def delete_user_by_identifier(
             detail="Нельзя удалять администратора"
         )
     try:
+        engagement = _collect_engagement(db, [user.uuid])
+        media.release(db, user.profile_picture)
         db.delete(user)
+        db.flush()
+        _subtract_engagement(db, engagement, {user.uuid})
         db.commit()
     except SQLAlchemyError:
         db.rollback()
@@ -189,4 +206,297 @@ def get_user_info(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пользователь не найден"
         )
-    return user
\ No newline at end of file
+    return user
+
+
+BULK_OK = "ok"
+BULK_NOT_FOUND = "not_found"
+BULK_FORBIDDEN = "forbidden"
+BULK_UNCHANGED = "unchanged"
+BULK_CONFLICT = "conflict"
+
+
+def _owns_content():
+    """
+    Есть ли у пользователя данные, которые не удаляются вместе с ним (внешние ключи без CASCADE).
+    """
+    return or_(
+        exists().where(Route.creator_uuid == DBUser.uuid),
+        exists().where(Route.last_edited_by_uuid == DBUser.uuid),
+        exists().where(Post.creator_uuid == DBUser.uuid),
+        exists().where(Comment.creator_uuid == DBUser.uuid),
+        exists().where(Photo.creator_uuid == DBUser.uuid),
+    )
+
+
+def _collect_engagement(db: Session, user_uuids: list[UUID]) -> dict[str, list]:
+    """
+    Лайки и оценки пользователей, сгруппированные по (пользователь, объект), —
+    их удаляет каскад вместе с пользователями, а счётчики и агрегаты рейтинга нет.
+    Строки пользователей блокируются до commit: новый лайк или оценка от них
+    ждёт проверки внешнего ключа, поэтому собранные данные не устаревают до удаления.
+    """
+    db.query(DBUser.uuid).filter(DBUser.uuid.in_(user_uuids)).order_by(DBUser.uuid).with_for_update().all()
+    engagement = {}
+    for spec in counters.COUNTERS:
+        user_column = spec.source_model.user_uuid
+        engagement[spec.name] = (
+            db.query(user_column, spec.source_column, func.count())
+            .filter(user_column.in_(user_uuids))
+            .group_by(user_column, spec.source_column)
+            .all()
+        )
+    engagement["ratings"] = (
+        db.query(
+            RoutesUsersRates.user_uuid,
+            RoutesUsersRates.route_uuid,
+            func.sum(RoutesUsersRates.rating),
+            func.count(),
+        )
+        .filter(RoutesUsersRates.user_uuid.in_(user_uuids))
+        .group_by(RoutesUsersRates.user_uuid, RoutesUsersRates.route_uuid)
+        .all()
+    )
+    return engagement
+
+
+def _subtract_engagement(db: Session, engagement: dict[str, list], deleted: set[UUID]) -> None:
+    """
+    Вычитает лайки и оценки удалённых пользователей (deleted) из likes_count
+    и агрегатов рейтинга — по одному UPDATE на счётчик, в текущей транзакции.
+    """
+    for spec in counters.COUNTERS:
+        deltas = defaultdict(int)
+        for user_uuid, target_uuid, count in engagement[spec.name]:
+            if user_uuid in deleted:
+                deltas[target_uuid] -= count
+        counters.apply_deltas(db, spec, deltas)
+    removed = defaultdict(lambda: (0.0, 0))
+    for user_uuid, route_uuid, rating_sum, rating_count in engagement["ratings"]:
+        if user_uuid in deleted:
+            total_sum, total_count = removed[route_uuid]
+            removed[route_uuid] = (total_sum + rating_sum, total_count + rating_count)
+    routes_crud.subtract_ratings(db, dict(removed))
+
+
+def _bulk_targets(
+    db: Session,
+    current_user: DBUser,
+    identifiers: list[str] | None,
+    user_filter: BulkUserFilter | None,
+) -> list[tuple[str, object | None]]:
+    """
+    Один SELECT по всем выбранным пользователям.
+    Returns:
+        [(идентификатор, строка пользователя или None)] в порядке запроса.
+        При выборе фильтром идентификатор — логин, администраторы и сам
+        текущий пользователь под фильтр не попадают.
+    """
+    query = db.query(
+        DBUser.uuid, DBUser.login, DBUser.email, DBUser.role, DBUser.is_blocked,
+        _owns_content().label("owns_content"),
+    )
+    if identifiers is not None:
+        identifiers = list(dict.fromkeys(identifiers))
+        if len(identifiers) > settings.ADMIN_BULK_MAX_USERS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"За один запрос можно обработать не больше {settings.ADMIN_BULK_MAX_USERS} пользователей"
+            )
+        logins = [i for i in identifiers if "@" not in i]
+        emails = [i for i in identifiers if "@" in i]
+        rows = query.filter(or_(
+            func.lower(DBUser.login).in_(logins),
+            func.lower(DBUser.email).in_(emails),
+        )).all()
+        by_key = {}
+        for row in rows:
+            by_key[row.login.lower()] = row
+            by_key[row.email.lower()] = row
+        return [(identifier, by_key.get(identifier)) for identifier in identifiers]
+
+    query = query.filter(DBUser.role != UserRole.admin, DBUser.uuid != current_user.uuid)
+    if user_filter.registered_within_hours:
+        query = query.filter(DBUser.created_at >= func.now() - timedelta(hours=user_filter.registered_within_hours))
+    if user_filter.without_routes:
+        query = query.filter(~exists().where(Route.creator_uuid == DBUser.uuid))
+    rows = query.order_by(DBUser.login).limit(settings.ADMIN_BULK_MAX_USERS + 1).all()
+    if len(rows) > settings.ADMIN_BULK_MAX_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Под фильтр попадает больше {settings.ADMIN_BULK_MAX_USERS} пользователей, уточните его"
+        )
+    return [(row.login, row) for row in rows]
+
+
+def _bulk_execute(
+    db: Session,
+    current_user: DBUser,
+    targets: list[tuple[str, object | None]],
+    check: Callable[[object], tuple[str, str] | None],
+    statement: Callable[[list[UUID]], object],
+    error_detail: str,
+    on_done: Callable[[list], None] | None = None,
+    before: Callable[[list[UUID]], None] | None = None,
+) -> dict:
+    """
+    Общая схема массовой операции: проверки по результатам одного SELECT,
+    затем один UPDATE/DELETE ... RETURNING по всем прошедшим проверки.
+    statement повторяет проверки в WHERE, поэтому пользователь, изменившийся
+    между SELECT и записью, не затрагивается и получает статус conflict.
+    before вызывается с uuid прошедших проверки перед записью,
+    on_done получает затронутые строки (uuid, profile_picture) до commit.
+    """
+    items = []
+    eligible: dict[UUID, list[int]] = {}
+    for identifier, row in targets:
+        if row is None:
+            outcome = (BULK_NOT_FOUND, "Пользователь не найден")
+        elif row.uuid == current_user.uuid:
+            outcome = (BULK_FORBIDDEN, "Нельзя применять операцию к себе")
+        elif row.role == UserRole.admin:
+            outcome = (BULK_FORBIDDEN, "Нельзя применять операцию к администратору")
+        else:
+            outcome = check(row)
+        if outcome is None:
+            eligible.setdefault(row.uuid, []).append(len(items))
+            outcome = (BULK_OK, None)
+        items.append({"identifier": identifier, "status": outcome[0], "detail": outcome[1]})
+
+    done = set()
+    if eligible:
+        try:
+            if before:
+                before(list(eligible))
+            rows = db.execute(
+                statement(list(eligible))
+                .returning(DBUser.uuid, DBUser.profile_picture)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if on_done:
+                on_done(rows)
+            done = {row.uuid for row in rows}
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=error_detail
+            )
+        for user_uuid, positions in eligible.items():
+            if user_uuid not in done:
+                for i in positions:
+                    items[i]["status"] = BULK_CONFLICT
+                    items[i]["detail"] = "Пользователь изменился во время операции"
+    return {"processed": len(done), "items": items}
+
+
+def _bulk_where(current_user: DBUser, user_uuids: list[UUID]) -> tuple:
+    return (
+        DBUser.uuid.in_(user_uuids),
+        DBUser.role != UserRole.admin,
+        DBUser.uuid != current_user.uuid,
+    )
+
+
+def bulk_toggle_user_status(
+    db: Session,
+    current_user: DBUser,
+    identifiers: list[str] | None,
+    user_filter: BulkUserFilter | None,
+    block_user: bool,
+    block_reason: str | None = None,
+) -> dict:
+    """
+    Блокирует или разблокирует пользователей одним UPDATE.
+    Администраторы и сам текущий пользователь пропускаются.
+    """
+    if block_user and not block_reason:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Укажите причину блокировки"
+        )
+    targets = _bulk_targets(db, current_user, identifiers, user_filter)
+
+    def check(row):
+        if row.is_blocked == block_user:
+            return BULK_UNCHANGED, "Уже заблокирован" if block_user else "Уже активен"
+        return None
+
+    def statement(user_uuids):
+        return (
+            update(DBUser)
+            .where(*_bulk_where(current_user, user_uuids), DBUser.is_blocked.is_(not block_user))
+            .values(
+                is_blocked=block_user,
+                block_reason=block_reason if block_user else None,
+                block_date=func.now() if block_user else None,
+            )
+        )
+
+    return _bulk_execute(db, current_user, targets, check, statement, "Ошибка при обновлении статуса пользователей")
+
+
+def bulk_change_user_role(
+    db: Session,
+    current_user: DBUser,
+    identifiers: list[str] | None,
+    user_filter: BulkUserFilter | None,
+    new_role: UserRole,
+) -> dict:
+    """
+    Меняет роль пользователей одним UPDATE.
+    Администраторы и сам текущий пользователь пропускаются.
+    """
+    targets = _bulk_targets(db, current_user, identifiers, user_filter)
+
+    def check(row):
+        if row.role == new_role:
+            return BULK_UNCHANGED, f"Пользователь уже имеет роль '{new_role.value}'"
+        return None
+
+    def statement(user_uuids):
+        return (
+            update(DBUser)
+            .where(*_bulk_where(current_user, user_uuids), DBUser.role != new_role)
+            .values(role=new_role)
+        )
+
+    return _bulk_execute(db, current_user, targets, check, statement, "Ошибка при смене роли пользователей")
+
+
+def bulk_delete_users(
+    db: Session,
+    current_user: DBUser,
+    identifiers: list[str] | None,
+    user_filter: BulkUserFilter | None,
+) -> dict:
+    """
+    Удаляет пользователей одним DELETE. Администраторы, сам текущий пользователь
+    и пользователи с маршрутами, постами, комментариями или фотографиями
+    пропускаются (их можно заблокировать). В той же транзакции снимаются ссылки
+    на аватары, а их лайки и оценки вычитаются из счётчиков и рейтингов.
+    """
+    targets = _bulk_targets(db, current_user, identifiers, user_filter)
+
+    def check(row):
+        if row.owns_content:
+            return BULK_CONFLICT, "У пользователя есть маршруты, посты, комментарии или фотографии"
+        return None
+
+    def statement(user_uuids):
+        return delete(DBUser).where(*_bulk_where(current_user, user_uuids), ~_owns_content())
+
+    engagement = {}
+
+    def collect_engagement(user_uuids):
+        engagement.update(_collect_engagement(db, user_uuids))
+
+    def release_deleted(rows):
+        media.release_many(db, [row.profile_picture for row in rows])
+        _subtract_engagement(db, engagement, {row.uuid for row in rows})
+
+    return _bulk_execute(
+        db, current_user, targets, check, statement, "Ошибка при удалении пользователей",
+        on_done=release_deleted, before=collect_engagement,
+    )
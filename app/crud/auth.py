@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
@@ -12,10 +13,13 @@ from app.core.security import (
     generate_reset_token,
     verify_reset_token
 )
+from app.crud.stats import record_user_activity
 from app.crud.users import get_user, ensure_email_unique, ensure_login_unique
 from app.core.security import check_password_strength
 from app.schemas.users import UserRegister
 
+logger = logging.getLogger(__name__)
+
 
 def register_user(
         db: Session,
@@ -64,6 +68,7 @@ def authenticate_user(
                 detail="Учетная запись заблокирована"
             )
         user.last_login = datetime.now(timezone.utc)
+        record_user_activity(db, user.uuid, login=True)
         db.commit()
         return {
             "access_token": create_access_token(subject=user.login, role=user.role.value),
@@ -89,6 +94,12 @@ def refresh_access_token(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недействительный или заблокированный пользователь"
         )
+    try:
+        record_user_activity(db, user.uuid, login=False)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("Не удалось отметить активность пользователя %s", user.login)
     return {
         "access_token": create_access_token(subject=user.login, role=user.role.value),
         "refresh_token": create_refresh_token(subject=user.login, role=user.role.value),
@@ -99,7 +110,7 @@ def send_reset_email(
         db: Session,
         email: str
 ) -> None:
-    user = db.query(DBUser).filter(DBUser.email == email).first()
+    user = get_user(db, email)
     if not user:
         return
     token = generate_reset_token(user.login)
@@ -113,7 +124,7 @@ def restore_password_from_email(
         new_password: str
 ) -> None:
     login = verify_reset_token(token)
-    user = db.query(DBUser).filter(DBUser.login == login).first()
+    user = get_user(db, login)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from uuid import UUID
@@ -7,37 +7,106 @@ from uuid import UUID
 from app.models.bridging import CommentLike
 from app.models.comments import Comment
 from app.models.users import DBUser
-from app.models.target_types import TargetType
+from app.crud.counters import COMMENT_LIKES
+from app.crud.dictionaries import get_target_type_id
+from app.crud.engagement import add_engagement, remove_engagement
+from app.crud.pagination import encode_cursor, decode_cursor
+from app.crud.photos import delete_target_photos
+from app.crud.users import avatar_column, avatar_url
 from app.schemas.common import UserRole
 
+COMMENT_TARGET_TYPE = "comment"
+
+
+def _comment_to_dict(
+    comment: Comment,
+    creator_login: str | None,
+    creator_avatar: str | None,
+    likes_count: int = 0,
+    is_liked: bool = False,
+) -> dict:
+    return {
+        "uuid": comment.uuid,
+        "comment_text": comment.comment_text,
+        "created_at": comment.created_at,
+        "creator_login": creator_login or "???",
+        "creator_avatar": creator_avatar,
+        "likes_count": likes_count,
+        "is_liked": is_liked,
+    }
+
 
 def get_comments(
     db: Session,
     target_type: str,
     target_uuid: UUID,
-    current_user: DBUser | None = None
-):
+    current_user: DBUser | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+    threaded: bool = False,
+    replies_limit: int = 3,
+) -> dict:
+    """
+    Страница комментариев к сущности с keyset-пагинацией по (created_at, uuid).
+    При threaded=True для каждого комментария возвращаются число ответов,
+    первые replies_limit ответов и курсор для догрузки остальных
+    через GET /comments/comment/{uuid}?cursor=...
+    """
     try:
-        target_type_obj = db.query(TargetType).filter(TargetType.name == target_type).first()
-        if not target_type_obj:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный тип сущности")
-        target_type_id = target_type_obj.uuid
+        target_type_id = get_target_type_id(target_type)
 
-        comments = (
-            db.query(Comment)
+        query = (
+            db.query(Comment, DBUser.login, avatar_column().label("profile_picture"))
+            .outerjoin(DBUser, DBUser.uuid == Comment.creator_uuid)
             .filter(Comment.target_type_id == target_type_id, Comment.target_uuid == target_uuid)
-            .order_by(Comment.created_at)
-            .all()
-        )
-        comment_uuids = [c.uuid for c in comments]
-        likes_counts = dict(
-            db.query(CommentLike.comment_uuid, func.count(CommentLike.user_uuid))
-            .filter(CommentLike.comment_uuid.in_(comment_uuids))
-            .group_by(CommentLike.comment_uuid)
-            .all()
         )
+        if cursor:
+            created_at, last_uuid = decode_cursor(cursor)
+            query = query.filter(tuple_(Comment.created_at, Comment.uuid) > (created_at, last_uuid))
+        rows = query.order_by(Comment.created_at, Comment.uuid).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.created_at, last.uuid)
+
+        reply_rows = []
+        replies_counts = {}
+        if threaded and rows:
+            comment_type_id = get_target_type_id(COMMENT_TARGET_TYPE)
+            parent_uuids = [c.uuid for c, _, _ in rows]
+            if replies_limit > 0:
+                position = func.row_number().over(
+                    partition_by=Comment.target_uuid,
+                    order_by=[Comment.created_at, Comment.uuid],
+                ).label("position")
+                ranked = (
+                    db.query(Comment.uuid, position)
+                    .filter(Comment.target_type_id == comment_type_id, Comment.target_uuid.in_(parent_uuids))
+                    .subquery()
+                )
+                reply_rows = (
+                    db.query(Comment, DBUser.login, avatar_column().label("profile_picture"))
+                    .join(ranked, ranked.c.uuid == Comment.uuid)
+                    .outerjoin(DBUser, DBUser.uuid == Comment.creator_uuid)
+                    .filter(ranked.c.position <= replies_limit)
+                    .order_by(Comment.created_at, Comment.uuid)
+                    .all()
+                )
+            replies_counts = dict(
+                db.query(Comment.target_uuid, func.count(Comment.uuid))
+                .filter(
+                    Comment.target_type_id == comment_type_id,
+                    Comment.target_uuid.in_(parent_uuids + [c.uuid for c, _, _ in reply_rows])
+                )
+                .group_by(Comment.target_uuid)
+                .all()
+            )
+
+        comment_uuids = [c.uuid for c, _, _ in rows] + [c.uuid for c, _, _ in reply_rows]
         liked_set = set()
-        if current_user:
+        if comment_uuids and current_user:
             liked_set = set(
                 row[0]
                 for row in db.query(CommentLike.comment_uuid)
@@ -47,21 +116,33 @@ def get_comments(
                 )
                 .all()
             )
-        users = db.query(DBUser).filter(DBUser.uuid.in_([c.creator_uuid for c in comments])).all()
-        user_dict = {u.uuid: u for u in users}
-        result = []
-        for c in comments:
-            user = user_dict.get(c.creator_uuid)
-            result.append({
-                "uuid": c.uuid,
-                "comment_text": c.comment_text,
-                "created_at": c.created_at,
-                "creator_login": user.login if user else "???",
-                "creator_avatar": user.profile_picture if user else None,
-                "likes_count": likes_counts.get(c.uuid, 0),
-                "is_liked": c.uuid in liked_set,
-            })
-        return result
+
+        def build(comment: Comment, login: str | None, avatar: str | None) -> dict:
+            item = _comment_to_dict(
+                comment, login, avatar,
+                likes_count=comment.likes_count,
+                is_liked=comment.uuid in liked_set,
+            )
+            if threaded:
+                item["replies_count"] = replies_counts.get(comment.uuid, 0)
+            return item
+
+        replies_by_parent = {}
+        for c, login, avatar in reply_rows:
+            replies_by_parent.setdefault(c.target_uuid, []).append((c, build(c, login, avatar)))
+
+        items = []
+        for c, login, avatar in rows:
+            item = build(c, login, avatar)
+            if threaded:
+                replies = replies_by_parent.get(c.uuid, [])
+                item["replies"] = [reply for _, reply in replies]
+                if replies and item["replies_count"] > len(replies):
+                    last_reply = replies[-1][0]
+                    item["replies_next_cursor"] = encode_cursor(last_reply.created_at, last_reply.uuid)
+            items.append(item)
+
+        return {"items": items, "next_cursor": next_cursor}
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -86,13 +167,7 @@ def create_comment(
     current_user: DBUser
 ):
     try:
-        target_type_obj = db.query(TargetType).filter(TargetType.name == target_type).first()
-        if not target_type_obj:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Некорректный тип сущности"
-            )
-        target_type_id = target_type_obj.uuid
+        target_type_id = get_target_type_id(target_type)
 
         comment = Comment(
             creator_uuid=current_user.uuid,
@@ -100,21 +175,14 @@ def create_comment(
             target_uuid=target_uuid,
             comment_text=data.comment_text.strip(),
         )
+        # Автор — уже загруженный текущий пользователь; читаем его до commit,
+        # пока объект не истёк, чтобы не перечитывать его из БД.
+        creator_login, creator_avatar = current_user.login, avatar_url(current_user)
         db.add(comment)
         db.commit()
         db.refresh(comment)
 
-        user = db.query(DBUser).filter(DBUser.uuid == current_user.uuid).first()
-
-        return {
-            "uuid": comment.uuid,
-            "comment_text": comment.comment_text,
-            "created_at": comment.created_at,
-            "creator_login": user.login if user else "???",
-            "creator_avatar": user.profile_picture if user else None,
-            "likes_count": 0,
-            "is_liked": False,
-        }
+        return _comment_to_dict(comment, creator_login, creator_avatar)
 
     except HTTPException:
         raise
@@ -151,6 +219,7 @@ def delete_comment(db: Session, comment_id: UUID, current_user: DBUser):
         else:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет прав на удаление комментария")
 
+        delete_target_photos(db, get_target_type_id(COMMENT_TARGET_TYPE), comment.uuid)
         db.delete(comment)
         db.commit()
     except HTTPException:
@@ -168,17 +237,12 @@ def delete_comment(db: Session, comment_id: UUID, current_user: DBUser):
         )
 
 
-def like_comment(db: Session, comment_id: UUID, current_user: DBUser):
+def like_comment(db: Session, comment_id: UUID, current_user: DBUser) -> int:
     try:
-        if not db.query(Comment).filter(Comment.uuid == comment_id).first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Комментарий не найден")
-
-        if db.query(CommentLike).filter_by(user_uuid=current_user.uuid, comment_uuid=comment_id).first():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Комментарий уже лайкнут")
-
-        like = CommentLike(user_uuid=current_user.uuid, comment_uuid=comment_id)
-        db.add(like)
-        db.commit()
+        return add_engagement(
+            db, CommentLike, CommentLike.comment_uuid, comment_id, current_user.uuid, "Комментарий не найден",
+            counter=COMMENT_LIKES,
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -195,17 +259,12 @@ def like_comment(db: Session, comment_id: UUID, current_user: DBUser):
 
 
 
-def unlike_comment(db: Session, comment_id: UUID, current_user: DBUser):
+def unlike_comment(db: Session, comment_id: UUID, current_user: DBUser) -> int:
     try:
-        if not db.query(Comment).filter(Comment.uuid == comment_id).first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Комментарий не найден")
-
-        like = db.query(CommentLike).filter_by(user_uuid=current_user.uuid, comment_uuid=comment_id).first()
-        if not like:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Комментарий не был лайкнут")
-
-        db.delete(like)
-        db.commit()
+        return remove_engagement(
+            db, CommentLike, CommentLike.comment_uuid, comment_id, current_user.uuid, Comment.uuid,
+            "Комментарий не найден", counter=COMMENT_LIKES,
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
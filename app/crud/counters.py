@@ -0,0 +1,174 @@
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import Integer, column, select, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.bridging import RouteLike, CommentLike
+from app.models.comments import Comment
+from app.models.routes import Route
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CounterSpec:
+    """
+    Денормализованный счётчик связей: строка-владелец (pk + колонка счётчика)
+    и таблица связей, из которой счётчик можно пересчитать.
+    """
+    name: str
+    pk: object
+    column: object
+    source_model: object
+    source_column: object
+
+
+ROUTE_LIKES = CounterSpec("route_likes", Route.uuid, Route.likes_count, RouteLike, RouteLike.route_uuid)
+COMMENT_LIKES = CounterSpec("comment_likes", Comment.uuid, Comment.likes_count, CommentLike, CommentLike.comment_uuid)
+COUNTERS = (ROUTE_LIKES, COMMENT_LIKES)
+
+
+def _update_values(spec: CounterSpec, new_value) -> dict:
+    data = {spec.column: new_value}
+    # Route.edited_at обновляется через onupdate; изменение счётчика не является редактированием.
+    edited_at = getattr(spec.pk.class_, "edited_at", None)
+    if edited_at is not None:
+        data[edited_at] = edited_at
+    return data
+
+
+def increment_statement(spec: CounterSpec, target_ids, delta: int = 1):
+    """
+    UPDATE счётчика для строк с pk из target_ids (коллекция или подзапрос),
+    возвращающий новое значение.
+    """
+    return (
+        update(spec.pk.class_)
+        .where(spec.pk.in_(target_ids))
+        .values(_update_values(spec, spec.column + delta))
+        .returning(spec.column)
+    )
+
+
+def apply_deltas(db: Session, spec: CounterSpec, deltas: dict[UUID, int]) -> int:
+    """
+    Прибавляет дельты к счётчику одним UPDATE ... FROM (VALUES ...) в текущей транзакции.
+    Возвращает количество обновлённых строк.
+    """
+    if not deltas:
+        return 0
+    # Сортировка по pk даёт одинаковый порядок блокировок во всех воркерах.
+    rows = sorted(deltas.items(), key=lambda item: str(item[0]))
+    batch = values(
+        column("target_uuid", PG_UUID(as_uuid=True)),
+        column("delta", Integer),
+        name="deltas",
+    ).data(rows)
+    return db.execute(
+        update(spec.pk.class_)
+        .where(spec.pk == batch.c.target_uuid)
+        .values(_update_values(spec, spec.column + batch.c.delta))
+    ).rowcount
+
+
+class CounterBuffer:
+    """
+    Буфер дельт счётчиков для режима write-behind (ENGAGEMENT_WRITE_BEHIND).
+    Строки связей пишутся сразу, а изменения счётчиков копятся в памяти воркера
+    и сбрасываются в БД пачкой UPDATE ... FROM (VALUES ...) раз в
+    ENGAGEMENT_FLUSH_INTERVAL_MS и при остановке приложения.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict[UUID, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, spec: CounterSpec, target_id: UUID, delta: int) -> None:
+        with self._lock:
+            self._pending[spec.name][target_id] += delta
+
+    def pending(self, spec: CounterSpec, target_id: UUID) -> int:
+        with self._lock:
+            return self._pending.get(spec.name, {}).get(target_id, 0)
+
+    def drain(self) -> dict[str, dict[UUID, int]]:
+        with self._lock:
+            drained, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        return {
+            name: {target_id: delta for target_id, delta in deltas.items() if delta}
+            for name, deltas in drained.items()
+        }
+
+    def restore(self, drained: dict[str, dict[UUID, int]]) -> None:
+        with self._lock:
+            for name, deltas in drained.items():
+                for target_id, delta in deltas.items():
+                    self._pending[name][target_id] += delta
+
+    def flush(self, db: Session | None = None) -> int:
+        """
+        Применяет накопленные дельты одним UPDATE на каждый счётчик.
+        При ошибке дельты возвращаются в буфер и будут применены при следующем сбросе.
+        Возвращает количество обновлённых строк.
+        """
+        drained = self.drain()
+        if not any(drained.values()):
+            return 0
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            updated = 0
+            for spec in COUNTERS:
+                updated += apply_deltas(db, spec, drained.get(spec.name))
+            db.commit()
+            return updated
+        except Exception:
+            db.rollback()
+            self.restore(drained)
+            logger.exception("Не удалось сбросить буфер счётчиков, повторим позже")
+            return 0
+        finally:
+            if own_session:
+                db.close()
+
+
+buffer = CounterBuffer()
+
+
+def recount(db: Session, spec: CounterSpec) -> None:
+    """
+    Полностью пересчитывает счётчик по таблице связей.
+    Нужен один раз после добавления колонки и для ручной сверки.
+    Дельты, ещё не сброшенные из буферов воркеров, при этом не учитываются,
+    поэтому в режиме ENGAGEMENT_WRITE_BEHIND сверку лучше запускать с выключенным буфером.
+    """
+    actual = (
+        select(func.count())
+        .select_from(spec.source_model)
+        .where(spec.source_column == spec.pk)
+        .scalar_subquery()
+    )
+    db.execute(update(spec.pk.class_).values(_update_values(spec, actual)))
+    db.commit()
+
+
+def run_recount() -> None:
+    """
+    Пересчёт всех счётчиков в отдельной сессии (POST /admin/counters/recount).
+    """
+    db = SessionLocal()
+    try:
+        for spec in COUNTERS:
+            recount(db, spec)
+            logger.info("Счётчик %s пересчитан", spec.name)
+    except Exception:
+        db.rollback()
+        logger.exception("Ошибка пересчёта счётчиков")
+    finally:
+        db.close()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.compression import precompress
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.dictionaries import RouteType, DifficultyType
+from app.models.tag import RouteTag, PostTag
+from app.models.target_types import TargetType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """
+    Заранее сериализованный ответ справочника и его ETag.
+    encoded — сжатые копии тела по кодировкам (br, gzip), пустой для маленьких тел.
+    """
+    body: bytes
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_items(cls, items: list[dict], adapter: TypeAdapter | None = None) -> "CachedPayload":
+        """
+        Элементы с датами и другими не-JSON типами сериализуются через adapter
+        (TypeAdapter схемы ответа) — так же, как обычный ответ FastAPI с этой схемой.
+        """
+        if adapter is not None:
+            body = adapter.dump_json(adapter.validate_python(items), by_alias=True)
+        else:
+            body = json.dumps(items, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        encoded = {}
+        if settings.COMPRESSION_ENABLED:
+            encoded = precompress(
+                body,
+                settings.COMPRESSION_MINIMUM_SIZE,
+                settings.COMPRESSION_CACHED_GZIP_LEVEL,
+                settings.COMPRESSION_CACHED_BROTLI_QUALITY,
+            )
+        return cls(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"', encoded=encoded)
+
+    def etag_for(self, encoding: str | None) -> str:
+        # Сжатое и исходное представления — разные байты, поэтому и ETag разный.
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    target_types: dict[str, UUID]
+    payloads: dict[str, CachedPayload]
+    loaded_at: float
+
+
+class DictionaryRegistry:
+    """
+    In-memory реестр справочников (типы сущностей, типы маршрутов, сложности, теги).
+    Загружается при старте приложения и периодически перечитывается целиком;
+    читатели всегда видят согласованный снимок, который подменяется одной ссылкой.
+    """
+
+    # Не чаще одного внепланового перечитывания за этот интервал (сек),
+    # чтобы запросы с несуществующим типом не превращались в нагрузку на БД.
+    MISS_RELOAD_INTERVAL = 5.0
+
+    def __init__(self):
+        self._snapshot: _Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        db = SessionLocal()
+        try:
+            snapshot = self._build_snapshot(db)
+        finally:
+            db.close()
+        self._snapshot = snapshot
+        logger.info("Справочники загружены: %s", ", ".join(sorted(snapshot.payloads)))
+
+    def refresh(self) -> None:
+        with self._lock:
+            self.load()
+
+    @staticmethod
+    def _build_snapshot(db: Session) -> _Snapshot:
+        target_types = db.query(TargetType).order_by(TargetType.name).all()
+        route_types = db.query(RouteType).order_by(RouteType.name).all()
+        difficulty_types = db.query(DifficultyType).order_by(DifficultyType.name).all()
+        route_tags = db.query(RouteTag).order_by(RouteTag.route_tag_name).all()
+        post_tags = db.query(PostTag).order_by(PostTag.post_tag_name).all()
+        return _Snapshot(
+            target_types={t.name: t.uuid for t in target_types},
+            payloads={
+                "target_types": CachedPayload.from_items([{"uuid": t.uuid, "name": t.name} for t in target_types]),
+                "route_types": CachedPayload.from_items([{"uuid": t.uuid, "name": t.name} for t in route_types]),
+                "difficulty_types": CachedPayload.from_items(
+                    [{"uuid": t.uuid, "name": t.name} for t in difficulty_types]
+                ),
+                "route_tags": CachedPayload.from_items(
+                    [{"uuid": t.uuid, "route_tag_name": t.route_tag_name} for t in route_tags]
+                ),
+                "post_tags": CachedPayload.from_items(
+                    [{"uuid": t.uuid, "post_tag_name": t.post_tag_name} for t in post_tags]
+                ),
+            },
+            loaded_at=time.monotonic(),
+        )
+
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.load()
+                snapshot = self._snapshot
+        return snapshot
+
+    def payload(self, name: str) -> CachedPayload:
+        return self._current().payloads[name]
+
+    def target_type_id(self, name: str) -> UUID | None:
+        snapshot = self._current()
+        type_id = snapshot.target_types.get(name)
+        if type_id is None and time.monotonic() - snapshot.loaded_at > self.MISS_RELOAD_INTERVAL:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self.load()
+            type_id = self._current().target_types.get(name)
+        return type_id
+
+
+registry = DictionaryRegistry()
+
+
+def get_target_type_id(target_type: str) -> UUID:
+    """
+    UUID типа сущности по его имени из реестра справочников.
+    Raises:
+        HTTPException: Если тип неизвестен.
+    """
+    type_id = registry.target_type_id(target_type)
+    if type_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный тип сущности")
+    return type_id
@@ -0,0 +1,131 @@
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.counters import CounterSpec, buffer, increment_statement
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _count_for(model, target_column, target_id: UUID):
+    return select(func.count()).select_from(model).where(target_column == target_id).scalar_subquery()
+
+
+def _counter_value(counter: CounterSpec, target_id: UUID):
+    return select(counter.column).where(counter.pk == target_id).scalar_subquery()
+
+
+def add_engagement(
+    db: Session,
+    model,
+    target_column,
+    target_id: UUID,
+    user_id: UUID,
+    not_found_detail: str,
+    counter: CounterSpec | None = None,
+) -> int:
+    """
+    Идемпотентно добавляет строку связи пользователь–сущность (лайк, избранное)
+    одним запросом INSERT ... ON CONFLICT DO NOTHING и в том же запросе
+    возвращает новое количество связей у сущности.
+    Если у сущности есть денормализованный счётчик (counter), он увеличивается
+    в том же запросе, а в режиме ENGAGEMENT_WRITE_BEHIND — через буфер счётчиков.
+    Отсутствие сущности определяется по нарушению внешнего ключа и отдаётся как 404.
+    """
+    inserted = (
+        pg_insert(model)
+        .values({target_column.key: target_id, "user_uuid": user_id})
+        .on_conflict_do_nothing()
+        .returning(target_column)
+        .cte("inserted")
+    )
+    inserted_count = select(func.count()).select_from(inserted).scalar_subquery()
+    try:
+        if counter is None:
+            count = db.execute(select(_count_for(model, target_column, target_id) + inserted_count)).scalar_one()
+            db.commit()
+            return count
+
+        if settings.ENGAGEMENT_WRITE_BEHIND:
+            was_inserted, current = db.execute(
+                select(inserted_count, _counter_value(counter, target_id))
+            ).one()
+            db.commit()
+            if was_inserted:
+                buffer.add(counter, target_id, 1)
+            return (current or 0) + buffer.pending(counter, target_id)
+
+        updated = increment_statement(counter, select(inserted.c[target_column.key]), 1).cte("updated")
+        count = db.execute(
+            select(func.coalesce(
+                select(updated.c[counter.column.key]).scalar_subquery(),
+                _counter_value(counter, target_id),
+            ))
+        ).scalar_one()
+        db.commit()
+        return count
+    except IntegrityError as e:
+        db.rollback()
+        if getattr(e.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+        raise
+
+
+def remove_engagement(
+    db: Session,
+    model,
+    target_column,
+    target_id: UUID,
+    user_id: UUID,
+    target_pk,
+    not_found_detail: str,
+    counter: CounterSpec | None = None,
+) -> int:
+    """
+    Идемпотентно удаляет строку связи пользователь–сущность одним запросом
+    DELETE ... RETURNING, в том же запросе проверяя существование сущности
+    и возвращая новое количество связей (и уменьшая счётчик, если он есть).
+    """
+    deleted = (
+        delete(model)
+        .where(target_column == target_id, model.user_uuid == user_id)
+        .returning(target_column)
+        .cte("deleted")
+    )
+    deleted_count = select(func.count()).select_from(deleted).scalar_subquery()
+    try:
+        if counter is None:
+            target_exists, count = db.execute(
+                select(exists().where(target_pk == target_id), _count_for(model, target_column, target_id) - deleted_count)
+            ).one()
+        elif settings.ENGAGEMENT_WRITE_BEHIND:
+            current, was_deleted = db.execute(select(_counter_value(counter, target_id), deleted_count)).one()
+            target_exists = current is not None
+            count = None
+        else:
+            updated = increment_statement(counter, select(deleted.c[target_column.key]), -1).cte("updated")
+            current, count = db.execute(
+                select(_counter_value(counter, target_id), select(updated.c[counter.column.key]).scalar_subquery())
+            ).one()
+            target_exists = current is not None
+            if count is None:
+                count = current
+
+        if not target_exists:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+        db.commit()
+
+        if count is None:
+            if was_deleted:
+                buffer.add(counter, target_id, -1)
+            count = current + buffer.pending(counter, target_id)
+        return count
+    except SQLAlchemyError:
+        db.rollback()
+        raise
@@ -0,0 +1,125 @@
+import json
+import logging
+from datetime import datetime
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.crud.pagination import encode_cursor
+from app.db.session import SessionLocal
+from app.models.dictionaries import DifficultyType, RouteType
+from app.models.routes import Route
+from app.models.users import DBUser
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "ndjson"
+GEOJSONSEQ = "geojsonseq"
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    GEOJSONSEQ: "application/geo+json-seq",
+}
+# Разделитель записей GeoJSON Text Sequences (RFC 8142).
+_RECORD_SEPARATOR = b"\x1e"
+# 6 знаков после запятой — около 10 см, точнее данные маршрутов не бывают.
+GEOJSON_DECIMALS = 6
+
+
+def _feature(row) -> bytes:
+    properties = {
+        "name": row.name,
+        "location": row.location,
+        "description": row.description,
+        "route_type": row.route_type,
+        "difficulty": row.difficulty,
+        "distance": row.distance,
+        "duration": row.duration,
+        "avg_rating": row.avg_rating,
+        "likes_count": row.likes_count,
+        "creator": row.creator,
+        "thumbnail_url": row.thumbnail_url,
+        "created_at": row.created_at.isoformat(),
+        "published_at": row.published_at.isoformat() if row.published_at else None,
+        "edited_at": row.edited_at.isoformat(),
+    }
+    # Геометрия уже в GeoJSON (ST_AsGeoJSON) и вставляется в строку без разбора.
+    return b"".join((
+        b'{"type":"Feature","id":"', str(row.uuid).encode(),
+        b'","cursor":"', encode_cursor(row.edited_at, row.uuid).encode(),
+        b'","geometry":', (row.geometry or "null").encode(),
+        b',"properties":', json.dumps(properties, ensure_ascii=False, separators=(",", ":")).encode(),
+        b"}",
+    ))
+
+
+def iter_public_routes(
+    after: tuple[datetime, UUID] | None,
+    limit: int | None,
+    batch_size: int,
+    fmt: str = NDJSON,
+) -> Iterator[bytes]:
+    """
+    Выгрузка публичных маршрутов с геометрией: по одному GeoJSON Feature на строку
+    (NDJSON или GeoJSONSeq), в порядке (edited_at, uuid).
+
+    Строки читаются серверным курсором (stream_results) пачками по batch_size,
+    поэтому память не зависит от размера таблицы; каждая пачка отдаётся одной частью.
+    У каждого объекта есть "cursor" — позиция, с которой выгрузку можно продолжить
+    (after). Изменённый маршрут получает новый edited_at и попадает в конец
+    выгрузки, так что продолжение с последнего курсора даёт и обновления.
+
+    Генератор открывает свою сессию: сессия запроса (get_db) закрывается
+    до отправки тела потокового ответа.
+    """
+    prefix = _RECORD_SEPARATOR if fmt == GEOJSONSEQ else b""
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(
+                Route.uuid,
+                Route.name,
+                Route.location,
+                Route.description,
+                RouteType.name.label("route_type"),
+                DifficultyType.name.label("difficulty"),
+                Route.distance,
+                Route.duration,
+                Route.avg_rating,
+                Route.likes_count,
+                DBUser.login.label("creator"),
+                Route.thumbnail_url,
+                Route.created_at,
+                Route.published_at,
+                Route.edited_at,
+                func.ST_AsGeoJSON(Route.geo_data, GEOJSON_DECIMALS).label("geometry"),
+            )
+            .join(DBUser, DBUser.uuid == Route.creator_uuid)
+            .outerjoin(RouteType, RouteType.uuid == Route.route_type_uuid)
+            .outerjoin(DifficultyType, DifficultyType.uuid == Route.difficulty_uuid)
+            .filter(Route.is_public.is_(True))
+        )
+        if after:
+            query = query.filter(tuple_(Route.edited_at, Route.uuid) > after)
+        query = query.order_by(Route.edited_at, Route.uuid)
+        if limit:
+            query = query.limit(limit)
+
+        batch = []
+        for row in query.execution_options(stream_results=True).yield_per(batch_size):
+            batch.append(prefix + _feature(row) + b"\n")
+            if len(batch) >= batch_size:
+                yield b"".join(batch)
+                batch = []
+        if batch:
+            yield b"".join(batch)
+    except SQLAlchemyError:
+        # Статус ответа уже отправлен, поэтому ошибка пробрасывается дальше:
+        # сервер обрывает соединение без завершающего чанка, и клиент видит
+        # неполную выгрузку, а не успешный ответ. Продолжить её можно
+        # с курсора последней полученной строки.
+        logger.exception("Выгрузка маршрутов прервана ошибкой БД")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Callable, Iterable
+
+from fastapi import UploadFile
+from sqlalchemy import Integer, String, select, update, case, func, cast, literal, column, values
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.images import render_variants
+from app.core.tasks import image_pool
+from app.core.uploads import detect_image_extension, save_upload
+from app.crud import thumbnails
+from app.db.session import SessionLocal
+from app.models.media import MediaObject
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = "objects"
+
+
+def _objects_root() -> str:
+    return os.path.join(settings.MEDIA_UPLOAD_DIR, OBJECTS_DIR)
+
+
+def _shard(sha256: str) -> str:
+    return os.path.join(sha256[:2], sha256[2:4])
+
+
+def object_dir(sha256: str) -> str:
+    return os.path.join(_objects_root(), _shard(sha256))
+
+
+def object_path(sha256: str, ext: str) -> str:
+    return os.path.join(object_dir(sha256), f"{sha256}{ext}")
+
+
+def _url(sha256: str, filename: str) -> str:
+    return f"{settings.BASE_STATIC_URL}/media/{OBJECTS_DIR}/{sha256[:2]}/{sha256[2:4]}/{filename}"
+
+
+def object_url(media: MediaObject) -> str:
+    return _url(media.sha256, f"{media.sha256}{media.ext}")
+
+
+def sha256_from_url(url: str | None) -> str | None:
+    """
+    SHA-256 объекта по его URL; None для внешних ссылок и файлов вне хранилища.
+    """
+    prefix = f"{settings.BASE_STATIC_URL}/media/{OBJECTS_DIR}/"
+    if not url or not url.startswith(prefix):
+        return None
+    return os.path.splitext(url.rsplit("/", 1)[-1])[0]
+
+
+def store_upload(db: Session, file: UploadFile, max_bytes: int) -> MediaObject:
+    """
+    Сохраняет загруженное изображение в хранилище и добавляет на него ссылку
+    (ref_count + 1) в текущей транзакции; commit делает вызывающий код.
+    Если такой файл уже есть, новая копия не записывается.
+
+    Строка объекта блокируется до commit, поэтому сборщик мусора не может
+    удалить файл между проверкой его наличия и сохранением ссылки.
+    """
+    ext = detect_image_extension(file)
+    hasher = hashlib.sha256()
+    tmp_path = os.path.join(_objects_root(), "tmp", uuid.uuid4().hex)
+    size = save_upload(file, tmp_path, max_bytes, hasher=hasher)
+    sha256 = hasher.hexdigest()
+    try:
+        stmt = pg_insert(MediaObject).values(sha256=sha256, ext=ext, size=size, ref_count=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MediaObject.sha256],
+            set_={"ref_count": MediaObject.ref_count + 1, "released_at": None},
+        ).returning(MediaObject)
+        media = db.execute(
+            select(MediaObject).from_statement(stmt).execution_options(populate_existing=True)
+        ).scalar_one()
+
+        path = object_path(sha256, media.ext)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            # Свежее время изменения защищает файл от sweep_unreferenced_files до commit.
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return media
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def release(db: Session, url: str | None) -> None:
+    """
+    Снимает ссылку на объект хранилища по URL (в текущей транзакции).
+    Внешние ссылки и файлы вне хранилища игнорируются.
+    """
+    release_many(db, [url])
+
+
+def release_many(db: Session, urls: Iterable[str | None]) -> None:
+    """
+    Снимает ссылки на объекты по списку URL одним UPDATE (в текущей транзакции),
+    например при удалении сущности вместе с её фотографиями.
+    """
+    refs = Counter(sha256 for sha256 in map(sha256_from_url, urls) if sha256 is not None)
+    if not refs:
+        return
+    released = values(
+        column("sha256", String),
+        column("refs", Integer),
+        name="released",
+    ).data(sorted(refs.items()))
+    db.execute(
+        update(MediaObject)
+        .where(MediaObject.sha256 == released.c.sha256, MediaObject.ref_count > 0)
+        .values(
+            ref_count=func.greatest(MediaObject.ref_count - released.c.refs, 0),
+            released_at=case((MediaObject.ref_count <= released.c.refs, func.now()), else_=MediaObject.released_at),
+        )
+    )
+
+
+def ready_variants(media: MediaObject, sizes: tuple[int, ...]) -> dict[str, str] | None:
+    """
+    URL уменьшенных копий объекта для sizes, если все они уже есть
+    (тот же файл загружался раньше), иначе None.
+    """
+    existing = media.variants or {}
+    if all(str(size) in existing for size in sizes):
+        return {str(size): existing[str(size)] for size in sizes}
+    return None
+
+
+def render_missing_variants(
+    media: MediaObject,
+    sizes: tuple[int, ...],
+    on_ready: Callable[[dict[str, str] | None], None],
+) -> None:
+    """
+    Рендерит в пуле процессов недостающие копии объекта, сохраняет их в
+    media_objects.variants и вызывает on_ready с URL копий для sizes
+    (или None при ошибке). Вызывать после commit ссылающейся сущности.
+    """
+    existing = media.variants or {}
+    missing = tuple(size for size in sizes if str(size) not in existing)
+    sha256 = media.sha256
+
+    def _done(future: Future) -> None:
+        db = SessionLocal()
+        try:
+            rendered = {size: _url(sha256, filename) for size, filename in future.result().items()}
+            variants = db.execute(
+                update(MediaObject)
+                .where(MediaObject.sha256 == sha256)
+                .values(variants=func.coalesce(MediaObject.variants, cast({}, JSONB)).op("||")(literal(rendered, JSONB)))
+                .returning(MediaObject.variants)
+            ).scalar_one()
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Не удалось создать копии объекта %s", sha256)
+            variants = None
+        finally:
+            db.close()
+        on_ready({str(size): variants[str(size)] for size in sizes} if variants else None)
+
+    image_pool.submit(
+        render_variants, object_path(sha256, media.ext), object_dir(sha256), sha256, missing,
+        on_done=_done,
+    )
+
+
+def collect_garbage(db: Session, batch_size: int = 500) -> int:
+    """
+    Удаляет объекты без ссылок, освобождённые раньше MEDIA_GC_GRACE_HOURS назад,
+    вместе с файлами. Строки берутся с FOR UPDATE SKIP LOCKED: объекты,
+    на которые прямо сейчас добавляется ссылка, пропускаются.
+    Возвращает количество удалённых объектов.
+    """
+    threshold = func.now() - timedelta(hours=settings.MEDIA_GC_GRACE_HOURS)
+    total = 0
+    while True:
+        orphans = db.execute(
+            select(MediaObject)
+            .where(MediaObject.ref_count == 0, MediaObject.released_at < threshold)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not orphans:
+            db.rollback()
+            return total
+        for media in orphans:
+            paths = [object_path(media.sha256, media.ext)]
+            paths += [os.path.join(object_dir(media.sha256), f"{media.sha256}_{size}.webp") for size in (media.variants or {})]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            db.delete(media)
+        db.commit()
+        total += len(orphans)
+        if len(orphans) < batch_size:
+            return total
+
+
+def _remove_unreferenced(db: Session, candidates: dict[str, list[str]], cutoff: float) -> int:
+    known = set(db.execute(
+        select(MediaObject.sha256).where(MediaObject.sha256.in_(list(candidates)))
+    ).scalars())
+    db.rollback()
+    removed = 0
+    for sha256, paths in candidates.items():
+        if sha256 in known:
+            continue
+        for path in paths:
+            try:
+                # Повторная проверка: store_upload обновляет время файла, на который добавляет ссылку.
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def sweep_unreferenced_files(db: Session, batch_size: int = 500) -> int:
+    """
+    Удаляет файлы хранилища старше MEDIA_GC_GRACE_HOURS, для которых нет строки
+    в media_objects: файл переносится в хранилище до commit загрузки и остаётся
+    без строки, если транзакция откатилась; сюда же попадают временные файлы
+    прерванных загрузок. Обходит весь каталог хранилища, поэтому выполняется
+    вместе со сборкой мусора раз в MEDIA_GC_INTERVAL_SECONDS.
+    Возвращает количество удалённых файлов.
+    """
+    cutoff = time.time() - settings.MEDIA_GC_GRACE_HOURS * 3600
+    removed = 0
+    candidates: dict[str, list[str]] = {}
+    for dirpath, _, filenames in os.walk(_objects_root()):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            # <sha256>.<ext>, <sha256>_<size>.webp; у временных файлов имя не совпадёт ни с одной строкой.
+            sha256 = filename.split(".", 1)[0].split("_", 1)[0]
+            candidates.setdefault(sha256, []).append(path)
+            if len(candidates) >= batch_size:
+                removed += _remove_unreferenced(db, candidates, cutoff)
+                candidates = {}
+    if candidates:
+        removed += _remove_unreferenced(db, candidates, cutoff)
+    return removed
+
+
+def run_media_gc() -> None:
+    db = SessionLocal()
+    try:
+        removed = collect_garbage(db)
+        if removed:
+            logger.info("Хранилище медиа: удалено объектов без ссылок: %s", removed)
+        swept = sweep_unreferenced_files(db)
+        if swept:
+            logger.info("Хранилище медиа: удалено файлов без записи в media_objects: %s", swept)
+        maps = thumbnails.sweep_unused_maps(db)
+        if maps:
+            logger.info("Хранилище медиа: удалено превью карт без маршрутов: %s", maps)
+    finally:
+        db.close()
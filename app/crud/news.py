@@ -0,0 +1,159 @@
+import logging
+import threading
+from typing import List
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pg_listener import notify
+from app.crud.dictionaries import CachedPayload
+from app.crud.users import avatar_column
+from app.db.session import SessionLocal
+from app.models.news import News
+from app.models.users import DBUser
+from app.schemas.news import NewsCreate, NewsOut, NewsUpdate
+
+logger = logging.getLogger(__name__)
+
+NEWS_CHANNEL = "news_changed"
+# Лента сериализуется по той же схеме, что и GET /news/{news_id}.
+_FEED_ADAPTER = TypeAdapter(List[NewsOut])
+
+
+def _news_to_dict(news: News, login: str | None, avatar: str | None) -> dict:
+    return {
+        "uuid": news.uuid,
+        "title": news.title,
+        "content": news.content,
+        "creator_login": login,
+        "creator_avatar": avatar,
+        "created_at": news.created_at,
+        "edited_at": news.edited_at,
+    }
+
+
+def _news_query(db: Session):
+    return (
+        db.query(News, DBUser.login, avatar_column().label("profile_picture"))
+        .outerjoin(DBUser, DBUser.uuid == News.creator_uuid)
+    )
+
+
+class NewsFeedCache:
+    """
+    Заранее сериализованная лента последних NEWS_FEED_SIZE новостей.
+    Снимок пересобирается только при создании, изменении или удалении новости:
+    в своём воркере — сразу после commit, в остальных — по NOTIFY на канале
+    NEWS_CHANNEL (см. app.core.pg_listener). Чтение ленты в БД не ходит.
+    """
+
+    def __init__(self):
+        self._payload: CachedPayload | None = None
+        self._lock = threading.Lock()
+
+    def rebuild(self) -> None:
+        db = SessionLocal()
+        try:
+            rows = _news_query(db).order_by(News.created_at.desc(), News.uuid.desc()).limit(settings.NEWS_FEED_SIZE).all()
+            payload = CachedPayload.from_items([_news_to_dict(*row) for row in rows], _FEED_ADAPTER)
+        finally:
+            db.close()
+        with self._lock:
+            self._payload = payload
+
+    def payload(self) -> CachedPayload:
+        payload = self._payload
+        if payload is None:
+            self.rebuild()
+            payload = self._payload
+        return payload
+
+    def on_notify(self, _payload: str | None) -> None:
+        self.rebuild()
+
+
+feed = NewsFeedCache()
+
+
+def _changed(db: Session) -> None:
+    """
+    Коммитит изменение новостей вместе с NOTIFY и обновляет снимок своего воркера.
+    """
+    notify(db, NEWS_CHANNEL)
+    db.commit()
+    try:
+        feed.rebuild()
+    except SQLAlchemyError:
+        logger.exception("Не удалось пересобрать ленту новостей")
+
+
+def get_news_item(db: Session, news_id: UUID) -> dict:
+    try:
+        row = _news_query(db).filter(News.uuid == news_id).first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Новость не найдена")
+        return _news_to_dict(*row)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении новости: {e.__class__.__name__}"
+        )
+
+
+def create_news(db: Session, data: NewsCreate, creator: DBUser) -> dict:
+    try:
+        news = News(creator_uuid=creator.uuid, title=data.title.strip(), content=data.content)
+        db.add(news)
+        db.flush()
+        news_id = news.uuid
+        _changed(db)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при создании новости: {e.__class__.__name__}"
+        )
+    return get_news_item(db, news_id)
+
+
+def update_news(db: Session, news_id: UUID, data: NewsUpdate) -> dict:
+    try:
+        news = db.query(News).filter(News.uuid == news_id).first()
+        if not news:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Новость не найдена")
+        for field, value in data.model_dump(exclude_unset=True).items():
+            if value is not None:
+                setattr(news, field, value)
+        _changed(db)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при обновлении новости: {e.__class__.__name__}"
+        )
+    return get_news_item(db, news_id)
+
+
+def delete_news(db: Session, news_id: UUID) -> None:
+    try:
+        deleted = db.query(News).filter(News.uuid == news_id).delete(synchronize_session=False)
+        if not deleted:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Новость не найдена")
+        _changed(db)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при удалении новости: {e.__class__.__name__}"
+        )
@@ -0,0 +1,171 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, insert, literal, tuple_
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.pagination import encode_cursor, decode_cursor
+from app.db.session import SessionLocal
+from app.models.bridging import RouteSubscriptions
+from app.models.notifications import Notification
+from app.models.users import DBUser
+
+logger = logging.getLogger(__name__)
+
+ROUTE_UPDATED = "route_updated"
+ROUTE_PUBLISHED = "route_published"
+ROUTE_UNPUBLISHED = "route_unpublished"
+
+
+@dataclass(frozen=True)
+class RouteEvent:
+    route_uuid: UUID
+    event: str
+    actor_uuid: UUID | None
+
+
+def fan_out(db: Session, route_event: RouteEvent, batch_size: int) -> int:
+    """
+    Создаёт уведомления для всех подписчиков маршрута (кроме автора изменения)
+    пачками INSERT ... SELECT по batch_size строк. Подписчики перебираются
+    по user_uuid (keyset), каждая пачка коммитится отдельно, чтобы не держать
+    длинную транзакцию на маршрутах с десятками тысяч подписчиков.
+    Возвращает количество созданных уведомлений.
+    """
+    total = 0
+    last_user_uuid = None
+    while True:
+        subscribers = select(RouteSubscriptions.user_uuid).where(RouteSubscriptions.route_uuid == route_event.route_uuid)
+        if route_event.actor_uuid is not None:
+            subscribers = subscribers.where(RouteSubscriptions.user_uuid != route_event.actor_uuid)
+        if last_user_uuid is not None:
+            subscribers = subscribers.where(RouteSubscriptions.user_uuid > last_user_uuid)
+        subscribers = subscribers.order_by(RouteSubscriptions.user_uuid).limit(batch_size).subquery()
+
+        rows = db.execute(
+            insert(Notification)
+            .from_select(
+                ["user_uuid", "route_uuid", "actor_uuid", "event"],
+                select(
+                    subscribers.c.user_uuid,
+                    literal(route_event.route_uuid, PG_UUID(as_uuid=True)),
+                    literal(route_event.actor_uuid, PG_UUID(as_uuid=True)),
+                    literal(route_event.event),
+                ),
+            )
+            .returning(Notification.user_uuid)
+        ).scalars().all()
+        db.commit()
+
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+        last_user_uuid = max(rows)
+
+
+class FanoutWorker:
+    """
+    Очередь событий изменения маршрутов и фоновый поток, который рассылает
+    уведомления подписчикам. publish() только кладёт событие в очередь,
+    поэтому сохранение маршрута не зависит от числа подписчиков.
+    Очередь живёт в памяти воркера: события, не разосланные к моменту
+    аварийного завершения процесса, теряются.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue[RouteEvent | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, route_uuid: UUID, event: str, actor_uuid: UUID | None = None) -> None:
+        self._queue.put(RouteEvent(route_uuid, event, actor_uuid))
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="notifications-fanout", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 30.0) -> None:
+        """
+        Дорассылает уже поставленные в очередь события и останавливает поток.
+        """
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            route_event = self._queue.get()
+            if route_event is None:
+                return
+            db = SessionLocal()
+            try:
+                created = fan_out(db, route_event, settings.NOTIFICATIONS_FANOUT_BATCH_SIZE)
+                logger.debug("Fan-out %s для маршрута %s: %s уведомлений",
+                             route_event.event, route_event.route_uuid, created)
+            except Exception:
+                db.rollback()
+                logger.exception("Ошибка рассылки уведомлений для маршрута %s", route_event.route_uuid)
+            finally:
+                db.close()
+
+
+fanout = FanoutWorker()
+
+
+def get_notifications(
+    db: Session,
+    user: DBUser,
+    cursor: str | None = None,
+    limit: int = 20,
+    unread_only: bool = False,
+) -> dict:
+    """
+    Уведомления пользователя от новых к старым, keyset-пагинация по (created_at, uuid).
+    """
+    try:
+        query = db.query(Notification).filter(Notification.user_uuid == user.uuid)
+        if unread_only:
+            query = query.filter(Notification.is_read.is_(False))
+        if cursor:
+            created_at, last_uuid = decode_cursor(cursor)
+            query = query.filter(tuple_(Notification.created_at, Notification.uuid) < (created_at, last_uuid))
+        items = query.order_by(Notification.created_at.desc(), Notification.uuid.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].uuid)
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении уведомлений: {e.__class__.__name__}"
+        )
+
+
+def mark_all_read(db: Session, user: DBUser) -> int:
+    try:
+        updated = (
+            db.query(Notification)
+            .filter(Notification.user_uuid == user.uuid, Notification.is_read.is_(False))
+            .update({Notification.is_read: True}, synchronize_session=False)
+        )
+        db.commit()
+        return updated
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при обновлении уведомлений: {e.__class__.__name__}"
+        )
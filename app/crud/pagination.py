@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, item_uuid: UUID) -> str:
+    """
+    Упаковывает позицию последнего элемента страницы (created_at, uuid)
+    в непрозрачную строку для keyset-пагинации.
+    """
+    raw = json.dumps([created_at.isoformat(), str(item_uuid)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Распаковывает курсор, созданный encode_cursor.
+    Raises:
+        HTTPException: Если курсор повреждён.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_uuid = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), UUID(item_uuid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор пагинации")
+
+
+def encode_key_cursor(key: str) -> str:
+    """
+    Курсор для keyset-пагинации по уникальному строковому ключу (например, логину).
+    """
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_key_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор пагинации")
@@ -0,0 +1,256 @@
+import logging
+import uuid
+from uuid import UUID
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.crud import media
+from app.crud.dictionaries import get_target_type_id
+from app.db.session import SessionLocal
+from app.models.comments import Comment
+from app.models.news import News
+from app.models.photos import Photo
+from app.models.posts import Post
+from app.models.routes import Route
+from app.models.users import DBUser, UserRole
+
+logger = logging.getLogger(__name__)
+
+PHOTO_SIZES = (320, 1280)
+
+PHOTO_PROCESSING = "processing"
+PHOTO_READY = "ready"
+PHOTO_FAILED = "failed"
+
+
+def _photo_to_dict(photo: Photo) -> dict:
+    return {
+        "uuid": photo.uuid,
+        "url": photo.url,
+        "variants": photo.variants or {},
+        "status": photo.status,
+        "description": photo.description,
+        "created_at": photo.created_at,
+    }
+
+
+def _on_variants_ready(photo_id: UUID, variants: dict[str, str] | None) -> None:
+    """
+    Вызывается по завершении обработки: сохраняет URL копий
+    или помечает фотографию как failed.
+    """
+    db = SessionLocal()
+    try:
+        db.query(Photo).filter(Photo.uuid == photo_id).update(
+            {Photo.variants: variants, Photo.status: PHOTO_READY if variants else PHOTO_FAILED},
+            synchronize_session=False,
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Не удалось сохранить результат обработки фотографии %s", photo_id)
+    finally:
+        db.close()
+
+
+def _check_upload_target(db: Session, target_type_id: UUID, target_uuid: UUID, user: DBUser) -> None:
+    """
+    Фотографию можно прикрепить только к существующей сущности: к маршруту, посту
+    или новости — их автору, модератору или администратору; к комментарию — его автору
+    (или модератору, администратору), если комментируемый маршрут ему виден.
+    """
+    # comments импортирует этот модуль, поэтому константа берётся при вызове.
+    from app.crud.comments import COMMENT_TARGET_TYPE
+
+    privileged = user.role in (UserRole.admin, UserRole.moderator)
+    forbidden = HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет прав на добавление фотографии")
+    comment_type_id = get_target_type_id(COMMENT_TARGET_TYPE)
+
+    if target_type_id == comment_type_id:
+        comment = (
+            db.query(Comment.creator_uuid, Comment.target_type_id, Comment.target_uuid)
+            .filter(Comment.uuid == target_uuid)
+            .first()
+        )
+        if not comment:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Комментарий не найден")
+        if comment.creator_uuid != user.uuid and not privileged:
+            raise forbidden
+        # Ответ на комментарий: поднимаемся до сущности, к которой относится ветка.
+        parent = comment
+        while parent and parent.target_type_id == comment_type_id:
+            parent = (
+                db.query(Comment.target_type_id, Comment.target_uuid)
+                .filter(Comment.uuid == parent.target_uuid)
+                .first()
+            )
+        if not parent:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Комментарий не найден")
+        if str(parent.target_type_id) == str(settings.ROUTE_TYPE_UUID):
+            route = db.query(Route.creator_uuid, Route.is_public).filter(Route.uuid == parent.target_uuid).first()
+            if not route:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
+            if not (route.is_public or route.creator_uuid == user.uuid or privileged):
+                raise forbidden
+        return
+
+    model = {
+        str(settings.ROUTE_TYPE_UUID): Route,
+        str(settings.POST_TYPE_UUID): Post,
+        str(settings.NEWS_TYPE_UUID): News,
+    }.get(str(target_type_id))
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="К сущностям этого типа фотографии не прикрепляются"
+        )
+    target = db.query(model.creator_uuid).filter(model.uuid == target_uuid).first()
+    if not target:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Объект не найден")
+    if target.creator_uuid != user.uuid and not privileged:
+        raise forbidden
+
+
+def upload_photo(
+    db: Session,
+    target_type: str,
+    target_uuid: UUID,
+    file: UploadFile,
+    description: str | None,
+    creator: DBUser,
+) -> dict:
+    """
+    Проверяет, что пользователь может прикрепить фотографию к сущности (404/403),
+    сохраняет оригинал в хранилище медиа потоково (с ограничением PHOTO_MAX_BYTES)
+    и сразу возвращает фотографию. Если такой файл уже загружался и его копии
+    готовы, фотография сразу ready; иначе WebP-копии создаются в пуле процессов.
+    """
+    target_type_id = get_target_type_id(target_type)
+    photo_id = uuid.uuid4()
+    try:
+        _check_upload_target(db, target_type_id, target_uuid, creator)
+        stored = media.store_upload(db, file, settings.PHOTO_MAX_BYTES)
+        photo = Photo(
+            uuid=photo_id,
+            creator_uuid=creator.uuid,
+            target_type_id=target_type_id,
+            target_uuid=target_uuid,
+            name=(file.filename or stored.sha256)[:100],
+            description=description,
+            url=media.object_url(stored),
+            status=PHOTO_PROCESSING,
+        )
+        variants = media.ready_variants(stored, PHOTO_SIZES)
+        if variants:
+            photo.variants = variants
+            photo.status = PHOTO_READY
+        db.add(photo)
+        db.commit()
+        db.refresh(photo)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при сохранении фотографии: {e.__class__.__name__}"
+        )
+
+    if photo.status == PHOTO_PROCESSING:
+        media.render_missing_variants(
+            stored, PHOTO_SIZES,
+            on_ready=lambda ready: _on_variants_ready(photo_id, ready),
+        )
+    return _photo_to_dict(photo)
+
+
+def get_photos(db: Session, target_type: str, target_uuid: UUID) -> list[dict]:
+    target_type_id = get_target_type_id(target_type)
+    try:
+        photos = (
+            db.query(Photo)
+            .filter(Photo.target_type_id == target_type_id, Photo.target_uuid == target_uuid)
+            .order_by(Photo.created_at)
+            .all()
+        )
+        return [_photo_to_dict(p) for p in photos]
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении фотографий: {e.__class__.__name__}"
+        )
+
+
+def photos_for_targets(
+    db: Session,
+    target_type_id,
+    target_uuids: list[UUID],
+    per_target: int = 3,
+) -> dict[UUID, list[dict]]:
+    """
+    Первые per_target готовых фотографий для каждой сущности из target_uuids
+    одним запросом (row_number по ix_photos_target_created) — для карточек в списках.
+    """
+    if not target_uuids:
+        return {}
+    position = func.row_number().over(
+        partition_by=Photo.target_uuid,
+        order_by=Photo.created_at,
+    ).label("position")
+    ranked = (
+        db.query(Photo, position)
+        .filter(
+            Photo.target_type_id == target_type_id,
+            Photo.target_uuid.in_(target_uuids),
+            Photo.status == PHOTO_READY,
+        )
+        .subquery()
+    )
+    photo = aliased(Photo, ranked)
+    rows = (
+        db.query(photo)
+        .filter(ranked.c.position <= per_target)
+        .order_by(ranked.c.target_uuid, ranked.c.position)
+        .all()
+    )
+    result: dict[UUID, list[dict]] = {}
+    for p in rows:
+        result.setdefault(p.target_uuid, []).append(_photo_to_dict(p))
+    return result
+
+
+def delete_target_photos(db: Session, target_type_id, target_uuid: UUID) -> None:
+    """
+    Удаляет фотографии сущности и снимает их ссылки на файлы хранилища
+    (в текущей транзакции) — вызывается при удалении самой сущности.
+    """
+    urls = db.execute(
+        delete(Photo)
+        .where(Photo.target_type_id == target_type_id, Photo.target_uuid == target_uuid)
+        .returning(Photo.url)
+    ).scalars().all()
+    media.release_many(db, urls)
+
+
+def delete_photo(db: Session, photo_id: UUID, current_user: DBUser) -> None:
+    try:
+        photo = db.query(Photo).filter(Photo.uuid == photo_id).first()
+        if not photo:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Фотография не найдена")
+        if photo.creator_uuid != current_user.uuid and current_user.role not in (UserRole.admin, UserRole.moderator):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет доступа к удалению")
+        media.release(db, photo.url)
+        db.delete(photo)
+        db.commit()
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при удалении фотографии: {e.__class__.__name__}"
+        )
@@ -0,0 +1,213 @@
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, exists, func, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.pagination import encode_cursor, decode_cursor
+from app.crud.photos import delete_target_photos
+from app.crud.users import avatar_column
+from app.models.bridging import PostsPostTags
+from app.models.comments import Comment
+from app.models.posts import Post
+from app.models.tag import PostTag
+from app.models.users import DBUser, UserRole
+from app.schemas.posts import PostCreate, PostUpdate
+
+EXCERPT_LENGTH = 300
+
+
+def _comments_count_column():
+    return (
+        select(func.count(Comment.uuid))
+        .where(Comment.target_type_id == settings.POST_TYPE_UUID, Comment.target_uuid == Post.uuid)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+
+
+def _tags_column():
+    return (
+        select(func.coalesce(func.array_agg(PostsPostTags.post_tag_uuid), []))
+        .where(PostsPostTags.post_uuid == Post.uuid)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+
+
+def _permissions(post: Post, current_user: DBUser | None) -> tuple[bool, bool]:
+    if not current_user:
+        return False, False
+    is_author = post.creator_uuid == current_user.uuid
+    can_edit = is_author or current_user.role in (UserRole.admin, UserRole.moderator)
+    can_delete = is_author or current_user.role == UserRole.admin
+    return can_edit, can_delete
+
+
+def get_feed(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = 20,
+    tags: list[UUID] | None = None,
+) -> dict:
+    """
+    Лента постов от новых к старым с keyset-пагинацией по (created_at, uuid).
+    Карточка (автор, теги, число комментариев) собирается одним запросом;
+    фильтр по тегам — EXISTS по posts_post_tags, поэтому запрос идёт по индексу
+    ix_posts_created_uuid и не деградирует с ростом числа постов.
+    """
+    try:
+        query = (
+            db.query(
+                Post.uuid,
+                Post.name,
+                func.left(Post.content, EXCERPT_LENGTH).label("excerpt"),
+                Post.created_at,
+                DBUser.login,
+                avatar_column().label("profile_picture"),
+                _tags_column().label("tags"),
+                _comments_count_column().label("comments_count"),
+            )
+            .outerjoin(DBUser, DBUser.uuid == Post.creator_uuid)
+        )
+        if tags:
+            query = query.filter(
+                exists().where(PostsPostTags.post_uuid == Post.uuid, PostsPostTags.post_tag_uuid.in_(tags))
+            )
+        if cursor:
+            created_at, last_uuid = decode_cursor(cursor)
+            query = query.filter(tuple_(Post.created_at, Post.uuid) < (created_at, last_uuid))
+        rows = query.order_by(Post.created_at.desc(), Post.uuid.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].uuid)
+
+        items = [
+            {
+                "uuid": row.uuid,
+                "name": row.name,
+                "excerpt": row.excerpt,
+                "tags": row.tags,
+                "creator_login": row.login,
+                "creator_avatar": row.profile_picture,
+                "created_at": row.created_at,
+                "comments_count": row.comments_count,
+            }
+            for row in rows
+        ]
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении ленты постов: {e.__class__.__name__}"
+        )
+
+
+def get_post(db: Session, post_id: UUID, current_user: DBUser | None = None) -> dict:
+    try:
+        row = (
+            db.query(
+                Post,
+                DBUser.login,
+                avatar_column().label("profile_picture"),
+                _tags_column().label("tags"),
+                _comments_count_column().label("comments_count"),
+            )
+            .outerjoin(DBUser, DBUser.uuid == Post.creator_uuid)
+            .filter(Post.uuid == post_id)
+            .first()
+        )
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пост не найден")
+        post, login, avatar, tags, comments_count = row
+        can_edit, can_delete = _permissions(post, current_user)
+        return {
+            "uuid": post.uuid,
+            "name": post.name,
+            "content": post.content,
+            "tags": tags,
+            "creator_login": login,
+            "creator_avatar": avatar,
+            "created_at": post.created_at,
+            "edited_at": post.edited_at,
+            "comments_count": comments_count,
+            "can_edit": can_edit,
+            "can_delete": can_delete,
+        }
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении поста: {e.__class__.__name__}"
+        )
+
+
+def create_post(db: Session, data: PostCreate, creator: DBUser) -> dict:
+    try:
+        post = Post(creator_uuid=creator.uuid, name=data.name.strip(), content=data.content)
+        if data.tags:
+            post.post_tags = db.query(PostTag).filter(PostTag.uuid.in_(data.tags)).all()
+        db.add(post)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при создании поста: {e.__class__.__name__}"
+        )
+    return get_post(db, post.uuid, creator)
+
+
+def update_post(db: Session, post_id: UUID, data: PostUpdate, current_user: DBUser) -> dict:
+    try:
+        post = db.query(Post).filter(Post.uuid == post_id).first()
+        if not post:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пост не найден")
+        can_edit, _ = _permissions(post, current_user)
+        if not can_edit:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет доступа к редактированию")
+
+        update_data = data.model_dump(exclude_unset=True)
+        for field in ("name", "content"):
+            if field in update_data and update_data[field] is not None:
+                setattr(post, field, update_data[field])
+        if update_data.get("tags") is not None:
+            post.post_tags = db.query(PostTag).filter(PostTag.uuid.in_(update_data["tags"])).all()
+        db.commit()
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при обновлении поста: {e.__class__.__name__}"
+        )
+    return get_post(db, post_id, current_user)
+
+
+def delete_post(db: Session, post_id: UUID, current_user: DBUser) -> None:
+    try:
+        post = db.query(Post).filter(Post.uuid == post_id).first()
+        if not post:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пост не найден")
+        _, can_delete = _permissions(post, current_user)
+        if not can_delete:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет доступа к удалению")
+        delete_target_photos(db, settings.POST_TYPE_UUID, post.uuid)
+        db.delete(post)
+        db.commit()
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при удалении поста: {e.__class__.__name__}"
+        )
@@ -1,22 +1,57 @@
-from typing import Optional, List
+import logging
+from typing import Optional
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DBAPIError
 import traceback
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, noload
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import or_, func
+from sqlalchemy import Float, Integer, case, column, func, or_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from app.core.config import settings
+from app.crud.counters import ROUTE_LIKES
+from app.crud import notifications, thumbnails
+from app.crud.engagement import add_engagement, remove_engagement
+from app.crud.photos import delete_target_photos, photos_for_targets
 from app.crud.users import get_user
+from app.db.session import SessionLocal
 from app.models.comments import Comment
 from app.models.routes import Route
 from app.models.users import DBUser, UserRole
 from app.models.waypoints import Waypoint
-from app.schemas.routes import RouteCreate, RouteUpdate, RouteCardOut
-from app.models.bridging import RouteLike, RouteFavorite
+from app.schemas.routes import RouteCreate, RouteUpdate
+from app.models.bridging import RouteLike, RouteFavorite, RoutesUsersRates, RouteSubscriptions
 from app.models.tag import RouteTag
+from app.models.trending import RouteTrendingScore
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
+
+def route_card(route: Route, comments_counts: dict, favorites: set, photos: dict) -> dict:
+    """
+    Карточка маршрута для списков (RouteCardOut) из уже загруженных данных пачки:
+    числа комментариев, избранного текущего пользователя и превью фотографий.
+    """
+    route_uuid = route.uuid
+    route_type = route.route_type
+    return {
+        "uuid": route_uuid,
+        "name": route.name,
+        "location": route.location,
+        "avg_rating": route.avg_rating,
+        "rating_count": route.rating_count,
+        "rating_score": route.rating_score,
+        "likes_count": route.likes_count,
+        "comments_count": comments_counts.get(route_uuid, 0),
+        "is_favorite": route_uuid in favorites,
+        "thumbnail_url": route.thumbnail_url,
+        "photos": photos.get(route_uuid, []),
+        "route_type_uuid": route.route_type_uuid,
+        "route_type_name": route_type.name if route_type else None,
+    }
+
+
 def get_public_routes(
     db: Session,
     current_user: Optional[DBUser] = None,
@@ -41,23 +76,18 @@ def get_public_routes(
             query = query.filter(Route.location.ilike(f"%{location}%"))
 
         if ordering == "rating":
-            query = query.order_by(Route.avg_rating.desc())
+            query = query.order_by(Route.rating_score.desc())
         elif ordering == "recent":
             query = query.order_by(Route.published_at.desc())
+        elif ordering == "trending":
+            # Маршруты без недавних взаимодействий в тренды не попадают;
+            # внутреннее соединение позволяет идти по индексу score.
+            query = query.join(RouteTrendingScore, RouteTrendingScore.route_uuid == Route.uuid) \
+                .order_by(RouteTrendingScore.score.desc())
 
         routes = query.offset(skip).limit(limit).all()
 
         route_uuids = [r.uuid for r in routes]
-        likes_counts = dict(
-            (row[0], row[1])
-            for row in db.query(
-                RouteLike.route_uuid,
-                func.count(RouteLike.user_uuid)
-            )
-            .filter(RouteLike.route_uuid.in_(route_uuids))
-            .group_by(RouteLike.route_uuid)
-            .all()
-        )
         comments_counts = dict(
             (row[0], row[1])
             for row in db.query(
@@ -83,21 +113,9 @@ def get_public_routes(
                 .all()
             )
 
-        result = []
-        for r in routes:
-            result.append({
-                "uuid": r.uuid,
-                "name": r.name,
-                "location": r.location,
-                "avg_rating": r.avg_rating,
-                "likes_count": likes_counts.get(r.uuid, 0),
-                "comments_count": comments_counts.get(r.uuid, 0),
-                "is_favorite": r.uuid in favorites,
-                "thumbnail_url": getattr(r, "thumbnail_url", None),
-                "route_type_uuid": r.route_type_uuid,
-                "route_type_name": r.route_type.name if r.route_type else None,
-            })
-        return result
+        photos = photos_for_targets(db, settings.ROUTE_TYPE_UUID, route_uuids)
+
+        return [route_card(r, comments_counts, favorites, photos) for r in routes]
 
     except SQLAlchemyError as e:
         db.rollback()
@@ -128,14 +146,18 @@ def get_route_by_id(db: Session, route_id: UUID, current_user: DBUser = None):
         if not route:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
 
-        likes_count = db.query(func.count(RouteLike.user_uuid)).filter(RouteLike.route_uuid == route_id).scalar() or 0
         comments_count = db.query(func.count(Comment.uuid)).filter(
             Comment.target_type_id == settings.ROUTE_TYPE_UUID,
             Comment.target_uuid == route_id).scalar() or 0
 
         is_favorite = False
         is_liked = False
+        my_rating = None
         if current_user:
+            my_rating = db.query(RoutesUsersRates.rating).filter(
+                RoutesUsersRates.route_uuid == route_id,
+                RoutesUsersRates.user_uuid == current_user.uuid
+            ).scalar()
             is_favorite = db.query(RouteFavorite).filter(
                 RouteFavorite.route_uuid == route_id,
                 RouteFavorite.user_uuid == current_user.uuid
@@ -166,6 +188,9 @@ def get_route_by_id(db: Session, route_id: UUID, current_user: DBUser = None):
             "route_type_uuid": route.route_type_uuid,
             "difficulty_uuid": route.difficulty_uuid,
             "avg_rating": route.avg_rating,
+            "rating_count": route.rating_count,
+            "rating_score": route.rating_score,
+            "my_rating": my_rating,
             "duration": route.duration,
             "distance": route.distance,
             "created_at": route.created_at,
@@ -173,7 +198,7 @@ def get_route_by_id(db: Session, route_id: UUID, current_user: DBUser = None):
             "last_edited_by_uuid": route.last_edited_by_uuid,
             "last_edited_by_role": route.last_edited_by_role,
             "waypoints": route.waypoints,
-            "likes_count": likes_count,
+            "likes_count": route.likes_count,
             "comments_count": comments_count,
             "is_favorite": is_favorite,
             "is_liked": is_liked,
@@ -238,6 +263,7 @@ def create_route(db: Session, data: RouteCreate, creator: DBUser):
 
         db.commit()
         db.refresh(route)
+        thumbnails.worker.publish(route.uuid)
 
         return {
             "uuid": route.uuid,
@@ -336,10 +362,9 @@ def update_route(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ошибка при сохранении изменений маршрута"
         )
+    notifications.fanout.publish(route.uuid, notifications.ROUTE_UPDATED, current_user.uuid)
+    thumbnails.worker.publish(route.uuid)
 
-    likes_count = db.query(func.count(RouteLike.user_uuid)) \
-                    .filter(RouteLike.route_uuid == route.uuid) \
-                    .scalar() or 0
     comments_count = db.query(func.count(Comment.uuid)) \
                        .filter(Comment.target_type_id == settings.ROUTE_TYPE_UUID,
                                Comment.target_uuid == route.uuid) \
@@ -378,7 +403,7 @@ def update_route(
         "last_edited_by_uuid": route.last_edited_by_uuid,
         "last_edited_by_role": route.last_edited_by_role,
         "waypoints": route.waypoints,
-        "likes_count": likes_count,
+        "likes_count": route.likes_count,
         "comments_count": comments_count,
         "is_favorite": is_favorite,
         "is_liked": is_liked,
@@ -399,6 +424,7 @@ def delete_route(db: Session, route_id: UUID, current_user: DBUser):
         if current_user.role != UserRole.admin and route.creator_uuid != current_user.uuid:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет доступа к удалению")
 
+        delete_target_photos(db, settings.ROUTE_TYPE_UUID, route.uuid)
         db.delete(route)
         db.commit()
         return {"detail": "Маршрут успешно удалён"}
@@ -463,16 +489,6 @@ def get_routes_by_user(
         )
 
         route_uuids = [r.uuid for r in routes]
-        likes_counts = dict(
-            (row[0], row[1])
-            for row in db.query(
-                RouteLike.route_uuid,
-                func.count(RouteLike.user_uuid)
-            )
-            .filter(RouteLike.route_uuid.in_(route_uuids))
-            .group_by(RouteLike.route_uuid)
-            .all()
-        )
         comments_counts = dict(
             (row[0], row[1])
             for row in db.query(
@@ -496,21 +512,9 @@ def get_routes_by_user(
             .all()
         )
 
-        result = []
-        for r in routes:
-            result.append({
-                "uuid": r.uuid,
-                "name": r.name,
-                "location": r.location,
-                "avg_rating": r.avg_rating,
-                "likes_count": likes_counts.get(r.uuid, 0),
-                "comments_count": comments_counts.get(r.uuid, 0),
-                "is_favorite": r.uuid in favorites,
-                "thumbnail_url": getattr(r, "thumbnail_url", None),
-                "route_type_uuid": r.route_type_uuid,
-                "route_type_name": r.route_type.name if r.route_type else None
-            })
-        return result
+        photos = photos_for_targets(db, settings.ROUTE_TYPE_UUID, route_uuids)
+
+        return [route_card(r, comments_counts, favorites, photos) for r in routes]
 
     except SQLAlchemyError as e:
         db.rollback()
@@ -551,17 +555,6 @@ def get_public_routes_by_user(
 
         route_uuids = [r.uuid for r in routes]
 
-        likes_counts = dict(
-            (row[0], row[1])
-            for row in db.query(
-                RouteLike.route_uuid,
-                func.count(RouteLike.user_uuid)
-            )
-            .filter(RouteLike.route_uuid.in_(route_uuids))
-            .group_by(RouteLike.route_uuid)
-            .all()
-        )
-
         comments_counts = dict(
             (row[0], row[1])
             for row in db.query(
@@ -588,21 +581,13 @@ def get_public_routes_by_user(
                 .all()
             )
 
+        photos = photos_for_targets(db, settings.ROUTE_TYPE_UUID, route_uuids)
+
         result = []
         for r in routes:
-            result.append({
-                "uuid": r.uuid,
-                "name": r.name,
-                "location": r.location,
-                "avg_rating": r.avg_rating,
-                "likes_count": likes_counts.get(r.uuid, 0),
-                "comments_count": comments_counts.get(r.uuid, 0),
-                "is_favorite": r.uuid in favorites,
-                "thumbnail_url": getattr(r, "thumbnail_url", None),
-                "difficulty_type_name": r.difficulty_type.name if getattr(r, "difficulty_type", None) else None,
-                "route_type_uuid": r.route_type_uuid,
-                "route_type_name": r.route_type.name if getattr(r, "route_type", None) else None,
-            })
+            card = route_card(r, comments_counts, favorites, photos)
+            card["difficulty_type_name"] = r.difficulty_type.name if r.difficulty_type else None
+            result.append(card)
         return result
 
     except HTTPException:
@@ -620,16 +605,11 @@ def get_public_routes_by_user(
         )
 
 
-def like_route(db: Session, user: DBUser, route_id: UUID):
+def like_route(db: Session, user: DBUser, route_id: UUID) -> int:
     try:
-        if not db.query(Route).filter_by(uuid=route_id).first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
-        if db.query(RouteLike).filter_by(user_uuid=user.uuid, route_uuid=route_id).first():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Уже лайкнуто")
-        like = RouteLike(user_uuid=user.uuid, route_uuid=route_id)
-        db.add(like)
-        db.commit()
-        return {"detail": "Маршрут лайкнут"}
+        return add_engagement(
+            db, RouteLike, RouteLike.route_uuid, route_id, user.uuid, "Маршрут не найден", counter=ROUTE_LIKES
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -645,16 +625,12 @@ def like_route(db: Session, user: DBUser, route_id: UUID):
             detail=f"Внутренняя ошибка при лайке маршрута: {str(e)}"
         )
 
-def unlike_route(db: Session, user: DBUser, route_id: UUID):
+def unlike_route(db: Session, user: DBUser, route_id: UUID) -> int:
     try:
-        if not db.query(Route).filter_by(uuid=route_id).first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
-        like = db.query(RouteLike).filter_by(user_uuid=user.uuid, route_uuid=route_id).first()
-        if not like:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Лайка не было")
-        db.delete(like)
-        db.commit()
-        return {"detail": "Лайк снят"}
+        return remove_engagement(
+            db, RouteLike, RouteLike.route_uuid, route_id, user.uuid, Route.uuid, "Маршрут не найден",
+            counter=ROUTE_LIKES,
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -671,26 +647,18 @@ def unlike_route(db: Session, user: DBUser, route_id: UUID):
         )
 
 
-def get_favorites(db: Session, user: DBUser) -> List[RouteCardOut]:
+def get_favorites(db: Session, user: DBUser) -> list[dict]:
     try:
         routes = (
             db.query(Route)
+            # Сложность в карточке не нужна (тип нужен для route_type_name): без лишнего JOIN.
+            .options(noload(Route.difficulty_type))
             .join(RouteFavorite, RouteFavorite.route_uuid == Route.uuid)
             .filter(RouteFavorite.user_uuid == user.uuid)
             .all()
         )
         route_uuids = [r.uuid for r in routes]
 
-        likes_counts = dict(
-            (row[0], row[1])
-            for row in db.query(
-                RouteLike.route_uuid,
-                func.count(RouteLike.user_uuid)
-            )
-            .filter(RouteLike.route_uuid.in_(route_uuids))
-            .group_by(RouteLike.route_uuid)
-            .all()
-        )
         comments_counts = dict(
             (row[0], row[1])
             for row in db.query(
@@ -714,19 +682,14 @@ def get_favorites(db: Session, user: DBUser) -> List[RouteCardOut]:
             .all()
         )
 
+        photos = photos_for_targets(db, settings.ROUTE_TYPE_UUID, route_uuids)
+
+        favorites = set(route_uuids)
         result = []
         for r in routes:
-            result.append(RouteCardOut(
-                uuid=r.uuid,
-                name=r.name,
-                location=r.location,
-                avg_rating=r.avg_rating,
-                likes_count=likes_counts.get(r.uuid, 0),
-                comments_count=comments_counts.get(r.uuid, 0),
-                is_favorite=True,
-                is_liked=r.uuid in liked_uuids,
-                thumbnail_url=getattr(r, "thumbnail_url", None),
-            ))
+            card = route_card(r, comments_counts, favorites, photos)
+            card["is_liked"] = r.uuid in liked_uuids
+            result.append(card)
         return result
 
     except SQLAlchemyError as e:
@@ -741,67 +704,76 @@ def get_favorites(db: Session, user: DBUser) -> List[RouteCardOut]:
             detail=f"Внутренняя ошибка сервера при получении избранных маршрутов: {str(e)}"
         )
 
+
+def add_to_favorites(db: Session, user: DBUser, route_id: UUID) -> int:
+    try:
+        return add_engagement(
+            db, RouteFavorite, RouteFavorite.route_uuid, route_id, user.uuid, "Маршрут не найден"
+        )
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ошибка базы данных при получении избранных маршрутов: {e.__class__.__name__}"
+            detail=f"Ошибка базы данных при добавлении в избранное: {e.__class__.__name__}"
         )
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Внутренняя ошибка сервера при получении избранных маршрутов: {str(e)}"
+            detail=f"Внутренняя ошибка сервера при добавлении в избранное: {str(e)}"
         )
 
-
-def add_to_favorites(db: Session, user: DBUser, route_id: UUID):
+def remove_from_favorites(db: Session, user: DBUser, route_id: UUID) -> int:
     try:
-        if not db.query(Route).filter_by(uuid=route_id).first():
-            raise HTTPException(status_code=404, detail="Маршрут не найден")
-        if db.query(RouteFavorite).filter_by(user_uuid=user.uuid, route_uuid=route_id).first():
-            raise HTTPException(status_code=400, detail="Уже в избранном")
-        fav = RouteFavorite(user_uuid=user.uuid, route_uuid=route_id)
-        db.add(fav)
-        db.commit()
-        return {"detail": "Маршрут добавлен в избранное"}
+        return remove_engagement(
+            db, RouteFavorite, RouteFavorite.route_uuid, route_id, user.uuid, Route.uuid, "Маршрут не найден"
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ошибка базы данных при добавлении в избранное: {e.__class__.__name__}"
+            detail=f"Ошибка базы данных при удалении из избранного: {e.__class__.__name__}"
         )
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Внутренняя ошибка сервера при добавлении в избранное: {str(e)}"
+            detail=f"Внутренняя ошибка сервера при удалении из избранного: {str(e)}"
         )
 
-def remove_from_favorites(db: Session, user: DBUser, route_id: UUID):
+
+def subscribe(db: Session, user: DBUser, route_id: UUID) -> int:
     try:
-        if not db.query(Route).filter_by(uuid=route_id).first():
-            raise HTTPException(status_code=404, detail="Маршрут не найден")
-        fav = db.query(RouteFavorite).filter_by(user_uuid=user.uuid, route_uuid=route_id).first()
-        if not fav:
-            raise HTTPException(status_code=400, detail="Не было в избранном")
-        db.delete(fav)
-        db.commit()
-        return {"detail": "Маршрут удалён из избранного"}
+        return add_engagement(
+            db, RouteSubscriptions, RouteSubscriptions.route_uuid, route_id, user.uuid, "Маршрут не найден"
+        )
     except HTTPException:
         raise
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ошибка базы данных при удалении из избранного: {e.__class__.__name__}"
+            detail=f"Ошибка базы данных при подписке на маршрут: {e.__class__.__name__}"
         )
-    except Exception as e:
+
+
+def unsubscribe(db: Session, user: DBUser, route_id: UUID) -> int:
+    try:
+        return remove_engagement(
+            db, RouteSubscriptions, RouteSubscriptions.route_uuid, route_id, user.uuid, Route.uuid,
+            "Маршрут не найден"
+        )
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Внутренняя ошибка сервера при удалении из избранного: {str(e)}"
+            detail=f"Ошибка базы данных при отписке от маршрута: {e.__class__.__name__}"
         )
 
 
@@ -820,6 +792,7 @@ def set_draft(db: Session, route_id: UUID, current_user: DBUser):
         route.last_edited_by_role = current_user.role
         db.commit()
         db.refresh(route)
+        notifications.fanout.publish(route.uuid, notifications.ROUTE_UNPUBLISHED, current_user.uuid)
         return route
     except HTTPException:
         raise
@@ -872,6 +845,7 @@ def publish_route(db: Session, route_id: UUID, current_user: DBUser):
 
         db.commit()
         db.refresh(route)
+        notifications.fanout.publish(route.uuid, notifications.ROUTE_PUBLISHED, current_user.uuid)
         return route
 
     except HTTPException:
@@ -890,4 +864,173 @@ def publish_route(db: Session, route_id: UUID, current_user: DBUser):
         )
 
 
+def _rating_values(new_sum, new_count) -> dict:
+    """
+    Агрегаты рейтинга маршрута из суммы и числа оценок.
+    Байесовская оценка (C*m + sum) / (C + count) подтягивает маршруты с малым
+    числом оценок к априорному среднему m, поэтому две пятёрки не обгоняют
+    сотни оценок 4.8; у маршрута без оценок она равна m.
+    """
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    return {
+        Route.rating_sum: new_sum,
+        Route.rating_count: new_count,
+        Route.avg_rating: case((new_count > 0, new_sum / new_count), else_=0.0),
+        Route.rating_score: (prior_weight * settings.RATING_PRIOR_MEAN + new_sum) / (prior_weight + new_count),
+        Route.edited_at: Route.edited_at,
+    }
+
+
+def _rating_update_values(sum_delta: float, count_delta: int) -> dict:
+    """
+    Значения для UPDATE агрегатов рейтинга маршрута за O(1): сумма и число оценок
+    сдвигаются на дельту, среднее и байесовская оценка пересчитываются из них.
+    """
+    return _rating_values(Route.rating_sum + sum_delta, Route.rating_count + count_delta)
+
+
+def recount_ratings(db: Session) -> None:
+    """
+    Полностью пересчитывает агрегаты рейтинга всех маршрутов по routes_users_rates.
+    Нужен один раз после добавления колонок и для ручной сверки.
+    """
+    ratings_sum = (
+        db.query(func.coalesce(func.sum(RoutesUsersRates.rating), 0.0))
+        .filter(RoutesUsersRates.route_uuid == Route.uuid)
+        .scalar_subquery()
+    )
+    ratings_count = (
+        db.query(func.count(RoutesUsersRates.route_uuid))
+        .filter(RoutesUsersRates.route_uuid == Route.uuid)
+        .scalar_subquery()
+    )
+    db.query(Route).update(_rating_values(ratings_sum, ratings_count), synchronize_session=False)
+    db.commit()
+
+
+def subtract_ratings(db: Session, removed: dict[UUID, tuple[float, int]]) -> None:
+    """
+    Вычитает из агрегатов рейтинга маршрутов сумму и число оценок, удалённых
+    каскадом (вместе с пользователями), одним UPDATE ... FROM (VALUES ...)
+    в текущей транзакции. removed: {route_uuid: (сумма оценок, число оценок)}.
+    """
+    if not removed:
+        return
+    rows = sorted(
+        ((route_id, rating_sum, rating_count) for route_id, (rating_sum, rating_count) in removed.items()),
+        key=lambda row: str(row[0]),
+    )
+    batch = values(
+        column("route_uuid", PG_UUID(as_uuid=True)),
+        column("rating_sum", Float),
+        column("rating_count", Integer),
+        name="removed_ratings",
+    ).data(rows)
+    db.execute(
+        update(Route)
+        .where(Route.uuid == batch.c.route_uuid)
+        .values(_rating_values(Route.rating_sum - batch.c.rating_sum, Route.rating_count - batch.c.rating_count))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def run_rating_recount() -> None:
+    db = SessionLocal()
+    try:
+        recount_ratings(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Ошибка пересчёта рейтингов маршрутов")
+    finally:
+        db.close()
+
+
+def _rating_result(db: Session, route_id: UUID, my_rating: float | None) -> dict:
+    avg_rating, rating_count, rating_score = (
+        db.query(Route.avg_rating, Route.rating_count, Route.rating_score)
+        .filter(Route.uuid == route_id)
+        .one()
+    )
+    return {
+        "avg_rating": avg_rating,
+        "rating_count": rating_count,
+        "rating_score": rating_score,
+        "my_rating": my_rating,
+    }
+
+
+def rate_route(db: Session, user: DBUser, route_id: UUID, rating: float) -> dict:
+    """
+    Поставить или изменить оценку маршрута.
+    Строка маршрута блокируется на время транзакции, чтобы параллельные оценки
+    не потеряли приращения агрегатов.
+    """
+    try:
+        if not db.query(Route.uuid).filter(Route.uuid == route_id).with_for_update().first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
+
+        rate = db.query(RoutesUsersRates).filter_by(route_uuid=route_id, user_uuid=user.uuid).first()
+        if rate:
+            sum_delta, count_delta = rating - rate.rating, 0
+            rate.rating = rating
+        else:
+            sum_delta, count_delta = rating, 1
+            db.add(RoutesUsersRates(route_uuid=route_id, user_uuid=user.uuid, rating=rating))
+        db.flush()
+
+        db.query(Route).filter(Route.uuid == route_id).update(
+            _rating_update_values(sum_delta, count_delta), synchronize_session=False
+        )
+        result = _rating_result(db, route_id, rating)
+        db.commit()
+        return result
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при оценке маршрута: {str(e)}"
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Внутренняя ошибка сервера при оценке маршрута: {str(e)}"
+        )
+
+
+def remove_rating(db: Session, user: DBUser, route_id: UUID) -> dict:
+    """
+    Снять свою оценку маршрута. Повторное снятие не является ошибкой.
+    """
+    try:
+        if not db.query(Route.uuid).filter(Route.uuid == route_id).with_for_update().first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
 
+        rate = db.query(RoutesUsersRates).filter_by(route_uuid=route_id, user_uuid=user.uuid).first()
+        if rate:
+            db.delete(rate)
+            db.flush()
+            db.query(Route).filter(Route.uuid == route_id).update(
+                _rating_update_values(-rate.rating, -1), synchronize_session=False
+            )
+        result = _rating_result(db, route_id, None)
+        db.commit()
+        return result
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при снятии оценки маршрута: {str(e)}"
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Внутренняя ошибка сервера при снятии оценки маршрута: {str(e)}"
+        )
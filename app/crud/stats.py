@@ -0,0 +1,223 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, cast, func, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.bridging import CommentLike, RouteLike
+from app.models.comments import Comment
+from app.models.jobs import JobWatermark
+from app.models.routes import Route
+from app.models.stats import DailyStats, UserActivityDay
+from app.models.users import DBUser
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "daily_stats"
+# Ключ pg_advisory_xact_lock: пересчёт выполняет только один воркер одновременно.
+ADVISORY_LOCK_ID = 310_002
+# Перекрытие окна изменений на случай транзакций, закоммиченных после прошлого прохода.
+WATERMARK_OVERLAP = timedelta(minutes=2)
+BACKFILL_CHUNK_DAYS = 31
+MAX_RANGE_DAYS = 3660
+
+METRICS = (
+    "registrations",
+    "logins",
+    "active_users",
+    "routes_created",
+    "routes_published",
+    "route_likes",
+    "comment_likes",
+    "comments",
+)
+# active_users нельзя складывать по дням: один пользователь активен в разные дни.
+SUMMABLE_METRICS = tuple(m for m in METRICS if m != "active_users")
+
+
+def _tz() -> ZoneInfo:
+    return ZoneInfo(settings.STATS_TIMEZONE)
+
+
+def local_today() -> date:
+    return datetime.now(_tz()).date()
+
+
+def _local_day(column):
+    return cast(func.timezone(settings.STATS_TIMEZONE, column), Date)
+
+
+def record_user_activity(db: Session, user_uuid: UUID, login: bool) -> None:
+    """
+    Отмечает активность пользователя за сегодня (в текущей транзакции):
+    вход по паролю увеличивает число входов, обновление токена — только отмечает день.
+    """
+    stmt = pg_insert(UserActivityDay).values(
+        user_uuid=user_uuid,
+        day=_local_day(func.now()),
+        logins=1 if login else 0,
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserActivityDay.user_uuid, UserActivityDay.day],
+        set_={"logins": UserActivityDay.logins + stmt.excluded.logins},
+    ))
+
+
+def _metric_sources(start: date, end: date):
+    """
+    Запросы (metric, stat_day, value) по исходным таблицам за дни [start, end].
+    Фильтры по диапазону времени идут по индексам created_at / published_at.
+    """
+    lower = datetime.combine(start, time(), _tz())
+    upper = datetime.combine(end + timedelta(days=1), time(), _tz())
+
+    def counted(metric: str, column, *conditions):
+        return (
+            select(literal(metric).label("metric"), _local_day(column).label("stat_day"), func.count().label("value"))
+            .where(column >= lower, column < upper, *conditions)
+            .group_by(literal_column("stat_day"))
+        )
+
+    def activity(metric: str, value):
+        return (
+            select(literal(metric).label("metric"), UserActivityDay.day.label("stat_day"), value.label("value"))
+            .where(UserActivityDay.day.between(start, end))
+            .group_by(UserActivityDay.day)
+        )
+
+    return [
+        counted("registrations", DBUser.created_at),
+        counted("routes_created", Route.created_at),
+        counted("routes_published", Route.published_at, Route.is_public.is_(True)),
+        counted("route_likes", RouteLike.created_at),
+        counted("comment_likes", CommentLike.created_at),
+        counted("comments", Comment.created_at),
+        activity("logins", func.sum(UserActivityDay.logins)),
+        activity("active_users", func.count()),
+    ]
+
+
+def rollup_days(db: Session, start: date, end: date) -> int:
+    """
+    Пересчитывает строки daily_stats за дни [start, end] (в текущей транзакции).
+    Пересчёт дня идемпотентен: строка целиком заменяется актуальными значениями.
+    """
+    days = {start + timedelta(days=i): dict.fromkeys(METRICS, 0) for i in range((end - start).days + 1)}
+    for metric, day, value in db.execute(union_all(*_metric_sources(start, end))):
+        if day in days:
+            days[day][metric] = value
+    stmt = pg_insert(DailyStats).values([{"day": day, **values} for day, values in days.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStats.day],
+        set_={**{metric: stmt.excluded[metric] for metric in METRICS}, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+    return len(days)
+
+
+def refresh_daily_stats(db: Session) -> int:
+    """
+    Инкрементальный пересчёт: дни, в которые попадают изменения после прошлого
+    прохода (обычно только сегодняшний, после полуночи — ещё и вчерашний).
+    Без отметки о прошлом проходе пересчитывается только сегодняшний день,
+    историю заполняет backfill_daily_stats.
+    Строки за прошедшие дни — снимки: удаления, снятые лайки и снятие с публикации
+    их не меняют, пока эти дни не пересчитает backfill_daily_stats.
+    Возвращает количество пересчитанных дней (0, если задачу уже выполняет другой воркер).
+    """
+    if not db.execute(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_ID))).scalar():
+        db.rollback()
+        return 0
+
+    now = db.execute(select(func.now())).scalar_one()
+    today = now.astimezone(_tz()).date()
+    watermark = db.get(JobWatermark, JOB_NAME)
+    start = min((watermark.value - WATERMARK_OVERLAP).astimezone(_tz()).date(), today) if watermark else today
+    updated = rollup_days(db, start, today)
+
+    db.execute(
+        pg_insert(JobWatermark)
+        .values(name=JOB_NAME, value=now)
+        .on_conflict_do_update(index_elements=[JobWatermark.name], set_={"value": now})
+    )
+    db.commit()
+    return updated
+
+
+def backfill_daily_stats(db: Session, start: date | None = None, end: date | None = None) -> int:
+    """
+    Пересчитывает daily_stats за [start, end] пачками по BACKFILL_CHUNK_DAYS дней,
+    каждая в своей транзакции. По умолчанию — с дня первой регистрации по сегодня.
+    """
+    if end is None:
+        end = db.execute(select(_local_day(func.now()))).scalar_one()
+    if start is None:
+        start = db.execute(select(func.min(_local_day(DBUser.created_at)))).scalar() or end
+    total = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
+        db.execute(select(func.pg_advisory_xact_lock(ADVISORY_LOCK_ID)))
+        total += rollup_days(db, chunk_start, chunk_end)
+        db.commit()
+        chunk_start = chunk_end + timedelta(days=1)
+    logger.info("Статистика: пересчитано дней: %s (%s — %s)", total, start, end)
+    return total
+
+
+def run_stats_rollup() -> None:
+    db = SessionLocal()
+    try:
+        refresh_daily_stats(db)
+    finally:
+        db.close()
+
+
+def run_stats_backfill(start: date | None = None, end: date | None = None) -> None:
+    db = SessionLocal()
+    try:
+        backfill_daily_stats(db, start, end)
+    except Exception:
+        db.rollback()
+        logger.exception("Ошибка пересчёта статистики")
+    finally:
+        db.close()
+
+
+def get_stats(db: Session, date_from: date, date_to: date) -> dict:
+    """
+    Статистика за [date_from, date_to] из daily_stats: по строке на день
+    (дни без строки — нулевые) и суммы за период.
+    """
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Начало периода позже конца")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может быть длиннее {MAX_RANGE_DAYS} дней"
+        )
+    try:
+        rows = {
+            row.day: row
+            for row in db.query(DailyStats).filter(DailyStats.day.between(date_from, date_to))
+        }
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при получении статистики: {e.__class__.__name__}"
+        )
+    days = []
+    for i in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=i)
+        row = rows.get(day)
+        days.append({"day": day, **{metric: getattr(row, metric) if row else 0 for metric in METRICS}})
+    totals = {metric: sum(d[metric] for d in days) for metric in SUMMABLE_METRICS}
+    updated_at = max((row.updated_at for row in rows.values()), default=None)
+    return {"date_from": date_from, "date_to": date_to, "updated_at": updated_at, "days": days, "totals": totals}
@@ -0,0 +1,249 @@
+import logging
+import os
+import queue
+import threading
+import time
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import String, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.maps import geometry_hash, parse_wkb_linestring, render_batch
+from app.core.tasks import image_pool
+from app.db.session import SessionLocal
+from app.models.routes import Route
+from app.models.waypoints import Waypoint
+
+logger = logging.getLogger(__name__)
+
+MAPS_DIR = "maps"
+# Маршрутов в одной задаче пула: меньше накладных расходов на передачу между процессами.
+RENDER_CHUNK_SIZE = 50
+
+
+def _map_path(geometry: str) -> str:
+    return os.path.join(settings.MEDIA_UPLOAD_DIR, MAPS_DIR, geometry[:2], f"{geometry}.png")
+
+
+def _map_url_prefix() -> str:
+    return f"{settings.BASE_STATIC_URL}/media/{MAPS_DIR}/"
+
+
+def _map_url(geometry: str) -> str:
+    return f"{_map_url_prefix()}{geometry[:2]}/{geometry}.png"
+
+
+def _route_coords(db: Session, route_uuids: list[UUID]) -> dict[UUID, np.ndarray]:
+    """
+    Координаты маршрутов (lon, lat): линия geo_data, а если её нет — точки маршрута по порядку.
+    """
+    coords = {}
+    rows = (
+        db.query(Route.uuid, func.ST_AsBinary(Route.geo_data))
+        .filter(Route.uuid.in_(route_uuids), Route.geo_data.isnot(None))
+        .all()
+    )
+    for route_uuid, wkb in rows:
+        try:
+            coords[route_uuid] = parse_wkb_linestring(bytes(wkb))
+        except ValueError:
+            logger.warning("Маршрут %s: неподдерживаемая геометрия", route_uuid)
+
+    missing = [u for u in route_uuids if u not in coords]
+    if missing:
+        points: dict[UUID, list[tuple[float, float]]] = {}
+        for route_uuid, lon, lat in (
+            db.query(Waypoint.route_uuid, Waypoint.lon, Waypoint.lat)
+            .filter(Waypoint.route_uuid.in_(missing))
+            .order_by(Waypoint.route_uuid, Waypoint.order)
+        ):
+            points.setdefault(route_uuid, []).append((lon, lat))
+        coords.update({u: np.array(p, dtype=np.float64) for u, p in points.items()})
+    return coords
+
+
+def render_thumbnails(db: Session, route_uuids: list[UUID]) -> int:
+    """
+    Рисует превью карт для маршрутов и проставляет thumbnail_url.
+    Картинка кешируется по хешу геометрии: маршруты с неизменившейся
+    (или совпадающей) геометрией не перерисовываются. thumbnail_url, заданный
+    клиентом вручную, не перезаписывается.
+    Возвращает количество обновлённых маршрутов.
+    """
+    coords = _route_coords(db, route_uuids)
+    if not coords:
+        return 0
+    urls, jobs = {}, []
+    for route_uuid, route_coords in coords.items():
+        geometry = geometry_hash(route_coords)
+        urls[route_uuid] = _map_url(geometry)
+        jobs.append((route_uuid, route_coords, _map_path(geometry)))
+
+    futures = [
+        (chunk, image_pool.submit(render_batch, [(c, path) for _, c, path in chunk]))
+        for chunk in (jobs[i:i + RENDER_CHUNK_SIZE] for i in range(0, len(jobs), RENDER_CHUNK_SIZE))
+    ]
+    rendered = []
+    for chunk, future in futures:
+        for (route_uuid, _, _), ok in zip(chunk, future.result()):
+            if ok:
+                rendered.append((route_uuid, urls[route_uuid]))
+            else:
+                logger.warning("Не удалось нарисовать превью маршрута %s", route_uuid)
+    if not rendered:
+        return 0
+
+    batch = values(
+        column("route_uuid", PG_UUID(as_uuid=True)),
+        column("url", String),
+        name="thumbnails",
+    ).data(rendered)
+    result = db.execute(
+        update(Route)
+        .where(
+            Route.uuid == batch.c.route_uuid,
+            or_(Route.thumbnail_url.is_(None), Route.thumbnail_url.startswith(_map_url_prefix())),
+            Route.thumbnail_url.is_distinct_from(batch.c.url),
+        )
+        # Превью — производные данные, а не редактирование маршрута.
+        .values({Route.thumbnail_url: batch.c.url, Route.edited_at: Route.edited_at})
+    )
+    db.commit()
+    return result.rowcount
+
+
+def backfill_thumbnails(db: Session, batch_size: int = 1000) -> int:
+    """
+    Генерирует превью для всех маршрутов без thumbnail_url, пачками по batch_size
+    (keyset по uuid). Пачка рендерится параллельно во всех процессах пула.
+    """
+    total = 0
+    last_uuid = None
+    while True:
+        query = db.query(Route.uuid).filter(Route.thumbnail_url.is_(None))
+        if last_uuid is not None:
+            query = query.filter(Route.uuid > last_uuid)
+        route_uuids = [row[0] for row in query.order_by(Route.uuid).limit(batch_size)]
+        if not route_uuids:
+            return total
+        total += render_thumbnails(db, route_uuids)
+        last_uuid = route_uuids[-1]
+        logger.info("Превью маршрутов: обработано до %s, обновлено %s", last_uuid, total)
+
+
+def _remove_unused_maps(db: Session, candidates: dict[str, str], cutoff: float) -> int:
+    used = set(db.execute(
+        select(Route.thumbnail_url).where(Route.thumbnail_url.in_(list(candidates)))
+    ).scalars())
+    db.rollback()
+    removed = 0
+    for url, path in candidates.items():
+        if url in used:
+            continue
+        try:
+            # Повторная проверка: render_batch обновляет время файла, который использует снова.
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def sweep_unused_maps(db: Session, batch_size: int = 500) -> int:
+    """
+    Удаляет превью карт старше MEDIA_GC_GRACE_HOURS, на которые не ссылается
+    thumbnail_url ни одного маршрута: после изменения геометрии или точек маршрут
+    получает картинку с новым хешем, а прежняя остаётся, если совпадающей
+    геометрии больше ни у кого нет. Выполняется вместе со сборкой мусора медиа.
+    Возвращает количество удалённых файлов.
+    """
+    cutoff = time.time() - settings.MEDIA_GC_GRACE_HOURS * 3600
+    removed = 0
+    candidates: dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(os.path.join(settings.MEDIA_UPLOAD_DIR, MAPS_DIR)):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            # Недописанные .part-файлы не совпадут ни с одним thumbnail_url.
+            name, ext = os.path.splitext(filename)
+            candidates[_map_url(name) if ext == ".png" else path] = path
+            if len(candidates) >= batch_size:
+                removed += _remove_unused_maps(db, candidates, cutoff)
+                candidates = {}
+    if candidates:
+        removed += _remove_unused_maps(db, candidates, cutoff)
+    return removed
+
+
+BACKFILL = "backfill"
+
+
+class ThumbnailWorker:
+    """
+    Очередь маршрутов, которым нужно (пере)нарисовать превью, и фоновый поток,
+    который их обрабатывает. Изменения, накопившиеся в очереди, обрабатываются
+    одной пачкой; повторные изменения одного маршрута схлопываются.
+    """
+
+    MAX_BATCH = 500
+
+    def __init__(self):
+        self._queue: queue.Queue[UUID | str | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, route_uuid: UUID) -> None:
+        self._queue.put(route_uuid)
+
+    def request_backfill(self) -> None:
+        self._queue.put(BACKFILL)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="route-thumbnails", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 30.0) -> None:
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _drain(self, first) -> tuple[set, bool, bool]:
+        items = [first]
+        while len(items) < self.MAX_BATCH:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        stop = None in items
+        backfill = BACKFILL in items
+        return {i for i in items if isinstance(i, UUID)}, backfill, stop
+
+    def _run(self) -> None:
+        while True:
+            route_uuids, backfill, stop = self._drain(self._queue.get())
+            db = SessionLocal()
+            try:
+                if route_uuids:
+                    render_thumbnails(db, list(route_uuids))
+                if backfill:
+                    backfill_thumbnails(db)
+            except Exception:
+                db.rollback()
+                logger.exception("Ошибка генерации превью маршрутов")
+            finally:
+                db.close()
+            if stop:
+                return
+
+
+worker = ThumbnailWorker()
@@ -0,0 +1,119 @@
+import logging
+import math
+from datetime import timedelta
+
+from sqlalchemy import select, union_all, literal, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.bridging import RouteLike, RouteFavorite, RoutesUsersRates
+from app.models.comments import Comment
+from app.models.jobs import JobWatermark
+from app.models.routes import Route
+from app.models.trending import RouteTrendingScore
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "trending_scores"
+# Ключ pg_advisory_xact_lock: задачу выполняет только один воркер одновременно.
+ADVISORY_LOCK_ID = 310_001
+# Фиксированная эпоха логарифмической шкалы (2024-01-01T00:00:00Z).
+SCORE_EPOCH = 1_704_067_200
+# Перекрытие окна изменений на случай транзакций, закоммиченных после прошлого прохода.
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+LIKE_WEIGHT = 1.0
+FAVORITE_WEIGHT = 2.0
+COMMENT_WEIGHT = 1.5
+RATING_WEIGHT = 1.0
+
+
+def _decay_rate() -> float:
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def _event_sources(since):
+    """
+    Взаимодействия с маршрутами после since: (route_uuid, happened_at, weight).
+    """
+    sources = [
+        (RouteLike.route_uuid, RouteLike.created_at, LIKE_WEIGHT, []),
+        (RouteFavorite.route_uuid, RouteFavorite.created_at, FAVORITE_WEIGHT, []),
+        (Comment.target_uuid, Comment.created_at, COMMENT_WEIGHT, [Comment.target_type_id == settings.ROUTE_TYPE_UUID]),
+        (RoutesUsersRates.route_uuid, RoutesUsersRates.rated_at, RATING_WEIGHT, []),
+    ]
+    return [
+        select(
+            target.label("route_uuid"),
+            happened_at.label("happened_at"),
+            literal(weight).label("weight"),
+        ).where(happened_at > since, *conditions)
+        for target, happened_at, weight, conditions in sources
+    ]
+
+
+def refresh_trending_scores(db: Session) -> int:
+    """
+    Инкрементально пересчитывает trending-оценки маршрутов, с которыми были
+    взаимодействия после прошлого прохода.
+
+    Оценка маршрута — сумма весов событий за TRENDING_WINDOW_DAYS с экспоненциальным
+    затуханием (период полураспада TRENDING_HALF_LIFE_HOURS), хранимая как
+        ln(sum(w * exp(-λ * (now - t)))) + λ * (now - SCORE_EPOCH).
+    Второе слагаемое переносит все оценки на общую временную шкалу, поэтому
+    нетронутые маршруты не нужно пересчитывать: их оценка «затухает» относительно
+    свежих автоматически. Пересчёт одного маршрута идемпотентен.
+
+    Возвращает количество обновлённых маршрутов (0, если задачу уже выполняет другой воркер).
+    """
+    if not db.execute(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_ID))).scalar():
+        db.rollback()
+        return 0
+
+    now = db.execute(select(func.now())).scalar_one()
+    window_start = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    watermark = db.get(JobWatermark, JOB_NAME)
+    since = max(watermark.value - WATERMARK_OVERLAP, window_start) if watermark else window_start
+
+    touched = union_all(*_event_sources(since)).subquery("touched")
+    events = union_all(*_event_sources(window_start)).subquery("events")
+    route_uuid, happened_at, weight = events.c.route_uuid, events.c.happened_at, events.c.weight
+
+    decay_rate = _decay_rate()
+    age_seconds = func.extract("epoch", func.now() - happened_at)
+    score = (
+        func.ln(func.sum(weight * func.exp(-decay_rate * age_seconds)))
+        + decay_rate * (func.extract("epoch", func.now()) - SCORE_EPOCH)
+    )
+    scores = (
+        select(route_uuid, score, func.now())
+        .join(Route, Route.uuid == route_uuid)
+        .where(route_uuid.in_(select(touched.c.route_uuid)))
+        .group_by(route_uuid)
+    )
+    stmt = pg_insert(RouteTrendingScore).from_select(["route_uuid", "score", "updated_at"], scores)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RouteTrendingScore.route_uuid],
+        set_={"score": stmt.excluded.score, "updated_at": stmt.excluded.updated_at},
+    )
+    updated = db.execute(stmt).rowcount
+
+    db.execute(
+        pg_insert(JobWatermark)
+        .values(name=JOB_NAME, value=now)
+        .on_conflict_do_update(index_elements=[JobWatermark.name], set_={"value": now})
+    )
+    db.commit()
+    return updated
+
+
+def run_trending_refresh() -> None:
+    db = SessionLocal()
+    try:
+        updated = refresh_trending_scores(db)
+        if updated:
+            logger.info("Trending: пересчитано маршрутов: %s", updated)
+    finally:
+        db.close()
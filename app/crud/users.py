@@ -1,27 +1,42 @@
-import os
-import shutil, uuid
-from sqlalchemy import or_
+import logging
+from sqlalchemy import or_, func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from typing import List
 from app.core.config import settings
+from app.crud import media
+from app.crud.pagination import encode_key_cursor, decode_key_cursor
+from app.db.session import SessionLocal
 from app.models.users import DBUser
 from app.schemas.users import UserUpdate
 
+logger = logging.getLogger(__name__)
+
+
+def user_lookup_filter(identifier: str):
+    """
+    Условие поиска пользователя по логину или email без учёта регистра.
+    Логин не может содержать «@», поэтому вид идентификатора определяет,
+    по какому из уникальных индексов (lower(login) / lower(email)) идёт поиск.
+    """
+    if "@" in identifier:
+        return func.lower(DBUser.email) == identifier.lower()
+    return func.lower(DBUser.login) == identifier.lower()
+
 
 def get_user(
         db: Session,
         identifier: str
 ) -> DBUser | None:
-    return db.query(DBUser).filter(or_(DBUser.login == identifier, DBUser.email == identifier)).first()
+    return db.query(DBUser).filter(user_lookup_filter(identifier)).first()
 
 
 def ensure_login_unique(
         db: Session,
         login: str
 ) -> None:
-    if db.query(DBUser).filter(DBUser.login == login).first():
+    if db.query(DBUser.uuid).filter(func.lower(DBUser.login) == login.lower()).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Логин уже используется другим пользователем"
@@ -32,7 +47,7 @@ def ensure_email_unique(
         db: Session,
         email: str
 ) -> None:
-    if db.query(DBUser).filter(DBUser.email == email).first():
+    if db.query(DBUser.uuid).filter(func.lower(DBUser.email) == email.lower()).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email уже используется другим пользователем"
@@ -50,6 +65,50 @@ def get_users_list(
     return db.query(DBUser).offset(skip).limit(limit).all()
 
 
+SEARCH_MAX_TERMS = 3
+
+
+def _like_prefix(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def search_users(
+        db: Session,
+        q: str,
+        cursor: str | None = None,
+        limit: int = 20
+) -> dict:
+    """
+    Поиск по справочнику пользователей: каждое слово запроса должно быть
+    началом логина, имени или фамилии (без учёта регистра). Условия
+    lower(col) LIKE 'слово%' обслуживаются индексами text_pattern_ops,
+    страницы — keyset по логину.
+    """
+    terms = q.lower().split()[:SEARCH_MAX_TERMS]
+    if not terms:
+        return {"items": [], "next_cursor": None}
+    try:
+        query = db.query(DBUser).filter(DBUser.is_blocked.is_(False))
+        for term in terms:
+            pattern = _like_prefix(term)
+            query = query.filter(or_(
+                func.lower(DBUser.login).like(pattern),
+                func.lower(DBUser.first_name).like(pattern),
+                func.lower(DBUser.last_name).like(pattern),
+            ))
+        if cursor:
+            query = query.filter(DBUser.login > decode_key_cursor(cursor))
+        users = query.order_by(DBUser.login).limit(limit + 1).all()
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка базы данных при поиске пользователей: {e.__class__.__name__}"
+        )
+    next_cursor = encode_key_cursor(users[limit - 1].login) if len(users) > limit else None
+    return {"items": users[:limit], "next_cursor": next_cursor}
+
+
 def update_user(
         db: Session,
         user: DBUser,
@@ -78,36 +137,70 @@ def update_user(
         )
 
 
+AVATAR_SIZES = (64, 128, 256)
+# Размер аватара в списках (комментарии, посты, новости).
+LIST_AVATAR_SIZE = 64
+
+
+def avatar_column(size: int = LIST_AVATAR_SIZE):
+    """
+    SQL-выражение URL аватара нужного размера; пока копии не готовы
+    (или аватар задан внешней ссылкой) — URL оригинала.
+    """
+    return func.coalesce(DBUser.avatar_variants[str(size)].astext, DBUser.profile_picture)
+
+
+def avatar_url(user: DBUser, size: int = LIST_AVATAR_SIZE) -> str | None:
+    return (user.avatar_variants or {}).get(str(size)) or user.profile_picture
+
+
+def _on_avatar_variants_ready(user_id, original_url: str, variants: dict[str, str] | None) -> None:
+    if not variants:
+        return
+    db = SessionLocal()
+    try:
+        # Если пока шла обработка пользователь сменил аватар, копии уже не нужны.
+        db.query(DBUser).filter(DBUser.uuid == user_id, DBUser.profile_picture == original_url) \
+            .update({DBUser.avatar_variants: variants}, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Не удалось сохранить копии аватара пользователя %s", user_id)
+    finally:
+        db.close()
+
+
 def update_avatar(
     db: Session,
     user: DBUser,
     file
 ) -> DBUser:
-    upload_dir = settings.AVATAR_UPLOAD_DIR
-    os.makedirs(upload_dir, exist_ok=True)
-    ext = os.path.splitext(file.filename)[1].lower()
-    if ext not in [".jpg", ".jpeg", ".png", ".gif"]:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Недопустимый формат файла")
-    filename = f"{user.login}_{uuid.uuid4().hex}{ext}"
-    filepath = os.path.join(upload_dir, filename)
+    """
+    Сохраняет аватар в хранилище медиа потоково с ограничением AVATAR_MAX_BYTES;
+    формат определяется по содержимому файла. Копии AVATAR_SIZES создаются
+    в фоне в пуле процессов (или берутся готовые, если файл уже загружался),
+    до их готовности везде отдаётся оригинал.
+    """
     try:
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        user.profile_picture = f"{settings.BASE_STATIC_URL}/avatars/{filename}"
+        stored = media.store_upload(db, file, settings.AVATAR_MAX_BYTES)
+        media.release(db, user.profile_picture)
+        user.profile_picture = media.object_url(stored)
+        user.avatar_variants = media.ready_variants(stored, AVATAR_SIZES)
         db.commit()
         db.refresh(user)
-        return user
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при загрузке аватара: {str(e)}"
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Неизвестная ошибка при загрузке аватара: {str(e)}"
+    if user.avatar_variants is None:
+        user_id, original_url = user.uuid, user.profile_picture
+        media.render_missing_variants(
+            stored, AVATAR_SIZES,
+            on_ready=lambda variants: _on_avatar_variants_ready(user_id, original_url, variants),
         )
+    return user
 
 
 def update_avatar_url(
@@ -116,7 +209,9 @@ def update_avatar_url(
     new_profile_picture: str
 ) -> DBUser:
     try:
+        media.release(db, user.profile_picture)
         user.profile_picture = new_profile_picture
+        user.avatar_variants = None
         db.commit()
         db.refresh(user)
         return user
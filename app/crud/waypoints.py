@@ -2,6 +2,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from uuid import UUID
 from fastapi import HTTPException, status
+from app.crud import thumbnails
 from app.models.waypoints import Waypoint, WaypointType
 from app.models.routes import Route
 from app.models.users import DBUser, UserRole
@@ -20,6 +21,12 @@ def _reindex_and_retype_connected(waypoints: list):
 
 
 
+def _publish_thumbnail(route_id: UUID, draws_from_waypoints: bool) -> None:
+    # Превью маршрута без линии geo_data рисуется по точкам и после их изменения устаревает.
+    if draws_from_waypoints:
+        thumbnails.worker.publish(route_id)
+
+
 def get_waypoints(db: Session, route_id: UUID):
     try:
         return db.query(Waypoint).filter(Waypoint.route_uuid == route_id).order_by(Waypoint.order).all()
@@ -44,6 +51,7 @@ def add_waypoint(db: Session, route_id: UUID, data: WaypointCreate, user: DBUser
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Нет прав на изменение маршрута"
             )
+        draws_from_waypoints = route.geo_data is None
 
         if data.type == "isolated":
             wp = Waypoint(
@@ -57,6 +65,7 @@ def add_waypoint(db: Session, route_id: UUID, data: WaypointCreate, user: DBUser
             db.add(wp)
             db.commit()
             db.refresh(wp)
+            _publish_thumbnail(route_id, draws_from_waypoints)
             return wp
 
         connected = db.query(Waypoint).filter(
@@ -78,6 +87,7 @@ def add_waypoint(db: Session, route_id: UUID, data: WaypointCreate, user: DBUser
         _reindex_and_retype_connected(connected)
         db.commit()
         db.refresh(wp)
+        _publish_thumbnail(route_id, draws_from_waypoints)
         return wp
 
     except HTTPException:
@@ -153,6 +163,7 @@ def update_waypoint(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Нет прав на изменение точки"
             )
+        draws_from_waypoints = route.geo_data is None
 
         if wp.type != WaypointType.isolated:
             allowed_fields = {'description', 'photo_url'}
@@ -170,6 +181,7 @@ def update_waypoint(
 
         db.commit()
         db.refresh(wp)
+        _publish_thumbnail(route_id, draws_from_waypoints)
         return wp
 
     except HTTPException:
@@ -210,6 +222,7 @@ def delete_waypoint(db: Session, route_id: UUID, waypoint_id: UUID, user: DBUser
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Нет прав на удаление точки"
             )
+        draws_from_waypoints = route.geo_data is None
 
         if wp.type != WaypointType.isolated:
             connected = db.query(Waypoint).filter(
@@ -222,6 +235,7 @@ def delete_waypoint(db: Session, route_id: UUID, waypoint_id: UUID, user: DBUser
         else:
             db.delete(wp)
         db.commit()
+        _publish_thumbnail(route_id, draws_from_waypoints)
         return {"message": "Точка успешно удалена"}
     except HTTPException:
         raise
@@ -1,9 +1,66 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, instrument_engine, metrics_endpoint
+from app.core.pg_listener import listener
+from app.core.query_audit import QueryAuditMiddleware
+from app.core.tasks import PeriodicTask, image_pool
+from app.crud import counters, media, news, notifications, stats, thumbnails, trending
+from app.crud.dictionaries import registry
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        registry.load()
+    except Exception:
+        logger.exception("Не удалось загрузить справочники при старте, повторим при первом обращении")
+    dictionaries_refresher = PeriodicTask(
+        "dictionaries-refresh", settings.DICTIONARY_REFRESH_SECONDS, registry.refresh
+    )
+    dictionaries_refresher.start()
+    counters_flusher = None
+    if settings.ENGAGEMENT_WRITE_BEHIND:
+        counters_flusher = PeriodicTask(
+            "counters-flush", settings.ENGAGEMENT_FLUSH_INTERVAL_MS / 1000, counters.buffer.flush
+        )
+        counters_flusher.start()
+    trending_refresher = PeriodicTask(
+        "trending-refresh", settings.TRENDING_REFRESH_SECONDS, trending.run_trending_refresh
+    )
+    trending_refresher.start()
+    media_gc = PeriodicTask("media-gc", settings.MEDIA_GC_INTERVAL_SECONDS, media.run_media_gc)
+    media_gc.start()
+    stats_rollup = PeriodicTask("stats-rollup", settings.STATS_ROLLUP_INTERVAL_SECONDS, stats.run_stats_rollup)
+    stats_rollup.start()
+    notifications.fanout.start()
+    thumbnails.worker.start()
+    listener.subscribe(news.NEWS_CHANNEL, news.feed.on_notify)
+    listener.start()
+    yield
+    listener.stop()
+    notifications.fanout.stop()
+    thumbnails.worker.stop()
+    image_pool.shutdown()
+    dictionaries_refresher.stop()
+    trending_refresher.stop()
+    media_gc.stop()
+    stats_rollup.stop()
+    if counters_flusher:
+        counters_flusher.stop()
+        counters.buffer.flush()
+
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="TurTut API")
+    app = FastAPI(title="TurTut API", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -11,7 +68,26 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
         allow_credentials=True,
     )
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+    if settings.METRICS_ENABLED or settings.QUERY_DEBUG:
+        instrument_engine(engine)
+    if settings.QUERY_DEBUG:
+        app.add_middleware(
+            QueryAuditMiddleware,
+            strict=settings.QUERY_BUDGET_STRICT,
+            repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+        )
+    if settings.METRICS_ENABLED:
+        # Добавляется последним, чтобы быть внешним и учитывать время остальных middleware.
+        app.add_middleware(MetricsMiddleware)
+        app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
     app.include_router(api_router)
     return app
 
-app = create_app()
\ No newline at end of file
+app = create_app()
@@ -17,3 +17,9 @@ from .bridging import (
 from .target_types import TargetType
 from .dictionaries import RouteType, DifficultyType
 from .waypoints import Waypoint
+from .trending import RouteTrendingScore
+from .jobs import JobWatermark
+from .notifications import Notification
+from .news import News
+from .media import MediaObject
+from .stats import DailyStats, UserActivityDay
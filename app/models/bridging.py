@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Float
+from sqlalchemy import Column, ForeignKey, Float, DateTime, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.models.base import Base
@@ -9,6 +9,9 @@ class PostsPostTags(Base):
     Промежуточная таблица для связи M:N между постами и тегами постов.
     """
     __tablename__ = "posts_post_tags"
+    __table_args__ = (
+        Index("ix_posts_post_tags_tag_post", "post_tag_uuid", "post_uuid"),
+    )
 
     post_uuid = Column(UUID(as_uuid=True), ForeignKey("posts.uuid", ondelete="CASCADE"), primary_key=True)
     post_tag_uuid = Column(UUID(as_uuid=True), ForeignKey("post_tags.uuid", ondelete="CASCADE"), primary_key=True)
@@ -33,6 +36,7 @@ class RoutesUsersRates(Base):
     route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), primary_key=True)
     user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
     rating = Column(Float, nullable=False)
+    rated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now(), index=True)
 
 
 class RouteSubscriptions(Base):
@@ -42,7 +46,7 @@ class RouteSubscriptions(Base):
     __tablename__ = "route_subscriptions"
 
     route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), primary_key=True)
-    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
+    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True, index=True)
 
 
 class CommentLike(Base):
@@ -53,6 +57,7 @@ class CommentLike(Base):
 
     comment_uuid = Column(UUID(as_uuid=True), ForeignKey("comments.uuid", ondelete="CASCADE"), primary_key=True)
     user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
 
 
 class RouteLike(Base):
@@ -63,6 +68,7 @@ class RouteLike(Base):
 
     route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), primary_key=True)
     user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
 
 
 class RouteFavorite(Base):
@@ -72,4 +78,5 @@ class RouteFavorite(Base):
     __tablename__ = "route_favorites"
 
     route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), primary_key=True)
-    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
\ No newline at end of file
+    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
\ No newline at end of file
@@ -1,7 +1,6 @@
 import uuid
-import datetime
 
-from sqlalchemy import Column, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Text, DateTime, Integer, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.models.base import Base
@@ -14,6 +13,10 @@ class Comment(Base):
     через полиморфную связь: target_type_id + target_uuid.
     """
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_target_created", "target_type_id", "target_uuid", "created_at", "uuid"),
+        Index("ix_comments_created_at", "created_at"),
+    )
 
 
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -21,8 +24,5 @@ class Comment(Base):
     target_type_id = Column(UUID(as_uuid=True), ForeignKey("target_types.uuid"), nullable=True)
     target_uuid = Column(UUID(as_uuid=True), nullable=True)
     comment_text = Column(Text, nullable=False)
-    created_at = Column(
-        DateTime(timezone=True),
-        nullable=False,
-        default=datetime.datetime.now(datetime.timezone.utc)
-    )
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
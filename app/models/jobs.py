@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+
+from app.models.base import Base
+
+
+class JobWatermark(Base):
+    """
+    Отметка, до которой фоновая задача уже обработала данные.
+    Позволяет инкрементальным задачам продолжать с места остановки после рестарта.
+    """
+    __tablename__ = "job_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(DateTime(timezone=True), nullable=False)
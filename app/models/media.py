@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.base import Base
+
+
+class MediaObject(Base):
+    """
+    Файл в контентно-адресуемом хранилище: имя файла — SHA-256 содержимого,
+    поэтому одинаковые загрузки хранятся один раз, а URL неизменяем.
+    ref_count — число сущностей (фотографий, аватаров), ссылающихся на файл;
+    объекты с нулевым счётчиком удаляет сборщик мусора после released_at + грейс-период.
+    """
+    __tablename__ = "media_objects"
+    sha256 = Column(String(64), primary_key=True)
+    ext = Column(String(10), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    variants = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    released_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_media_objects_orphans", released_at, postgresql_where=ref_count == 0),
+    )
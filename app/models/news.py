@@ -0,0 +1,24 @@
+import uuid
+
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class News(Base):
+    """
+    Новость сервиса. Одинакова для всех пользователей, публикуется модераторами.
+    """
+    __tablename__ = "news"
+
+    uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    creator_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="SET NULL"), nullable=True)
+    title = Column(String(200), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    edited_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_news_created_uuid", created_at.desc(), uuid.desc()),
+    )
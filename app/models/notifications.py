@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class Notification(Base):
+    """
+    Уведомление пользователя об изменении маршрута, на который он подписан.
+    Строки создаются фоновым fan-out воркером пачками, поэтому uuid генерируется на стороне БД.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_uuid", "created_at", "uuid"),
+    )
+
+    uuid = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
+    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), nullable=False)
+    route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), nullable=False)
+    actor_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="SET NULL"), nullable=True)
+    event = Column(String(50), nullable=False)
+    is_read = Column(Boolean, nullable=False, default=False, server_default="false")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
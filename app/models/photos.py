@@ -1,8 +1,7 @@
 import uuid
-import datetime
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.models.base import Base
 
@@ -12,8 +11,12 @@ class Photo(Base):
     Модель фотографии, загруженной пользователем.
     Фотография может быть привязана к любой сущности (маршрут, пост, комментарий)
     через полиморфную связь: target_type_id + target_uuid.
+    Уменьшенные копии создаются в фоне: пока status == "processing", variants пуст.
     """
     __tablename__ = "photos"
+    __table_args__ = (
+        Index("ix_photos_target_created", "target_type_id", "target_uuid", "created_at"),
+    )
 
 
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -23,8 +26,6 @@ class Photo(Base):
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     url = Column(Text, nullable=False)
-    created_at = Column(
-        DateTime(timezone=True),
-        nullable=False,
-        default=datetime.datetime.now(datetime.timezone.utc)
-    )
+    status = Column(String(20), nullable=False, default="processing", server_default="processing")
+    variants = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
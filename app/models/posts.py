@@ -1,8 +1,8 @@
 import uuid
-import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.models.base import Base
 
@@ -17,9 +17,13 @@ class Post(Base):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     creator_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid"), nullable=False)
     name = Column(String(200), nullable=False)
+    content = Column(Text, nullable=True)
     tags = Column(String(255), nullable=True)
-    created_at = Column(
-        DateTime(timezone=True),
-        nullable=False,
-        default=datetime.datetime.now(datetime.timezone.utc)
-    )
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    edited_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    creator = relationship("DBUser", foreign_keys=[creator_uuid])
+    post_tags = relationship("PostTag", secondary="posts_post_tags", backref="posts")
+
+    __table_args__ = (
+        Index("ix_posts_created_uuid", created_at.desc(), uuid.desc()),
+    )
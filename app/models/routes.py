@@ -9,6 +9,7 @@ from sqlalchemy import (
     Float,
     Boolean,
     ForeignKey,
+    Index,
     func,
     Enum
 )
@@ -16,6 +17,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from geoalchemy2 import Geometry
 from sqlalchemy.orm import relationship
 
+from app.core.config import settings
 from app.models.base import Base
 from app.models.users import UserRole
 
@@ -38,6 +40,16 @@ class Route(Base):
     distance = Column(Float, nullable=True)
     difficulty_uuid = Column(UUID(as_uuid=True), ForeignKey("difficulties_types.uuid"), nullable=True)
     avg_rating = Column(Float, nullable=False, default=0.0)
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Байесовская оценка маршрута без оценок равна априорному среднему (app.crud.routes._rating_values).
+    rating_score = Column(
+        Float,
+        nullable=False,
+        default=settings.RATING_PRIOR_MEAN,
+        server_default=str(settings.RATING_PRIOR_MEAN),
+    )
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     edited_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     is_public = Column(Boolean, nullable=False, default=False)
@@ -51,4 +63,13 @@ class Route(Base):
     last_editor = relationship("DBUser", foreign_keys=[last_edited_by_uuid])
     tags = relationship("RouteTag",secondary="routes_route_tags", backref="routes")
     likes = relationship("RouteLike", cascade="all, delete-orphan", passive_deletes=True, backref="route")
-    favorites = relationship("RouteFavorite", cascade="all, delete-orphan", passive_deletes=True,  backref="route")
\ No newline at end of file
+    favorites = relationship("RouteFavorite", cascade="all, delete-orphan", passive_deletes=True,  backref="route")
+
+    __table_args__ = (
+        Index("ix_routes_public_rating_score", rating_score.desc(), postgresql_where=is_public.is_(True)),
+        Index("ix_routes_created_at", created_at),
+        Index("ix_routes_public_published_at", published_at, postgresql_where=is_public.is_(True)),
+        Index("ix_routes_public_edited_at_uuid", edited_at, uuid, postgresql_where=is_public.is_(True)),
+        # Сборка мусора превью карт ищет файлы по thumbnail_url.
+        Index("ix_routes_thumbnail_url", thumbnail_url),
+    )
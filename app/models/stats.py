@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class DailyStats(Base):
+    """
+    Суточные агрегаты для панели администратора. Заполняется фоновой задачей
+    (app.crud.stats), чтение за любой период — одна строка на день.
+    """
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    registrations = Column(Integer, nullable=False, default=0, server_default="0")
+    logins = Column(Integer, nullable=False, default=0, server_default="0")
+    active_users = Column(Integer, nullable=False, default=0, server_default="0")
+    routes_created = Column(Integer, nullable=False, default=0, server_default="0")
+    routes_published = Column(Integer, nullable=False, default=0, server_default="0")
+    route_likes = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_likes = Column(Integer, nullable=False, default=0, server_default="0")
+    comments = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class UserActivityDay(Base):
+    """
+    Дни, в которые пользователь входил в сервис или обновлял токен,
+    и число входов за день. Источник logins и active_users в daily_stats.
+    """
+    __tablename__ = "user_activity_days"
+
+    user_uuid = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    logins = Column(Integer, nullable=False, default=0, server_default="0")
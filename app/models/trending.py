@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Float, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class RouteTrendingScore(Base):
+    """
+    Предрасчитанная «трендовость» маршрута.
+    score хранится в логарифмической шкале относительно фиксированной эпохи,
+    поэтому оценки маршрутов, которые давно не пересчитывались, остаются
+    сравнимыми со свежими без глобального пересчёта затухания.
+    Таблица заполняется фоновой задачей app.crud.trending.refresh_trending_scores.
+    """
+    __tablename__ = "route_trending_scores"
+    __table_args__ = (
+        Index("ix_route_trending_scores_score", "score"),
+    )
+
+    route_uuid = Column(UUID(as_uuid=True), ForeignKey("routes.uuid", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
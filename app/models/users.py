@@ -1,9 +1,8 @@
 import uuid
-import datetime
 import enum
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Enum, Index, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.models.base import Base
 
@@ -36,9 +35,23 @@ class DBUser(Base):
     role = Column(Enum(UserRole, name="user_role_enum"), nullable=False, default=UserRole.user)
     age = Column(Integer, nullable=True)
     profile_picture = Column(Text, nullable=True)
+    avatar_variants = Column(JSONB, nullable=True)
     description = Column(Text, nullable=True)
     last_login = Column(DateTime(timezone=True), nullable=True)
     is_blocked = Column(Boolean, nullable=False, default=False)
     block_reason = Column(Text, nullable=True)
     block_date = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    # Регистронезависимая уникальность логина и email и индексы для get_user.
+    # Индекс по логину с text_pattern_ops обслуживает и равенство, и префиксный
+    # поиск по справочнику пользователей: lower(col) LIKE 'q%'.
+    __table_args__ = (
+        Index("ix_users_login_prefix", func.lower(login).label("login_lower"), unique=True,
+              postgresql_ops={"login_lower": "text_pattern_ops"}),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_first_name_prefix", func.lower(first_name).label("first_name_lower"),
+              postgresql_ops={"first_name_lower": "text_pattern_ops"}),
+        Index("ix_users_last_name_prefix", func.lower(last_name).label("last_name_lower"),
+              postgresql_ops={"last_name_lower": "text_pattern_ops"}),
+    )
@@ -1,5 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel, constr, field_validator
+import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field, constr, field_validator, model_validator
 
 from app.models.users import UserRole
 
@@ -27,3 +28,79 @@ class ResetUserPasswordRequest(BaseModel):
     @field_validator('login')
     def to_lowercase(cls, v):
         return v.lower()
+
+
+class BulkUserFilter(BaseModel):
+    registered_within_hours: Optional[int] = Field(None, ge=1, le=24 * 30, description="Зарегистрированы не раньше, чем столько часов назад")
+    without_routes: bool = Field(False, description="Только пользователи без маршрутов")
+
+    @model_validator(mode='after')
+    def has_criterion(self):
+        # Пустой фильтр выбрал бы всех пользователей, кроме администраторов.
+        if not self.registered_within_hours and not self.without_routes:
+            raise ValueError("Укажите registered_within_hours или without_routes")
+        return self
+
+class BulkUserSelection(BaseModel):
+    """
+    Пользователи для массовой операции: либо список логинов/email, либо фильтр.
+    """
+    identifiers: Optional[List[str]] = Field(None, min_length=1, description="Логины или email")
+    filter: Optional[BulkUserFilter] = None
+
+    @field_validator('identifiers')
+    def to_lowercase(cls, v):
+        return [i.strip().lower() for i in v] if v is not None else v
+
+    @model_validator(mode='after')
+    def one_selector(self):
+        if (self.identifiers is None) == (self.filter is None):
+            raise ValueError("Укажите либо identifiers, либо filter")
+        return self
+
+class BulkToggleUserStatusRequest(BulkUserSelection):
+    block_user: bool
+    block_reason: Optional[str] = None
+
+class BulkSetUserRoleRequest(BulkUserSelection):
+    role: UserRole
+
+class BulkDeleteUsersRequest(BulkUserSelection):
+    pass
+
+class BulkItemResult(BaseModel):
+    identifier: str
+    status: str = Field(..., description="ok, not_found, forbidden, unchanged или conflict")
+    detail: Optional[str] = None
+
+class BulkOperationResult(BaseModel):
+    processed: int
+    items: List[BulkItemResult]
+
+
+class DailyStatsOut(BaseModel):
+    day: datetime.date
+    registrations: int
+    logins: int
+    active_users: int
+    routes_created: int
+    routes_published: int
+    route_likes: int
+    comment_likes: int
+    comments: int
+
+class StatsTotals(BaseModel):
+    registrations: int
+    logins: int
+    routes_created: int
+    routes_published: int
+    route_likes: int
+    comment_likes: int
+    comments: int
+
+class AdminStatsOut(BaseModel):
+    date_from: datetime.date
+    date_to: datetime.date
+    updated_at: Optional[datetime.datetime] = Field(None, description="Когда данные за период последний раз пересчитывались")
+    days: List[DailyStatsOut]
+    totals: StatsTotals
@@ -1,6 +1,6 @@
 import datetime
 from uuid import UUID
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel, Field
 
 class CommentCreate(BaseModel):
@@ -14,6 +14,17 @@ class CommentOut(BaseModel):
     creator_avatar: Optional[str]
     likes_count: int = 0
     is_liked: bool = False
+    replies_count: Optional[int] = Field(None, description="Количество ответов (только в режиме threaded)")
+    replies: Optional[List["CommentOut"]] = Field(None, description="Первые ответы на комментарий")
+    replies_next_cursor: Optional[str] = Field(None, description="Курсор для догрузки ответов")
 
     class Config:
         from_attributes = True
+
+class CommentPage(BaseModel):
+    items: List[CommentOut]
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, null если это последняя")
+
+class CommentLikeOut(BaseModel):
+    message: str
+    likes_count: int
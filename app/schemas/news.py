@@ -0,0 +1,21 @@
+import datetime
+from uuid import UUID
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class NewsCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200, description="Заголовок новости")
+    content: str = Field(..., min_length=1, description="Текст новости")
+
+class NewsUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    content: Optional[str] = Field(None, min_length=1)
+
+class NewsOut(BaseModel):
+    uuid: UUID
+    title: str
+    content: str
+    creator_login: Optional[str] = None
+    creator_avatar: Optional[str] = None
+    created_at: datetime.datetime
+    edited_at: Optional[datetime.datetime] = None
@@ -0,0 +1,19 @@
+import datetime
+from uuid import UUID
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+class NotificationOut(BaseModel):
+    uuid: UUID
+    route_uuid: UUID
+    actor_uuid: Optional[UUID] = None
+    event: str
+    is_read: bool
+    created_at: datetime.datetime
+
+    class Config:
+        from_attributes = True
+
+class NotificationPage(BaseModel):
+    items: List[NotificationOut]
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, null если это последняя")
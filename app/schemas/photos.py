@@ -0,0 +1,12 @@
+import datetime
+from uuid import UUID
+from typing import Optional, Dict
+from pydantic import BaseModel, Field
+
+class PhotoOut(BaseModel):
+    uuid: UUID
+    url: str = Field(..., description="Оригинал")
+    variants: Dict[str, str] = Field(default_factory=dict, description="Уменьшенные WebP-копии: размер → URL")
+    status: str = Field(..., description="processing | ready | failed")
+    description: Optional[str] = None
+    created_at: datetime.datetime
@@ -0,0 +1,41 @@
+import datetime
+from uuid import UUID
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+class PostCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200, description="Заголовок поста")
+    content: Optional[str] = Field(None, description="Текст поста")
+    tags: List[UUID] = Field(default_factory=list, description="UUID тегов постов")
+
+class PostUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=200)
+    content: Optional[str] = None
+    tags: Optional[List[UUID]] = None
+
+class PostOut(BaseModel):
+    uuid: UUID
+    name: str
+    content: Optional[str] = None
+    tags: List[UUID] = []
+    creator_login: Optional[str] = None
+    creator_avatar: Optional[str] = None
+    created_at: datetime.datetime
+    edited_at: Optional[datetime.datetime] = None
+    comments_count: int = 0
+    can_edit: bool = False
+    can_delete: bool = False
+
+class PostCardOut(BaseModel):
+    uuid: UUID
+    name: str
+    excerpt: Optional[str] = None
+    tags: List[UUID] = []
+    creator_login: Optional[str] = None
+    creator_avatar: Optional[str] = None
+    created_at: datetime.datetime
+    comments_count: int = 0
+
+class PostFeedPage(BaseModel):
+    items: List[PostCardOut]
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, null если это последняя")
@@ -5,6 +5,7 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from app.schemas.users import UserRole
+from app.schemas.photos import PhotoOut
 from app.schemas.waypoints import WaypointOut, WaypointCreate
 
 
@@ -42,6 +43,10 @@ class RouteUpdate(BaseModel):
 class RouteOut(RouteBase):
     uuid: UUID
     created_at: datetime
+    avg_rating: float = 0.0
+    rating_count: int = 0
+    rating_score: Optional[float] = None
+    my_rating: Optional[float] = None
     edited_at: Optional[datetime] = None
     last_edited_by_uuid: Optional[UUID] = None
     last_edited_by_role: Optional[UserRole] = None
@@ -66,13 +71,25 @@ class RouteCardOut(BaseModel):
     name: str
     location: str
     avg_rating: Optional[float] = None
+    rating_count: int = 0
+    rating_score: Optional[float] = Field(None, description="Байесовская оценка для ранжирования")
     likes_count: int
     comments_count: int
     is_favorite: bool = False
     is_liked: bool = False
     thumbnail_url: Optional[str] = None
+    photos: List[PhotoOut] = Field(default_factory=list, description="Первые фотографии маршрута для превью")
     route_type_uuid: Optional[UUID] = None
     route_type_name: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RouteRatingIn(BaseModel):
+    rating: float = Field(..., ge=1, le=5, description="Оценка от 1 до 5")
+
+class RouteRatingOut(BaseModel):
+    avg_rating: float
+    rating_count: int
+    rating_score: float = Field(..., description="Байесовская оценка для ранжирования")
+    my_rating: Optional[float] = None
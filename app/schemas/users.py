@@ -1,7 +1,7 @@
 import datetime
 
 from uuid import UUID
-from typing import Optional
+from typing import Optional, Dict, List
 from pydantic import BaseModel, HttpUrl, EmailStr, constr, field_validator
 
 from app.schemas.common import LoginStr, NameStr, Gender, UserRole
@@ -37,6 +37,7 @@ class UserInfoPublic(BaseModel):
     first_name: str | None
     last_name: str | None
     profile_picture: str | None
+    avatar_variants: Optional[Dict[str, str]] = None
     description: Optional[str] | None
 
     @field_validator('login')
@@ -46,6 +47,10 @@ class UserInfoPublic(BaseModel):
     class Config:
         from_attributes = True
 
+class UserSearchPage(BaseModel):
+    items: List[UserInfoPublic]
+    next_cursor: Optional[str] = None
+
 class AvatarUrlUpdate(BaseModel):
     profile_picture: str
 
@@ -53,6 +58,7 @@ class UserInfo(UserBase):
     uuid: UUID
     last_login: Optional[datetime.datetime] = None
     role: UserRole
+    avatar_variants: Optional[Dict[str, str]] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
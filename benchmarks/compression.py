@@ -0,0 +1,72 @@
+"""
+Степень и цена сжатия типичных ответов API при разных уровнях gzip и brotli.
+
+Ответы строятся теми же сериализаторами, что и эндпоинты (app.api.serialization),
+на данных benchmarks.micro: страница карточек маршрутов, маршрут с точками
+(--waypoints) в JSON и MessagePack. Для каждого варианта печатаются размер после
+сжатия, доля от исходного и время сжатия (лучшее из --repeat).
+По этим числам выбраны уровни по умолчанию в настройках COMPRESSION_*.
+
+Запуск:
+    python -m benchmarks.compression --waypoints 50 500
+"""
+import argparse
+import gzip
+import timeit
+from typing import List
+
+import brotli
+
+from app.api.serialization import ResponseSerializer
+from app.crud.routes import route_card
+from app.schemas.routes import RouteCardOut, RouteOut
+from benchmarks import micro
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 5, 6, 8, 11)
+
+
+def _payloads(waypoint_counts: list[int]) -> dict[str, bytes]:
+    routes, comments_counts, favorites, photos = micro._cards_input()
+    cards = [route_card(r, comments_counts, favorites, photos) for r in routes]
+    card_serializer = ResponseSerializer(List[RouteCardOut])
+    route_serializer = ResponseSerializer(RouteOut)
+    payloads = {
+        f"cards x{len(cards)} json": card_serializer.render(cards),
+        f"cards x{len(cards)} msgpack": card_serializer.render_msgpack(cards),
+    }
+    for count in waypoint_counts:
+        detail = micro._route_detail()
+        detail["waypoints"] = micro._waypoints(count)
+        payloads[f"route +{count} wp json"] = route_serializer.render(detail)
+        payloads[f"route +{count} wp msgpack"] = route_serializer.render_msgpack(detail)
+    return payloads
+
+
+def _best(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waypoints", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = [(f"gzip-{level}", lambda body, level=level: gzip.compress(body, level, mtime=0)) for level in GZIP_LEVELS]
+    codecs += [(f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality))
+               for quality in BROTLI_QUALITIES]
+
+    for name, body in _payloads(args.waypoints).items():
+        print(f"{name}: {len(body)} B")
+        for codec, compress in codecs:
+            size = len(compress(body))
+            seconds = _best(lambda: compress(body), args.repeat)
+            print(f"    {codec:<8} {size:>8} B  {size / len(body):6.1%}  {seconds * 1e6:9.1f} us  "
+                  f"{len(body) / seconds / 1e6:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
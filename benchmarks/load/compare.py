@@ -0,0 +1,93 @@
+"""
+Сравнение двух результатов run.py (например, до и после изменения).
+
+Для каждого эндпоинта печатаются p50/p95/p99 и rps обоих прогонов и изменение в процентах.
+С --fail-above N команда завершается с кодом 1, если p95 какого-либо эндпоинта
+вырос больше чем на N%, — так сравнение можно встроить в проверку ветки.
+
+Пример:
+    python -m benchmarks.load.compare results/base.json results/new.json --fail-above 10
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as src:
+        return json.load(src)
+
+
+def _change(before: float, after: float) -> float | None:
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def _describe(result: dict) -> str:
+    git = result.get("git") or {}
+    commit = (git.get("commit") or "?")[:10]
+    dirty = "+изменения" if git.get("dirty") else ""
+    label = f" [{result['label']}]" if result.get("label") else ""
+    return f"{commit}{dirty} {result.get('timestamp', '')}{label}"
+
+
+def compare(base: dict, new: dict) -> tuple[list[tuple], list[str]]:
+    """
+    Строки сравнения (эндпоинт, метрика, было, стало, изменение %) и эндпоинты,
+    которые есть только в одном из прогонов.
+    """
+    rows = []
+    base_endpoints, new_endpoints = base["endpoints"], new["endpoints"]
+    for label in sorted(base_endpoints.keys() & new_endpoints.keys()):
+        for metric in METRICS:
+            before, after = base_endpoints[label][metric], new_endpoints[label][metric]
+            rows.append((label, metric, before, after, _change(before, after)))
+    only = sorted(base_endpoints.keys() ^ new_endpoints.keys())
+    return rows, only
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--fail-above", type=float, help="Допустимый рост p95, %%")
+    args = parser.parse_args()
+
+    base, new = _load(args.base), _load(args.new)
+    print(f"было:  {_describe(base)}")
+    print(f"стало: {_describe(new)}")
+    if base.get("volumes") != new.get("volumes") or base.get("args", {}).get("mix") != new.get("args", {}).get("mix"):
+        print("ВНИМАНИЕ: прогоны выполнены на разных наборах данных или смесях сценариев")
+    print()
+
+    rows, only = compare(base, new)
+    regressions = []
+    current = None
+    for label, metric, before, after, change in rows:
+        if label != current:
+            print(label)
+            current = label
+        change_text = "   n/a" if change is None else f"{change:+6.1f}%"
+        print(f"    {metric:<7} {before:>10.2f} -> {after:>10.2f}  {change_text}")
+        if (
+            args.fail_above is not None
+            and metric == "p95_ms"
+            and change is not None
+            and change > args.fail_above
+        ):
+            regressions.append((label, change))
+    for label in only:
+        print(f"{label}: есть только в одном из прогонов")
+
+    if regressions:
+        print()
+        for label, change in regressions:
+            print(f"РЕГРЕССИЯ: {label} p95 {change:+.1f}% (порог {args.fail_above}%)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Описание синтетического набора данных нагрузочных тестов.
+
+Все идентификаторы детерминированы и вычисляются по номеру сущности, поэтому
+сценарии нагрузки выбирают маршруты, точки и пользователей без запросов к БД:
+достаточно объёмов из манифеста, который пишет seed.py.
+"""
+import json
+import random
+from dataclasses import asdict, dataclass
+from uuid import UUID
+
+DEFAULT_MANIFEST = "benchmarks/load/dataset.json"
+
+PASSWORD = "LoadTest-2025!"
+
+# Старшие биты UUID — вид сущности, младшие — её номер.
+_USER_TAG = 0x10AD_0001
+_ROUTE_TAG = 0x10AD_0002
+_WAYPOINT_TAG = 0x10AD_0003
+_COMMENT_TAG = 0x10AD_0004
+
+ROUTE_WORDS = (
+    "озеро", "перевал", "водопад", "ущелье", "хребет", "каньон", "тропа", "вершина",
+    "долина", "берег", "лес", "плато", "скалы", "источник", "маяк", "поляна",
+)
+ROUTE_ADJECTIVES = (
+    "горный", "лесной", "северный", "южный", "тихий", "дикий", "речной", "старый",
+)
+FIRST_NAMES = ("Анна", "Иван", "Мария", "Пётр", "Ольга", "Дмитрий", "Елена", "Сергей", "Ирина", "Алексей")
+LAST_NAMES = ("Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов", "Новиков", "Морозов")
+
+
+@dataclass(frozen=True)
+class Volumes:
+    users: int
+    routes: int
+    waypoints_per_route: int
+    likes: int
+    comments: int
+    seed: int = 1
+
+    @property
+    def waypoints(self) -> int:
+        return self.routes * self.waypoints_per_route
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(asdict(self), out, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "Volumes":
+        with open(path, encoding="utf-8") as src:
+            return cls(**json.load(src))
+
+
+def _uuid(tag: int, index: int) -> UUID:
+    return UUID(int=(tag << 96) | index)
+
+
+def user_uuid(i: int) -> UUID:
+    return _uuid(_USER_TAG, i)
+
+
+def user_login(i: int) -> str:
+    return f"load_user_{i}"
+
+
+def route_uuid(i: int) -> UUID:
+    return _uuid(_ROUTE_TAG, i)
+
+
+def waypoint_uuid(route: int, position: int, volumes: Volumes) -> UUID:
+    return _uuid(_WAYPOINT_TAG, route * volumes.waypoints_per_route + position)
+
+
+def comment_uuid(i: int) -> UUID:
+    return _uuid(_COMMENT_TAG, i)
+
+
+def route_creator(route: int, volumes: Volumes) -> int:
+    return route % volumes.users
+
+
+def routes_of_user(user: int, volumes: Volumes) -> range:
+    """
+    Номера маршрутов пользователя (обратное к route_creator).
+    """
+    return range(user, volumes.routes, volumes.users)
+
+
+def route_is_public(route: int) -> bool:
+    """
+    Каждый пятый маршрут — черновик: сценарии открывают только опубликованные.
+    """
+    return route % 5 != 0
+
+
+def route_name(route: int) -> str:
+    rng = random.Random(route)
+    return f"{rng.choice(ROUTE_ADJECTIVES).capitalize()} {rng.choice(ROUTE_WORDS)} {route}"
+
+
+def route_likes(route: int, volumes: Volumes) -> list[int]:
+    """
+    Номера пользователей, лайкнувших маршрут: likes распределены по маршрутам
+    равномерно, пары (маршрут, пользователь) не повторяются.
+    """
+    per_route, extra = divmod(volumes.likes, volumes.routes)
+    count = min(per_route + (route < extra), volumes.users)
+    start = (route * 7919) % volumes.users
+    return [(start + j) % volumes.users for j in range(count)]
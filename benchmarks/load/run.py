@@ -0,0 +1,366 @@
+"""
+Нагрузочный прогон запущенного API на наборе данных из seed.py.
+
+Каждый из --concurrency потоков держит keep-alive соединение, входит под своим
+пользователем набора и в течение --duration секунд выполняет сценарии, выбираемые
+по весам (--mix): просмотр ленты, поиск, открытие маршрута с комментариями,
+лайк и снятие лайка, комментарий, правка точек своего маршрута, серия входов.
+Запросы первых --warmup секунд не учитываются.
+
+По каждому эндпоинту (шаблону пути) считаются число запросов, ошибки (статус >= 400
+или сбой соединения), пропускная способность, среднее и p50/p95/p99. Результат
+сохраняется в JSON вместе с коммитом и параметрами прогона; два результата
+сравнивает compare.py.
+
+Пример:
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load.run --base-url http://127.0.0.1:8000 --duration 120 --concurrency 32
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.load import dataset
+from benchmarks.load.dataset import Volumes
+
+RESULTS_DIR = "benchmarks/load/results"
+
+DEFAULT_MIX = {
+    "browse": 30,
+    "search": 15,
+    "open_route": 25,
+    "like": 10,
+    "comment": 5,
+    "edit_waypoints": 5,
+    "login_burst": 2,
+}
+ORDERINGS = (None, "rating", "recent", "trending")
+LOGIN_BURST_SIZE = 5
+MAX_BROWSE_PAGE = 50
+
+
+class Client:
+    """
+    HTTP-клиент одного потока: keep-alive соединение и учёт задержек по меткам.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self._prefix = parts.path.rstrip("/")
+        self._conn = self._connect()
+        self.token: str | None = None
+        self.recording = False
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    def request(self, label: str, method: str, path: str, *, json_body=None, form=None, auth=True):
+        headers = {}
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            body = urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        started = time.perf_counter()
+        try:
+            self._conn.request(method, self._prefix + path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Соединение могло быть закрыто сервером: следующий запрос откроет новое.
+            self._conn.close()
+            self._conn = self._connect()
+            payload, status = b"", 0
+        elapsed = time.perf_counter() - started
+
+        if self.recording:
+            self.samples[label].append(elapsed)
+            self.statuses[label][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[label] += 1
+        return status, payload
+
+    def login(self, user: int) -> bool:
+        status, payload = self.request(
+            "POST /auth/login", "POST", "/auth/login",
+            form={"username": dataset.user_login(user), "password": dataset.PASSWORD},
+            auth=False,
+        )
+        if status != 200:
+            return False
+        self.token = json.loads(payload)["access_token"]
+        return True
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class Scenarios:
+    """
+    Сценарии нагрузки. Маршруты, точки и пользователи выбираются по номерам
+    из манифеста набора, без запросов к БД.
+    """
+
+    def __init__(self, client: Client, volumes: Volumes, user: int, rng: random.Random):
+        self.client = client
+        self.volumes = volumes
+        self.user = user
+        self.rng = rng
+        self.own_routes = dataset.routes_of_user(user, volumes)
+
+    def _route(self) -> int:
+        # Опубликованный маршрут (черновики чужих пользователей недоступны).
+        while True:
+            route = self.rng.randrange(self.volumes.routes)
+            if dataset.route_is_public(route):
+                return route
+
+    def browse(self) -> None:
+        params = {"skip": self.rng.randrange(MAX_BROWSE_PAGE) * 20, "limit": 20}
+        ordering = self.rng.choice(ORDERINGS)
+        if ordering:
+            params["ordering"] = ordering
+        self.client.request("GET /routes/", "GET", f"/routes/?{urlencode(params)}")
+
+    def search(self) -> None:
+        if self.rng.random() < 0.5:
+            query = urlencode({"search": self.rng.choice(dataset.ROUTE_WORDS), "limit": 20})
+            self.client.request("GET /routes/?search", "GET", f"/routes/?{query}")
+        else:
+            # Префикс логина: «load_user_12» находит load_user_12, load_user_120…
+            prefix = dataset.user_login(self.rng.randrange(self.volumes.users))[:-1]
+            self.client.request("GET /users/search", "GET", f"/users/search?{urlencode({'q': prefix})}")
+
+    def open_route(self) -> None:
+        route = dataset.route_uuid(self._route())
+        self.client.request("GET /routes/{id}", "GET", f"/routes/{route}")
+        self.client.request("GET /comments/route/{id}", "GET", f"/comments/route/{route}?limit=20")
+
+    def like(self) -> None:
+        # Маршрут, который пользователь ещё не лайкал в наборе, иначе лайк вернёт ошибку.
+        for _ in range(5):
+            route = self._route()
+            if self.user not in dataset.route_likes(route, self.volumes):
+                break
+        else:
+            return
+        path = f"/routes/{dataset.route_uuid(route)}/like"
+        status, _ = self.client.request("POST /routes/{id}/like", "POST", path)
+        if status == 200:
+            self.client.request("DELETE /routes/{id}/like", "DELETE", path)
+
+    def comment(self) -> None:
+        route = dataset.route_uuid(self._route())
+        self.client.request(
+            "POST /comments/route/{id}", "POST", f"/comments/route/{route}",
+            json_body={"comment_text": f"Нагрузочный комментарий {self.rng.randrange(10**9)}"},
+        )
+
+    def edit_waypoints(self) -> None:
+        if not self.own_routes or self.volumes.waypoints_per_route == 0:
+            return
+        route = self.rng.choice(self.own_routes)
+        route_id = dataset.route_uuid(route)
+        for position in self.rng.sample(range(self.volumes.waypoints_per_route), min(3, self.volumes.waypoints_per_route)):
+            waypoint_id = dataset.waypoint_uuid(route, position, self.volumes)
+            self.client.request(
+                "PUT /waypoints/{route_id}/waypoints/{id}", "PUT",
+                f"/waypoints/{route_id}/waypoints/{waypoint_id}",
+                json_body={"lat": round(self.rng.uniform(43.0, 60.0), 6), "lon": round(self.rng.uniform(30.0, 60.0), 6)},
+            )
+
+    def login_burst(self) -> None:
+        token = self.client.token
+        for _ in range(LOGIN_BURST_SIZE):
+            self.client.login(self.rng.randrange(self.volumes.users))
+        self.client.token = token
+
+
+def _parse_mix(text: str | None) -> dict[str, int]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Неизвестный сценарий: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+def _worker(index: int, args, volumes: Volumes, mix: dict[str, int], start: float, results: list) -> None:
+    rng = random.Random(args.seed * 7_919 + index)
+    user = (args.seed * 104_729 + index) % volumes.users
+    client = Client(args.base_url, args.timeout)
+    scenarios = Scenarios(client, volumes, user, rng)
+    names, weights = list(mix), list(mix.values())
+    executed: Counter = Counter()
+    try:
+        if not client.login(user):
+            results.append((client, executed, f"поток {index}: не удалось войти под {dataset.user_login(user)}"))
+            return
+        warmup_end = start + args.warmup
+        deadline = warmup_end + args.duration
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            client.recording = now >= warmup_end
+            name = rng.choices(names, weights)[0]
+            getattr(scenarios, name)()
+            if client.recording:
+                executed[name] += 1
+    finally:
+        client.close()
+    results.append((client, executed, None))
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    # Ближайший ранг: значение, не меньше которого q% выборки.
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples: dict[str, list[float]], errors: Counter, statuses: dict[str, Counter], duration: float) -> dict:
+    endpoints = {}
+    for label in sorted(samples):
+        values = sorted(samples[label])
+        endpoints[label] = {
+            "count": len(values),
+            "errors": errors[label],
+            "statuses": {str(code): n for code, n in sorted(statuses[label].items())},
+            "rps": round(len(values) / duration, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    return endpoints
+
+
+def _git_revision() -> dict:
+    def git(*cmd: str) -> str:
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "subject": git("log", "-1", "--format=%s") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def print_report(endpoints: dict) -> None:
+    header = f"{'эндпоинт':<44} {'n':>7} {'ош.':>5} {'rps':>8} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, row in endpoints.items():
+        print(
+            f"{label:<44} {row['count']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+            f"{row['mean_ms']:>8.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--manifest", default=dataset.DEFAULT_MANIFEST)
+    parser.add_argument("--duration", type=float, default=60.0, help="Секунд измерения")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Секунд прогрева без учёта")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--mix", help="Веса сценариев, например browse=50,open_route=50")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="Пометка прогона в результате")
+    parser.add_argument("--output", help=f"Файл результата (по умолчанию {RESULTS_DIR}/<время>-<коммит>.json)")
+    args = parser.parse_args()
+
+    volumes = Volumes.load(args.manifest)
+    if args.concurrency > volumes.users:
+        raise SystemExit("--concurrency больше числа пользователей набора")
+    if volumes.routes < 2:
+        raise SystemExit("В наборе нет опубликованных маршрутов")
+    mix = _parse_mix(args.mix)
+
+    results: list = []
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=_worker, args=(i, args, volumes, mix, start, results), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    executed: Counter = Counter()
+    for client, scenario_counts, failure in results:
+        if failure:
+            print(failure)
+        for label, values in client.samples.items():
+            samples[label].extend(values)
+        errors.update(client.errors)
+        for label, counter in client.statuses.items():
+            statuses[label].update(counter)
+        executed.update(scenario_counts)
+    if not samples:
+        raise SystemExit("Нет измерений: проверьте --base-url и набор данных")
+
+    endpoints = summarize(samples, errors, statuses, args.duration)
+    total = sum(row["count"] for row in endpoints.values())
+    result = {
+        "git": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "label": args.label,
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "args": {
+            "base_url": args.base_url, "duration": args.duration, "warmup": args.warmup,
+            "concurrency": args.concurrency, "mix": mix, "seed": args.seed,
+        },
+        "volumes": asdict(volumes),
+        "total": {"count": total, "errors": sum(errors.values()), "rps": round(total / args.duration, 2)},
+        "scenarios": dict(executed),
+        "endpoints": endpoints,
+    }
+
+    print_report(endpoints)
+    print(f"\nвсего: {total} запросов, {result['total']['rps']} rps, ошибок {result['total']['errors']}")
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(result['git']['commit'] or 'nogit')[:10]}.json")
+    with open(output, "w", encoding="utf-8") as out:
+        json.dump(result, out, ensure_ascii=False, indent=2)
+    print(f"результат: {output}")
+
+
+if __name__ == "__main__":
+    main()
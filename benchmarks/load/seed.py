@@ -0,0 +1,268 @@
+"""
+Заполнение локальной PostgreSQL/PostGIS синтетическими данными для нагрузочных тестов.
+
+Данные пишутся через COPY пачками по --chunk строк; генерация детерминирована
+(--seed), поэтому повторный запуск с теми же параметрами даёт тот же набор.
+Все пользователи получают пароль dataset.PASSWORD (bcrypt считается один раз).
+Объёмы сохраняются в манифест (--manifest), по которому работает run.py.
+
+Пример (≈100k пользователей, 1M маршрутов, 50M точек, 20M лайков):
+    python -m benchmarks.load.seed --create-schema --truncate \\
+        --users 100000 --routes 1000000 --waypoints-per-route 50 \\
+        --likes 20000000 --comments 5000000
+
+Используйте отдельную базу: --truncate очищает таблицы приложения.
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+from app.core.config import settings
+from app.core.security import hash_password
+from benchmarks.load import dataset
+from benchmarks.load.dataset import Volumes
+
+logger = logging.getLogger("benchmarks.load.seed")
+
+PERIOD_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 2 * 365 * 24 * 3600
+
+# Тексты комментариев и описаний не влияют на сценарии, только на объём строк.
+COMMENT_TEXTS = (
+    "Отличный маршрут, прошли за день.",
+    "Тропа размыта после дождя, будьте осторожны.",
+    "Вид с перевала того стоит!",
+    "Воды по пути нет, берите с собой.",
+)
+
+TRUNCATE_TABLES = ("route_likes", "comments", "waypoints", "routes", "users")
+
+
+def _copy_escape(value) -> str:
+    if value is None:
+        return r"\N"
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class _Copier:
+    """
+    Накопитель строк COPY одной таблицы: сбрасывает пачку в БД каждые chunk строк
+    (при chunk=None — только явным flush).
+    """
+
+    def __init__(self, cursor, table: str, columns: tuple[str, ...], chunk: int | None):
+        self.cursor = cursor
+        self.sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        self.chunk = chunk
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.total = 0
+
+    def add(self, *values) -> None:
+        self.buffer.write("\t".join(_copy_escape(v) for v in values))
+        self.buffer.write("\n")
+        self.pending += 1
+        if self.chunk and self.pending >= self.chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        self.cursor.copy_expert(self.sql, self.buffer)
+        self.total += self.pending
+        self.buffer = io.StringIO()
+        self.pending = 0
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return PERIOD_START + timedelta(seconds=rng.randrange(PERIOD_SECONDS))
+
+
+def _create_schema() -> None:
+    from sqlalchemy import create_engine, text
+
+    from app.models import Base
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+def _ensure_target_types(cursor) -> None:
+    for name, type_id in (
+        ("route", settings.ROUTE_TYPE_UUID),
+        ("post", settings.POST_TYPE_UUID),
+        ("news", settings.NEWS_TYPE_UUID),
+    ):
+        cursor.execute(
+            "INSERT INTO target_types (uuid, name) SELECT %s, %s "
+            "WHERE NOT EXISTS (SELECT 1 FROM target_types WHERE uuid = %s)",
+            (type_id, name, type_id),
+        )
+
+
+def seed_users(cursor, volumes: Volumes, chunk: int) -> int:
+    rng = random.Random(volumes.seed)
+    hashed = hash_password(dataset.PASSWORD)
+    copier = _Copier(
+        cursor, "users",
+        ("uuid", "login", "email", "first_name", "last_name", "hashed_password", "role", "is_blocked", "created_at"),
+        chunk,
+    )
+    for i in range(volumes.users):
+        login = dataset.user_login(i)
+        copier.add(
+            dataset.user_uuid(i), login, f"{login}@load.test",
+            rng.choice(dataset.FIRST_NAMES), rng.choice(dataset.LAST_NAMES),
+            hashed, "user", "f", _timestamp(rng),
+        )
+    copier.flush()
+    return copier.total
+
+
+def seed_routes(cursor, volumes: Volumes, chunk: int) -> tuple[int, int]:
+    """
+    Маршруты и их точки в одном проходе: линия geo_data строится по тем же точкам.
+    Пачка маршрутов подбирается так, чтобы их точек было около chunk строк.
+    """
+    routes = _Copier(
+        cursor, "routes",
+        ("uuid", "creator_uuid", "name", "location", "description", "geo_data", "duration", "distance",
+         "avg_rating", "rating_sum", "rating_count", "rating_score", "likes_count",
+         "created_at", "edited_at", "is_public", "published_at"),
+        max(1, chunk // max(1, volumes.waypoints_per_route)),
+    )
+    waypoints = _Copier(
+        cursor, "waypoints",
+        ("uuid", "route_uuid", "lat", "lon", '"order"', "type", "description"),
+        None,
+    )
+    last = volumes.waypoints_per_route - 1
+    for i in range(volumes.routes):
+        rng = random.Random(volumes.seed * 1_000_003 + i)
+        lat, lon = rng.uniform(43.0, 60.0), rng.uniform(30.0, 60.0)
+        points = []
+        for position in range(volumes.waypoints_per_route):
+            points.append((lon, lat))
+            lat += rng.uniform(-0.005, 0.005)
+            lon += rng.uniform(-0.005, 0.005)
+        line = ", ".join(f"{x:.6f} {y:.6f}" for x, y in points)
+        geometry = f"SRID=4326;LINESTRING({line})" if len(points) > 1 else None
+        created_at = _timestamp(rng)
+        is_public = dataset.route_is_public(i)
+        routes.add(
+            dataset.route_uuid(i), dataset.user_uuid(dataset.route_creator(i, volumes)),
+            dataset.route_name(i), rng.choice(dataset.ROUTE_WORDS).capitalize(), None, geometry,
+            rng.randrange(60, 600), round(rng.uniform(1.0, 40.0), 2),
+            # Оценок нет: rating_score равен априорному среднему, как у _rating_values(0, 0).
+            0, 0, 0, settings.RATING_PRIOR_MEAN, len(dataset.route_likes(i, volumes)),
+            created_at, created_at, "t" if is_public else "f",
+            created_at + timedelta(hours=1) if is_public else None,
+        )
+        for position, (x, y) in enumerate(points):
+            kind = "start" if position == 0 else "finish" if position == last else "intermediate"
+            waypoints.add(
+                dataset.waypoint_uuid(i, position, volumes), dataset.route_uuid(i),
+                f"{y:.6f}", f"{x:.6f}", position, kind, None,
+            )
+        if routes.pending == 0:
+            # Точки пачки пишутся только после самих маршрутов (внешний ключ).
+            waypoints.flush()
+    routes.flush()
+    waypoints.flush()
+    return routes.total, waypoints.total
+
+
+def seed_likes(cursor, volumes: Volumes, chunk: int) -> int:
+    rng = random.Random(volumes.seed + 2)
+    copier = _Copier(cursor, "route_likes", ("route_uuid", "user_uuid", "created_at"), chunk)
+    for i in range(volumes.routes):
+        route = dataset.route_uuid(i)
+        for user in dataset.route_likes(i, volumes):
+            copier.add(route, dataset.user_uuid(user), _timestamp(rng))
+    copier.flush()
+    return copier.total
+
+
+def seed_comments(cursor, volumes: Volumes, chunk: int) -> int:
+    rng = random.Random(volumes.seed + 3)
+    copier = _Copier(
+        cursor, "comments",
+        ("uuid", "creator_uuid", "target_type_id", "target_uuid", "comment_text", "likes_count", "created_at"),
+        chunk,
+    )
+    for i in range(volumes.comments):
+        copier.add(
+            dataset.comment_uuid(i), dataset.user_uuid((i * 31) % volumes.users),
+            settings.ROUTE_TYPE_UUID, dataset.route_uuid(i % volumes.routes),
+            rng.choice(COMMENT_TEXTS), 0, _timestamp(rng),
+        )
+    copier.flush()
+    return copier.total
+
+
+def _dsn(url: str) -> str:
+    # psycopg2 не понимает схему с драйвером SQLAlchemy.
+    return url.replace("postgresql+psycopg2://", "postgresql://", 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--routes", type=int, default=50_000)
+    parser.add_argument("--waypoints-per-route", type=int, default=20)
+    parser.add_argument("--likes", type=int, default=200_000)
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chunk", type=int, default=50_000, help="Строк в одном COPY")
+    parser.add_argument("--create-schema", action="store_true", help="Создать расширение postgis и таблицы")
+    parser.add_argument("--truncate", action="store_true", help="Очистить таблицы перед заполнением")
+    parser.add_argument("--manifest", default=dataset.DEFAULT_MANIFEST)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    volumes = Volumes(
+        users=args.users, routes=args.routes, waypoints_per_route=args.waypoints_per_route,
+        likes=args.likes, comments=args.comments, seed=args.seed,
+    )
+    if args.create_schema:
+        _create_schema()
+
+    conn = psycopg2.connect(_dsn(os.environ.get("DATABASE_URL", settings.DATABASE_URL)))
+    try:
+        with conn.cursor() as cursor:
+            if args.truncate:
+                cursor.execute(f"TRUNCATE {', '.join(TRUNCATE_TABLES)} CASCADE")
+            _ensure_target_types(cursor)
+            conn.commit()
+            for name, step in (
+                ("users", seed_users),
+                ("routes+waypoints", seed_routes),
+                ("route_likes", seed_likes),
+                ("comments", seed_comments),
+            ):
+                started = time.perf_counter()
+                rows = step(cursor, volumes, args.chunk)
+                conn.commit()
+                logger.info("%s: %s строк за %.1f с", name, rows, time.perf_counter() - started)
+            conn.autocommit = True
+            cursor.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    volumes.save(args.manifest)
+    logger.info("Манифест набора данных: %s", args.manifest)
+
+
+if __name__ == "__main__":
+    main()
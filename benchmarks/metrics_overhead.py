@@ -0,0 +1,81 @@
+"""
+Микробенчмарк накладных расходов метрик (app.core.metrics).
+
+Измеряет:
+  * middleware — вызов тривиального ASGI-приложения напрямую (без сети и сервера)
+    с MetricsMiddleware и без него; разница — стоимость middleware на запрос;
+  * cursor events — выполнение SELECT 1 на SQLite в памяти с подключёнными
+    событиями before/after_cursor_execute и без них; разница — стоимость на SQL-запрос.
+
+Запуск:
+    python -m benchmarks.metrics_overhead --requests 200000 --queries 200000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import MetricsMiddleware, instrument_engine
+
+
+class _Route:
+    path = "/routes/{route_id}"
+
+
+async def _endpoint(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _drive(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/routes/1"}, _receive, _send)
+    return (time.perf_counter() - started) / requests
+
+
+def _queries(engine, queries: int) -> float:
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(queries):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5, help="Замеры чередуются, берётся лучший из раундов")
+    args = parser.parse_args()
+
+    middleware = MetricsMiddleware(_endpoint)
+    bare = min(asyncio.run(_drive(_endpoint, args.requests // args.rounds)) for _ in range(args.rounds))
+    wrapped = min(asyncio.run(_drive(middleware, args.requests // args.rounds)) for _ in range(args.rounds))
+    print(f"middleware: {bare * 1e6:.2f} us -> {wrapped * 1e6:.2f} us per request "
+          f"(+{(wrapped - bare) * 1e6:.2f} us)")
+
+    plain_engine = create_engine("sqlite://")
+    instrumented_engine = create_engine("sqlite://")
+    instrument_engine(instrumented_engine)
+    plain, instrumented = float("inf"), float("inf")
+    for _ in range(args.rounds):
+        plain = min(plain, _queries(plain_engine, args.queries // args.rounds))
+        instrumented = min(instrumented, _queries(instrumented_engine, args.queries // args.rounds))
+    print(f"cursor events: {plain * 1e6:.2f} us -> {instrumented * 1e6:.2f} us per query "
+          f"(+{(instrumented - plain) * 1e6:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
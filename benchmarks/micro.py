@@ -0,0 +1,366 @@
+"""
+Микробенчмарки CPU-затрат, которые платит каждый запрос: проверка access-токена,
+сборка карточек маршрутов (app.crud.routes.route_card), валидация и сериализация
+ответов RouteCardOut/RouteOut так же, как это делает FastAPI (поле ответа
+эндпоинта → JSONResponse) и через app.api.serialization (JSON и MessagePack),
+и перенумерация точек маршрута.
+
+Каждый бенчмарк калибруется (timeit.autorange, не меньше 0.2 с на замер) и
+повторяется --repeat раз; печатаются лучшее и медианное время вызова.
+Сборщик мусора во время замеров выключен (поведение timeit).
+
+Бюджет — benchmarks/perf_budget.json: лучшее время каждого бенчмарка и допустимый
+рост (threshold, доля). Время зависит от машины, поэтому бюджет обновляют
+(--update) на той же машине, где его проверяют (--check). Бенчмарк, вышедший
+за бюджет, перемеряется, и регрессией считается только повторное превышение.
+
+Запуск:
+    python -m benchmarks.micro                 # замеры
+    python -m benchmarks.micro -k RouteOut     # только подходящие по имени
+    python -m benchmarks.micro --check         # код 1 при регрессии сверх бюджета
+    python -m benchmarks.micro --update        # записать текущие значения в бюджет
+"""
+import argparse
+import json
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, List
+from uuid import UUID
+
+from fastapi.utils import create_model_field
+from starlette.responses import JSONResponse
+
+from app.api.serialization import ResponseSerializer
+from app.core.security import create_access_token, verify_access_token
+from app.crud.routes import route_card
+from app.crud.waypoints import _reindex_and_retype_connected
+from app.models import Route, Waypoint
+from app.models.dictionaries import DifficultyType, RouteType
+from app.models.waypoints import WaypointType
+from app.schemas.routes import RouteCardOut, RouteOut
+
+BUDGET_FILE = "benchmarks/perf_budget.json"
+DEFAULT_THRESHOLD = 0.3
+
+CARDS_PER_PAGE = 20
+PHOTOS_PER_CARD = 3
+WAYPOINTS_PER_ROUTE = 50
+
+_BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Регистрирует бенчмарк: функция готовит данные и возвращает измеряемый вызов без аргументов.
+    """
+    def register(setup):
+        _BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# --- данные -------------------------------------------------------------------
+
+_CREATED_AT = datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc)
+_ROUTE_TYPE = RouteType(uuid=UUID(int=1), name="Пеший")
+_DIFFICULTY = DifficultyType(uuid=UUID(int=2), name="Средняя")
+
+
+def _routes(count: int) -> list[Route]:
+    # Несохранённые ORM-объекты: доступ к атрибутам идёт через те же дескрипторы, что и в запросе.
+    return [
+        Route(
+            uuid=UUID(int=1000 + i),
+            name=f"Горный перевал {i}",
+            location="Алтай",
+            description="Маршрут вдоль реки с подъёмом на перевал.",
+            avg_rating=4.2,
+            rating_count=17,
+            rating_score=4.05,
+            likes_count=120 + i,
+            thumbnail_url=f"https://static.example/media/maps/ab/{i:064x}.png",
+            route_type_uuid=_ROUTE_TYPE.uuid,
+            route_type=_ROUTE_TYPE,
+            difficulty_uuid=_DIFFICULTY.uuid,
+            difficulty_type=_DIFFICULTY,
+            duration=240,
+            distance=12.5,
+            created_at=_CREATED_AT,
+            edited_at=_CREATED_AT,
+            is_public=True,
+            published_at=_CREATED_AT,
+        )
+        for i in range(count)
+    ]
+
+
+def _photos(route_uuids: list[UUID]) -> dict[UUID, list[dict]]:
+    return {
+        route_uuid: [
+            {
+                "uuid": UUID(int=route_uuid.int * 10 + j),
+                "url": f"https://static.example/media/photos/{route_uuid}/{j}.jpg",
+                "variants": {"320": f"https://static.example/media/photos/{route_uuid}/{j}_320.webp",
+                             "1280": f"https://static.example/media/photos/{route_uuid}/{j}_1280.webp"},
+                "status": "ready",
+                "description": None,
+                "created_at": _CREATED_AT,
+            }
+            for j in range(PHOTOS_PER_CARD)
+        ]
+        for route_uuid in route_uuids
+    }
+
+
+def _cards_input() -> tuple[list[Route], dict, set, dict]:
+    routes = _routes(CARDS_PER_PAGE)
+    route_uuids = [r.uuid for r in routes]
+    comments_counts = {u: 5 for u in route_uuids[::2]}
+    favorites = set(route_uuids[::3])
+    return routes, comments_counts, favorites, _photos(route_uuids)
+
+
+def _waypoints(count: int) -> list[Waypoint]:
+    route_uuid = UUID(int=1000)
+    return [
+        Waypoint(
+            uuid=UUID(int=5000 + i),
+            route_uuid=route_uuid,
+            lat=51.0 + i * 0.001,
+            lon=86.0 + i * 0.001,
+            order=i,
+            type=WaypointType.intermediate,
+            description="Привал" if i % 10 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _route_detail() -> dict:
+    # Тот же набор ключей, что возвращает app.crud.routes.get_route_by_id.
+    route = _routes(1)[0]
+    return {
+        "uuid": route.uuid,
+        "name": route.name,
+        "location": route.location,
+        "description": route.description,
+        "route_type_uuid": route.route_type_uuid,
+        "difficulty_uuid": route.difficulty_uuid,
+        "avg_rating": route.avg_rating,
+        "rating_count": route.rating_count,
+        "rating_score": route.rating_score,
+        "my_rating": 5.0,
+        "duration": route.duration,
+        "distance": route.distance,
+        "created_at": route.created_at,
+        "edited_at": route.edited_at,
+        "last_edited_by_uuid": None,
+        "last_edited_by_role": None,
+        "waypoints": _waypoints(WAYPOINTS_PER_ROUTE),
+        "likes_count": route.likes_count,
+        "comments_count": 12,
+        "is_favorite": True,
+        "is_liked": False,
+        "thumbnail_url": route.thumbnail_url,
+        "creator_login": "load_user_1",
+        "route_type_name": _ROUTE_TYPE.name,
+        "difficulty_type_name": _DIFFICULTY.name,
+        "can_edit": False,
+        "can_delete": False,
+        "tags": [UUID(int=9000 + i) for i in range(4)],
+    }
+
+
+def _response_field(name: str, type_):
+    # Так FastAPI создаёт поле ответа эндпоинта по response_model.
+    return create_model_field(name=name, type_=type_, mode="serialization")
+
+
+def _render(field, content):
+    value, errors = field.validate(content, {}, loc=("response",))
+    if errors:
+        raise AssertionError(errors)
+    return JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+# --- бенчмарки ----------------------------------------------------------------
+
+@benchmark("auth.verify_access_token")
+def _verify_access_token():
+    token = create_access_token(subject="load_user_1", role="user")
+    return lambda: verify_access_token(token)
+
+
+@benchmark(f"routes.route_card x{CARDS_PER_PAGE}")
+def _route_cards():
+    routes, comments_counts, favorites, photos = _cards_input()
+    return lambda: [route_card(r, comments_counts, favorites, photos) for r in routes]
+
+
+@benchmark(f"RouteCardOut.validate x{CARDS_PER_PAGE}")
+def _card_validate():
+    routes, comments_counts, favorites, photos = _cards_input()
+    cards = [route_card(r, comments_counts, favorites, photos) for r in routes]
+    field = _response_field("Response_list_routes", List[RouteCardOut])
+    return lambda: field.validate(cards, {}, loc=("response",))
+
+
+@benchmark(f"RouteCardOut.serialize x{CARDS_PER_PAGE}")
+def _card_serialize():
+    routes, comments_counts, favorites, photos = _cards_input()
+    cards = [route_card(r, comments_counts, favorites, photos) for r in routes]
+    field = _response_field("Response_list_routes", List[RouteCardOut])
+    value, _ = field.validate(cards, {}, loc=("response",))
+    return lambda: JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+@benchmark(f"RouteCardOut.response x{CARDS_PER_PAGE}")
+def _card_response():
+    # Весь CPU-путь страницы карточек после запросов к БД: сборка, валидация, JSON.
+    routes, comments_counts, favorites, photos = _cards_input()
+    field = _response_field("Response_list_routes", List[RouteCardOut])
+    return lambda: _render(field, [route_card(r, comments_counts, favorites, photos) for r in routes])
+
+
+@benchmark(f"RouteCardOut.fast_response x{CARDS_PER_PAGE}")
+def _card_fast_response():
+    # То же через app.api.serialization.ResponseSerializer (путь эндпоинтов списков).
+    routes, comments_counts, favorites, photos = _cards_input()
+    serializer = ResponseSerializer(List[RouteCardOut])
+    return lambda: serializer.render([route_card(r, comments_counts, favorites, photos) for r in routes])
+
+
+@benchmark(f"RouteCardOut.msgpack x{CARDS_PER_PAGE}")
+def _card_msgpack():
+    routes, comments_counts, favorites, photos = _cards_input()
+    serializer = ResponseSerializer(List[RouteCardOut])
+    return lambda: serializer.render_msgpack([route_card(r, comments_counts, favorites, photos) for r in routes])
+
+
+@benchmark(f"RouteOut.validate ({WAYPOINTS_PER_ROUTE} waypoints)")
+def _route_validate():
+    detail = _route_detail()
+    field = _response_field("Response_get_route", RouteOut)
+    return lambda: field.validate(detail, {}, loc=("response",))
+
+
+@benchmark(f"RouteOut.serialize ({WAYPOINTS_PER_ROUTE} waypoints)")
+def _route_serialize():
+    field = _response_field("Response_get_route", RouteOut)
+    value, _ = field.validate(_route_detail(), {}, loc=("response",))
+    return lambda: JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+@benchmark(f"RouteOut.fast_response ({WAYPOINTS_PER_ROUTE} waypoints)")
+def _route_fast_response():
+    detail = _route_detail()
+    serializer = ResponseSerializer(RouteOut)
+    return lambda: serializer.render(detail)
+
+
+@benchmark(f"RouteOut.msgpack ({WAYPOINTS_PER_ROUTE} waypoints)")
+def _route_msgpack():
+    detail = _route_detail()
+    serializer = ResponseSerializer(RouteOut)
+    return lambda: serializer.render_msgpack(detail)
+
+
+@benchmark(f"waypoints.reindex_and_retype x{WAYPOINTS_PER_ROUTE}")
+def _reindex():
+    waypoints = _waypoints(WAYPOINTS_PER_ROUTE)
+    return lambda: _reindex_and_retype_connected(waypoints)
+
+
+# --- запуск и бюджет ----------------------------------------------------------
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number for total in timer.repeat(repeat, number)]
+    return {
+        "min_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "loops": number,
+    }
+
+
+def _load_budget(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as src:
+            return json.load(src)
+    except FileNotFoundError:
+        return {"threshold": DEFAULT_THRESHOLD, "benchmarks": {}}
+
+
+def check(results: dict, budget: dict, threshold: float) -> list[str]:
+    """
+    Бенчмарки, лучшее время которых превысило бюджет больше чем на threshold.
+    """
+    failures = []
+    for name, result in results.items():
+        limit = budget["benchmarks"].get(name)
+        if limit is None:
+            continue
+        allowed = limit["min_us"] * (1 + threshold)
+        if result["min_us"] > allowed:
+            failures.append(
+                f"{name}: {result['min_us']:.2f} us > {allowed:.2f} us "
+                f"(бюджет {limit['min_us']:.2f} us +{threshold:.0%})"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", help="Только бенчмарки, имя которых содержит подстроку")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--threshold", type=float, help="Допустимый рост, доля (по умолчанию из файла бюджета)")
+    parser.add_argument("--check", action="store_true", help="Сравнить с бюджетом, код 1 при регрессии")
+    parser.add_argument("--update", action="store_true", help="Записать результаты в файл бюджета")
+    parser.add_argument("--json", dest="json_path", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    budget = _load_budget(args.budget)
+    threshold = args.threshold if args.threshold is not None else budget.get("threshold", DEFAULT_THRESHOLD)
+
+    results = {}
+    for name, setup in _BENCHMARKS.items():
+        if args.pattern and args.pattern not in name:
+            continue
+        results[name] = result = measure(setup(), args.repeat)
+        limit = budget["benchmarks"].get(name)
+        delta = f"{(result['min_us'] / limit['min_us'] - 1) * 100:+6.1f}%" if limit else "     —"
+        print(f"{name:<42} min {result['min_us']:>10.2f} us  median {result['median_us']:>10.2f} us  {delta}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as out:
+            json.dump(results, out, ensure_ascii=False, indent=2)
+
+    if args.update:
+        budget["threshold"] = threshold
+        budget["benchmarks"].update(
+            {name: {"min_us": r["min_us"]} for name, r in results.items()}
+        )
+        with open(args.budget, "w", encoding="utf-8") as out:
+            json.dump(budget, out, ensure_ascii=False, indent=2)
+            out.write("\n")
+        print(f"бюджет обновлён: {args.budget}")
+
+    if args.check:
+        # Превышение перемеряется: регрессией считается только повторившееся.
+        for name in [n for n in results if check({n: results[n]}, budget, threshold)]:
+            again = measure(_BENCHMARKS[name](), args.repeat)
+            if again["min_us"] < results[name]["min_us"]:
+                results[name] = again
+        failures = check(results, budget, threshold)
+        for failure in failures:
+            print(f"РЕГРЕССИЯ: {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Бенчмарк пересчёта trending-оценок (app.crud.trending.refresh_trending_scores).
+
+Работает на базе, заполненной benchmarks.load.seed (нужны users и routes).
+В окно TRENDING_WINDOW_DAYS добавляются --interactions взаимодействий
+(лайки, избранное и оценки поровну, повторяющиеся пары пропускаются), затем замеряются:
+  * full — первый проход без отметки job_watermarks: пересчитываются все
+    маршруты с событиями в окне;
+  * incremental — проход после --delta новых взаимодействий: пересчитываются
+    только затронутые маршруты.
+Для каждого прохода печатаются время (лучшее из --repeat) и число пересчитанных
+маршрутов, для полного — ещё пропускная способность в событиях окна в секунду.
+
+Всё выполняется в одной транзакции, которая в конце откатывается
+(commit внутри refresh_trending_scores фиксирует только точку сохранения),
+поэтому данные базы не меняются.
+
+Запуск:
+    python -m benchmarks.trending --interactions 1000000 --delta 10000
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.crud.trending import JOB_NAME, refresh_trending_scores
+
+# Пары (маршрут, пользователь) из номера n: внутри блока из routes номеров
+# маршруты переставлены умножением на простое число, пользователь меняется между блоками.
+# Время события — равномерно в окне, но старше перекрытия отметки (WATERMARK_OVERLAP),
+# чтобы инкрементальный проход видел только --delta новых событий.
+INSERT_INTERACTIONS = """
+WITH u AS (SELECT uuid, row_number() OVER (ORDER BY uuid) - 1 AS i FROM users),
+     r AS (SELECT uuid, row_number() OVER (ORDER BY uuid) - 1 AS i FROM routes),
+     pairs AS (
+         SELECT r.uuid AS route_uuid, u.uuid AS user_uuid, {happened_at} AS happened_at
+         FROM generate_series(:start, :start + :count - 1) AS g(n)
+         JOIN r ON r.i = (g.n * 7919) % :routes
+         JOIN u ON u.i = (g.n / :routes) % :users
+     )
+INSERT INTO {table} (route_uuid, user_uuid, {columns})
+SELECT route_uuid, user_uuid, {values} FROM pairs
+ON CONFLICT DO NOTHING
+"""
+TABLES = (
+    ("route_likes", "created_at", "happened_at"),
+    ("route_favorites", "created_at", "happened_at"),
+    ("routes_users_rates", "rating, rated_at", "1 + (abs(hashtext(route_uuid::text)) % 5), happened_at"),
+)
+WINDOW_TIME = "now() - interval '5 minutes' - random() * (interval '1 day' * :window_days - interval '5 minutes')"
+
+
+def _insert(conn, start: int, count: int, happened_at: str, users: int, routes: int, window_days: int) -> int:
+    inserted = 0
+    share = count // len(TABLES)
+    for offset, (table, columns, values) in enumerate(TABLES):
+        sql = INSERT_INTERACTIONS.format(table=table, columns=columns, values=values, happened_at=happened_at)
+        inserted += conn.execute(text(sql), {
+            "start": start + offset * share, "count": share,
+            "users": users, "routes": routes, "window_days": window_days,
+        }).rowcount
+    return inserted
+
+
+def _timed_refresh(session: Session) -> tuple[float, int]:
+    started = time.perf_counter()
+    updated = refresh_trending_scores(session)
+    return time.perf_counter() - started, updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--interactions", type=int, default=1_000_000)
+    parser.add_argument("--delta", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    from app.core.config import settings
+    if not args.database_url:
+        args.database_url = settings.DATABASE_URL
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            users = conn.execute(text("SELECT count(*) FROM users")).scalar_one()
+            routes = conn.execute(text("SELECT count(*) FROM routes")).scalar_one()
+            if not users or not routes:
+                raise SystemExit("Нет пользователей или маршрутов: сначала запустите benchmarks.load.seed")
+
+            started = time.perf_counter()
+            inserted = _insert(conn, 0, args.interactions, WINDOW_TIME, users, routes, settings.TRENDING_WINDOW_DAYS)
+            conn.execute(text("ANALYZE route_likes, route_favorites, routes_users_rates"))
+            events = conn.execute(text("""
+                SELECT (SELECT count(*) FROM route_likes WHERE created_at > now() - interval '1 day' * :days)
+                     + (SELECT count(*) FROM route_favorites WHERE created_at > now() - interval '1 day' * :days)
+                     + (SELECT count(*) FROM routes_users_rates WHERE rated_at > now() - interval '1 day' * :days)
+            """), {"days": settings.TRENDING_WINDOW_DAYS}).scalar_one()
+            print(f"users {users}, routes {routes}: inserted {inserted} interactions "
+                  f"in {time.perf_counter() - started:.1f} s, {events} events in window")
+
+            # commit() в refresh_trending_scores фиксирует точку сохранения внутри транзакции conn.
+            session = Session(bind=conn, join_transaction_mode="create_savepoint")
+            results = {"full": [], "incremental": []}
+            for _ in range(args.repeat):
+                conn.execute(text("DELETE FROM job_watermarks WHERE name = :name"), {"name": JOB_NAME})
+                results["full"].append(_timed_refresh(session))
+                # Новые события каждого повтора откатываются, чтобы проходы были одинаковыми.
+                savepoint = conn.begin_nested()
+                _insert(conn, args.interactions, args.delta, "now()", users, routes, settings.TRENDING_WINDOW_DAYS)
+                results["incremental"].append(_timed_refresh(session))
+                savepoint.rollback()
+            session.close()
+
+            seconds, updated = min(results["full"])
+            print(f"== full: {seconds * 1e3:.0f} ms, {updated} routes rescored, "
+                  f"{events / seconds:,.0f} window events/s")
+            seconds, updated = min(results["incremental"])
+            print(f"== incremental (+{args.delta}): {seconds * 1e3:.0f} ms, {updated} routes rescored")
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
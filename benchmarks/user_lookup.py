@@ -0,0 +1,79 @@
+"""
+Микробенчмарк поиска пользователя по логину или email (app.crud.users.get_user).
+
+Во временной таблице с --rows пользователями сравниваются:
+  * old — прежнее условие login = :id OR email = :id по обычным уникальным индексам;
+  * login / email — условие из user_lookup_filter: lower(col) = :id по одному
+    уникальному индексу на выражение.
+
+Для каждого варианта печатается план (EXPLAIN ANALYZE, BUFFERS) и медиана времени
+выполнения запроса. Данные приложения не затрагиваются: временная таблица
+удаляется вместе с соединением.
+
+Запуск:
+    python -m benchmarks.user_lookup --rows 1000000 --repeat 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+SETUP = """
+CREATE TEMP TABLE bench_users (
+    login varchar(50) NOT NULL,
+    email varchar(255) NOT NULL
+);
+INSERT INTO bench_users (login, email)
+SELECT 'user_' || n, 'User_' || n || '@Example.com'
+FROM generate_series(1, :rows) AS n;
+CREATE UNIQUE INDEX ON bench_users (login);
+CREATE UNIQUE INDEX ON bench_users (email);
+CREATE UNIQUE INDEX ON bench_users (lower(login) text_pattern_ops);
+CREATE UNIQUE INDEX ON bench_users (lower(email));
+ANALYZE bench_users;
+"""
+
+QUERIES = {
+    "old (login)": ("SELECT * FROM bench_users WHERE login = :id OR email = :id", "user_{}"),
+    "old (email)": ("SELECT * FROM bench_users WHERE login = :id OR email = :id", "User_{}@Example.com"),
+    "login": ("SELECT * FROM bench_users WHERE lower(login) = lower(:id)", "USER_{}"),
+    "email": ("SELECT * FROM bench_users WHERE lower(email) = lower(:id)", "user_{}@example.com"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    if not args.database_url:
+        from app.core.config import settings
+        args.database_url = settings.DATABASE_URL
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as conn:
+        for statement in filter(str.strip, SETUP.split(";")):
+            conn.execute(text(statement), {"rows": args.rows})
+
+        for name, (sql, template) in QUERIES.items():
+            plan = conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"),
+                {"id": template.format(args.rows // 2)},
+            ).scalars().all()
+            timings = []
+            for _ in range(args.repeat):
+                identifier = template.format(random.randint(1, args.rows))
+                started = time.perf_counter()
+                conn.execute(text(sql), {"id": identifier}).first()
+                timings.append(time.perf_counter() - started)
+            print(f"== {name}: median {statistics.median(timings) * 1e6:.0f} us, "
+                  f"p95 {statistics.quantiles(timings, n=20)[-1] * 1e6:.0f} us")
+            print("\n".join(f"   {line}" for line in plan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.crud import admin, counters, routes
+from app.models.users import UserRole
+from app.schemas.admin import BulkDeleteUsersRequest
+
+
+class FakeSession:
+    """
+    Сессия для _bulk_execute: UPDATE/DELETE ... RETURNING возвращает строки
+    пользователей из written — тех, кого запись действительно затронула.
+    """
+
+    def __init__(self, written):
+        self.written = written
+        self.statements = []
+        self.committed = False
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        rows = [SimpleNamespace(uuid=uuid, profile_picture=None) for uuid in self.written]
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+def row(role=UserRole.user, is_blocked=False, owns_content=False):
+    return SimpleNamespace(
+        uuid=uuid4(), login="u", email="u@example.com",
+        role=role, is_blocked=is_blocked, owns_content=owns_content,
+    )
+
+
+@pytest.fixture
+def current_user():
+    return SimpleNamespace(uuid=uuid4(), role=UserRole.admin)
+
+
+def statuses(result):
+    return {item["identifier"]: item["status"] for item in result["items"]}
+
+
+def test_bulk_block_reports_status_per_user(monkeypatch, current_user):
+    spammer, raced, blocked = row(), row(), row(is_blocked=True)
+    targets = [
+        ("ghost", None),
+        ("me", SimpleNamespace(uuid=current_user.uuid, role=UserRole.admin)),
+        ("boss", row(role=UserRole.admin)),
+        ("blocked", blocked),
+        ("spammer", spammer),
+        # Прошёл проверки, но изменился до UPDATE: запись его не затронула.
+        ("raced", raced),
+    ]
+    monkeypatch.setattr(admin, "_bulk_targets", lambda *args: targets)
+    db = FakeSession([spammer.uuid])
+
+    result = admin.bulk_toggle_user_status(db, current_user, ["..."], None, True, "спам")
+
+    assert statuses(result) == {
+        "ghost": admin.BULK_NOT_FOUND,
+        "me": admin.BULK_FORBIDDEN,
+        "boss": admin.BULK_FORBIDDEN,
+        "blocked": admin.BULK_UNCHANGED,
+        "spammer": admin.BULK_OK,
+        "raced": admin.BULK_CONFLICT,
+    }
+    assert result["processed"] == 1
+    assert len(db.statements) == 1 and db.committed
+
+
+def test_bulk_without_eligible_users_writes_nothing(monkeypatch, current_user):
+    targets = [("me", SimpleNamespace(uuid=current_user.uuid, role=UserRole.admin)), ("boss", row(role=UserRole.admin))]
+    monkeypatch.setattr(admin, "_bulk_targets", lambda *args: targets)
+    db = FakeSession([])
+
+    result = admin.bulk_change_user_role(db, current_user, ["..."], None, UserRole.moderator)
+
+    assert statuses(result) == {"me": admin.BULK_FORBIDDEN, "boss": admin.BULK_FORBIDDEN}
+    assert result["processed"] == 0
+    assert db.statements == [] and not db.committed
+
+
+def test_bulk_delete_subtracts_engagement_of_deleted_users_only(monkeypatch, current_user):
+    spammer, raced, author = row(), row(), row(owns_content=True)
+    route, comment = uuid4(), uuid4()
+    targets = [("spammer", spammer), ("raced", raced), ("author", author)]
+    monkeypatch.setattr(admin, "_bulk_targets", lambda *args: targets)
+
+    collected_for = []
+
+    def collect(db, user_uuids):
+        collected_for.append(set(user_uuids))
+        return {
+            counters.ROUTE_LIKES.name: [(spammer.uuid, route, 1), (raced.uuid, route, 1)],
+            counters.COMMENT_LIKES.name: [(spammer.uuid, comment, 1)],
+            "ratings": [(spammer.uuid, route, 5.0, 1), (raced.uuid, route, 4.0, 1)],
+        }
+
+    applied, subtracted = {}, []
+    monkeypatch.setattr(admin, "_collect_engagement", collect)
+    monkeypatch.setattr(counters, "apply_deltas", lambda db, spec, deltas: applied.update({spec.name: dict(deltas)}))
+    monkeypatch.setattr(routes, "subtract_ratings", lambda db, removed: subtracted.append(removed))
+    monkeypatch.setattr(admin.media, "release_many", lambda db, urls: None)
+
+    result = admin.bulk_delete_users(FakeSession([spammer.uuid]), current_user, ["..."], None)
+
+    assert statuses(result) == {
+        "spammer": admin.BULK_OK,
+        "raced": admin.BULK_CONFLICT,
+        "author": admin.BULK_CONFLICT,
+    }
+    assert collected_for == [{spammer.uuid, raced.uuid}]
+    # Лайки и оценка пользователя, которого DELETE не затронул, остаются в счётчиках.
+    assert applied == {
+        counters.ROUTE_LIKES.name: {route: -1},
+        counters.COMMENT_LIKES.name: {comment: -1},
+    }
+    assert subtracted == [{route: (5.0, 1)}]
+
+
+def test_bulk_filter_requires_a_criterion():
+    with pytest.raises(ValidationError):
+        BulkDeleteUsersRequest(filter={})
+    with pytest.raises(ValidationError):
+        BulkDeleteUsersRequest(identifiers=["a"], filter={"without_routes": True})
+    assert BulkDeleteUsersRequest(filter={"without_routes": True}).filter.without_routes
@@ -0,0 +1,123 @@
+import asyncio
+from collections import defaultdict
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from app.crud import counters
+
+
+class FakeSession:
+    """
+    Сессия, применяющая UPDATE ... FROM (VALUES ...) из CounterBuffer.flush
+    к словарю счётчиков {таблица: {uuid: значение}}.
+    """
+
+    def __init__(self, store, fail: bool = False):
+        self.store = store
+        self.fail = fail
+        self.committed = False
+        self.closed = False
+
+    def execute(self, statement):
+        if self.fail:
+            raise OperationalError(str(statement), {}, Exception("connection lost"))
+        # Параметры VALUES идут парами (target_uuid, delta) в порядке строк.
+        params = list(statement.compile(dialect=postgresql.dialect()).params.values())
+        table = self.store[statement.table.name]
+        for target_id, delta in zip(params[::2], params[1::2]):
+            table[target_id] += delta
+
+        class Result:
+            rowcount = len(params) // 2
+
+        return Result()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def store():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def test_flush_applies_net_deltas(store):
+    buffer = counters.CounterBuffer()
+    route, other_route, comment = uuid4(), uuid4(), uuid4()
+    for delta in (1, 1, 1, -1):
+        buffer.add(counters.ROUTE_LIKES, route, delta)
+    buffer.add(counters.ROUTE_LIKES, other_route, 1)
+    buffer.add(counters.ROUTE_LIKES, other_route, -1)
+    buffer.add(counters.COMMENT_LIKES, comment, 1)
+
+    session = FakeSession(store)
+    assert buffer.pending(counters.ROUTE_LIKES, route) == 2
+    assert buffer.flush(session) == 2
+    assert session.committed
+
+    assert store["routes"] == {route: 2}
+    assert store["comments"] == {comment: 1}
+    assert buffer.pending(counters.ROUTE_LIKES, route) == 0
+    # Повторный сброс пустого буфера ничего не меняет.
+    assert buffer.flush(FakeSession(store)) == 0
+    assert store["routes"] == {route: 2}
+
+
+def test_failed_flush_keeps_deltas_until_next_flush(store):
+    buffer = counters.CounterBuffer()
+    route = uuid4()
+    buffer.add(counters.ROUTE_LIKES, route, 1)
+
+    assert buffer.flush(FakeSession(store, fail=True)) == 0
+    assert store["routes"] == {}
+    assert buffer.pending(counters.ROUTE_LIKES, route) == 1
+
+    # Новые лайки между сбросами складываются с возвращёнными в буфер дельтами.
+    buffer.add(counters.ROUTE_LIKES, route, 1)
+    assert buffer.flush(FakeSession(store)) == 1
+    assert store["routes"] == {route: 2}
+    assert buffer.pending(counters.ROUTE_LIKES, route) == 0
+
+
+def test_buffer_is_flushed_on_shutdown(store, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main.settings, "ENGAGEMENT_WRITE_BEHIND", True)
+    # Интервал больше времени теста: сброс выполняет только остановка приложения.
+    monkeypatch.setattr(main.settings, "ENGAGEMENT_FLUSH_INTERVAL_MS", 3_600_000)
+    sessions = []
+
+    def session_factory():
+        sessions.append(FakeSession(store))
+        return sessions[-1]
+
+    monkeypatch.setattr(counters, "SessionLocal", session_factory)
+    monkeypatch.setattr(counters, "buffer", counters.CounterBuffer())
+    # Остальные фоновые компоненты обращаются к БД; здесь они не нужны.
+    monkeypatch.setattr(main.registry, "load", lambda: None)
+    monkeypatch.setattr(main.listener, "start", lambda: None)
+    monkeypatch.setattr(main.listener, "stop", lambda: None)
+    for component in (main.notifications.fanout, main.thumbnails.worker):
+        monkeypatch.setattr(component, "start", lambda: None)
+        monkeypatch.setattr(component, "stop", lambda: None)
+
+    route = uuid4()
+
+    async def run():
+        async with main.lifespan(main.app):
+            counters.buffer.add(counters.ROUTE_LIKES, route, 1)
+            counters.buffer.add(counters.ROUTE_LIKES, route, 1)
+            assert store["routes"] == {}
+
+    asyncio.run(run())
+    assert store["routes"] == {route: 2}
+    assert all(session.closed for session in sessions)
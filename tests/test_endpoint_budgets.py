@@ -0,0 +1,146 @@
+"""
+Бюджеты SQL-запросов (@query_budget) настоящих эндпоинтов в строгом режиме.
+
+Нужна отдельная пустая база PostgreSQL с PostGIS: TEST_DATABASE_URL. Схема
+создаётся и данные пишутся в одной транзакции, которая в конце откатывается.
+Без TEST_DATABASE_URL (или без доступа к базе) тесты пропускаются.
+"""
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.query_audit import QUERY_BUDGET_ATTR
+from app.core.security import create_access_token
+from app.crud.comments import COMMENT_TARGET_TYPE
+from app.crud.dictionaries import DictionaryRegistry, registry
+from app.db.session import get_db
+from app.models import Base
+from app.models.bridging import RouteFavorite, RouteLike
+from app.models.comments import Comment
+from app.models.routes import Route
+from app.models.target_types import TargetType
+from app.models.users import DBUser, UserRole
+from app.models.waypoints import Waypoint
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+
+ROUTES = 3
+
+
+@pytest.fixture(scope="module")
+def connection():
+    # NullPool: пул не попадает в метрики db_pool_* рядом с пулом приложения.
+    engine = create_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    try:
+        conn = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL недоступна: {e}")
+    instrument_engine(engine)
+    transaction = conn.begin()
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        Base.metadata.create_all(conn)
+        yield conn
+    finally:
+        transaction.rollback()
+        conn.close()
+        engine.dispose()
+
+
+def _session(conn) -> Session:
+    # commit() в crud фиксирует только точку сохранения внутри транзакции теста.
+    return Session(bind=conn, join_transaction_mode="create_savepoint")
+
+
+@pytest.fixture(scope="module")
+def data(connection):
+    db = _session(connection)
+    db.add_all([
+        TargetType(uuid=uuid.UUID(settings.ROUTE_TYPE_UUID), name="route"),
+        TargetType(uuid=uuid.UUID(settings.POST_TYPE_UUID), name="post"),
+        TargetType(uuid=uuid.UUID(settings.NEWS_TYPE_UUID), name="news"),
+        TargetType(name=COMMENT_TARGET_TYPE),
+    ])
+    author, reader = (
+        DBUser(login=login, email=f"{login}@example.com", first_name=login, last_name=login,
+               hashed_password="-", role=UserRole.user)
+        for login in ("budget_author", "budget_reader")
+    )
+    db.add_all([author, reader])
+    db.flush()
+    routes = [
+        Route(creator_uuid=author.uuid, name=f"Маршрут {i}", is_public=True, rating_score=settings.RATING_PRIOR_MEAN)
+        for i in range(ROUTES)
+    ]
+    db.add_all(routes)
+    db.flush()
+    for route in routes:
+        db.add_all(
+            Waypoint(route_uuid=route.uuid, lat=55.0 + i / 100, lon=37.0 + i / 100, order=i, type=waypoint_type)
+            for i, waypoint_type in enumerate(("start", "intermediate", "finish"))
+        )
+        db.add(Comment(creator_uuid=author.uuid, target_type_id=uuid.UUID(settings.ROUTE_TYPE_UUID),
+                       target_uuid=route.uuid, comment_text="Комментарий"))
+        db.add(RouteFavorite(route_uuid=route.uuid, user_uuid=reader.uuid))
+        db.add(RouteLike(route_uuid=route.uuid, user_uuid=reader.uuid))
+    db.commit()
+    result = {"reader": reader.login, "route": routes[0].uuid, "snapshot": DictionaryRegistry._build_snapshot(db)}
+    db.close()
+    return result
+
+
+@pytest.fixture
+def client(monkeypatch, connection, data):
+    from app import main
+
+    monkeypatch.setattr(main.settings, "QUERY_DEBUG", True)
+    monkeypatch.setattr(main.settings, "QUERY_BUDGET_STRICT", True)
+    # Справочники — из тестовой транзакции, а не из базы приложения.
+    monkeypatch.setattr(registry, "_snapshot", data["snapshot"])
+    app = main.create_app()
+
+    def override_get_db():
+        db = _session(connection)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    token = create_access_token(subject=data["reader"], role=UserRole.user.value)
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def assert_within_budget(client, response, method: str, path: str) -> None:
+    # Превышение бюджета в строгом режиме завершает запрос исключением ещё в client.request.
+    assert response.status_code == 200, response.text
+    route = next(r for r in client.app.routes if r.path == path and method in r.methods)
+    assert int(response.headers["x-db-queries"]) <= getattr(route.endpoint, QUERY_BUDGET_ATTR)
+
+
+def test_route_list_budget(client):
+    response = client.get("/routes/", params={"ordering": "rating"})
+    assert_within_budget(client, response, "GET", "/routes/")
+    assert len(response.json()) >= ROUTES
+
+
+def test_favorites_budget(client):
+    response = client.get("/routes/favorites/")
+    assert_within_budget(client, response, "GET", "/routes/favorites/")
+    assert len(response.json()) == ROUTES
+    assert all(card["is_liked"] for card in response.json())
+
+
+def test_create_comment_budget(client, data):
+    response = client.post(f"/comments/route/{data['route']}", json={"comment_text": "Проверка бюджета"})
+    assert_within_budget(client, response, "POST", "/comments/{target_type}/{target_uuid}")
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.crud import photos
+from app.models.comments import Comment
+from app.models.routes import Route
+from app.models.users import UserRole
+
+COMMENT_TYPE_ID = uuid4()
+TARGET_TYPES = {
+    "route": UUID(settings.ROUTE_TYPE_UUID),
+    "post": UUID(settings.POST_TYPE_UUID),
+    "comment": COMMENT_TYPE_ID,
+}
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.key = None
+
+    def filter(self, condition):
+        # Единственное условие проверки — Model.uuid == значение.
+        self.key = condition.right.value
+        return self
+
+    def first(self):
+        return self.rows.get(self.key)
+
+
+class FakeSession:
+    """
+    Сессия с таблицами {модель: {uuid: строка}} для запросов _check_upload_target.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.rolled_back = False
+
+    def query(self, *columns):
+        return FakeQuery(self.tables.get(columns[0].class_, {}))
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class Stored(Exception):
+    """Проверки пройдены, дошло до сохранения файла."""
+
+
+@pytest.fixture(autouse=True)
+def target_types(monkeypatch):
+    monkeypatch.setattr(photos, "get_target_type_id", TARGET_TYPES.__getitem__)
+
+    def store_upload(*args, **kwargs):
+        raise Stored
+
+    monkeypatch.setattr(photos.media, "store_upload", store_upload)
+
+
+def user(role=UserRole.user):
+    return SimpleNamespace(uuid=uuid4(), role=role)
+
+
+def upload(db, target_type, target_uuid, creator):
+    return photos.upload_photo(db, target_type, target_uuid, SimpleNamespace(filename="a.jpg"), None, creator)
+
+
+def test_upload_to_missing_route_is_404():
+    with pytest.raises(HTTPException) as error:
+        upload(FakeSession({}), "route", uuid4(), user())
+    assert error.value.status_code == 404
+
+
+def test_upload_to_foreign_route_is_403_but_allowed_for_owner_and_moderator():
+    owner = user()
+    route_id = uuid4()
+    db = FakeSession({Route: {route_id: SimpleNamespace(creator_uuid=owner.uuid, is_public=True)}})
+
+    with pytest.raises(HTTPException) as error:
+        upload(db, "route", route_id, user())
+    assert error.value.status_code == 403
+
+    for creator in (owner, user(UserRole.moderator)):
+        with pytest.raises(Stored):
+            upload(db, "route", route_id, creator)
+
+
+def test_upload_to_comment_requires_author_and_visible_route():
+    author, route_owner = user(), user()
+    route_id, comment_id, reply_id = uuid4(), uuid4(), uuid4()
+    route_type_id = TARGET_TYPES["route"]
+    tables = {
+        Route: {route_id: SimpleNamespace(creator_uuid=route_owner.uuid, is_public=False)},
+        Comment: {
+            comment_id: SimpleNamespace(creator_uuid=author.uuid, target_type_id=route_type_id, target_uuid=route_id),
+            reply_id: SimpleNamespace(creator_uuid=author.uuid, target_type_id=COMMENT_TYPE_ID, target_uuid=comment_id),
+        },
+    }
+    db = FakeSession(tables)
+
+    with pytest.raises(HTTPException) as error:
+        upload(db, "comment", uuid4(), author)
+    assert error.value.status_code == 404
+    # Чужой комментарий.
+    with pytest.raises(HTTPException) as error:
+        upload(db, "comment", comment_id, user())
+    assert error.value.status_code == 403
+    # Свой ответ в ветке под скрытым чужим маршрутом.
+    with pytest.raises(HTTPException) as error:
+        upload(db, "comment", reply_id, author)
+    assert error.value.status_code == 403
+
+    tables[Route][route_id].is_public = True
+    with pytest.raises(Stored):
+        upload(db, "comment", reply_id, author)
@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import instrument_engine
+from app.core.query_audit import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def sqlite_engine():
+    # Вместо PostgreSQL: счётчики запросов подключаются к любому движку.
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def make_client(monkeypatch, engine, strict: bool) -> TestClient:
+    from app import main
+
+    monkeypatch.setattr(main.settings, "QUERY_DEBUG", True)
+    monkeypatch.setattr(main.settings, "QUERY_BUDGET_STRICT", strict)
+    app = main.create_app()
+
+    @app.get("/budgeted/{queries}")
+    @query_budget(2)
+    def budgeted(queries: int) -> dict:
+        with engine.connect() as conn:
+            for _ in range(queries):
+                conn.execute(text("SELECT 1"))
+        return {"queries": queries}
+
+    # Без with: lifespan с фоновыми задачами здесь не нужен.
+    return TestClient(app)
+
+
+def test_within_budget_reports_query_count(monkeypatch, sqlite_engine):
+    client = make_client(monkeypatch, sqlite_engine, strict=True)
+
+    response = client.get("/budgeted/2")
+    assert response.status_code == 200
+    assert response.headers["x-db-queries"] == "2"
+
+
+def test_over_budget_fails_in_strict_mode(monkeypatch, sqlite_engine):
+    client = make_client(monkeypatch, sqlite_engine, strict=True)
+
+    with pytest.raises(QueryBudgetExceeded, match="3 SQL-запросов при бюджете 2"):
+        client.get("/budgeted/3")
+
+
+def test_over_budget_is_logged_without_strict(monkeypatch, sqlite_engine, caplog):
+    client = make_client(monkeypatch, sqlite_engine, strict=False)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_audit"):
+        response = client.get("/budgeted/3")
+    assert response.status_code == 200
+    assert "при бюджете 2" in caplog.text
+    # Три запроса одной формы — признак N+1.
+    assert "N+1" in caplog.text